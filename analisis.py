@@ -1,5 +1,25 @@
-import ply.lex as lex
-import ply.yacc as yacc
+"""
+Analizador sintáctico (PLY) para un subconjunto de C.
+
+El lexer y el parser se construyen la primera vez que se usan, no al importar
+el módulo; las clases del AST (nodos_ast) se cargan junto con el parser. Sus
+tablas (lextab y tablas LALR) se guardan en __pycache__, en un directorio por
+versión de PLY y con la firma de las reglas en el nombre: si la gramática no
+cambió, se cargan sin volver a generarlas.
+"""
+import os
+import sys
+import threading
+from array import array
+
+# Clases de nodos_ast que usan las reglas. Se cargan con el parser (ver
+# _cargar_nodos): nodos_ast construye sus dataclasses al importarse y eso
+# costaría más que el resto del import de este módulo
+_NODOS = (
+    'Nodo', 'Programa', 'Include', 'DefinicionFuncion', 'Declaracion', 'Asignacion', 'SentenciaIf',
+    'SentenciaFor', 'SentenciaWhile', 'Retorno', 'LlamadaFuncion', 'OperacionBinaria', 'Numero',
+    'Identificador', 'Cadena', 'TramosExpresiones', 'Visitante',
+)
 
 # --- Análisis Léxico (Lexer) ---
 
@@ -16,7 +36,6 @@ reserved = {
     'void': 'VOID',
     'return': 'RETURN',
     'include': 'INCLUDE',
-    'stdio': 'STDIO' # Para el ejemplo, podríamos ser más genéricos con 'IDENTIFIER' pero para 'stdio.h' es útil.
 }
 
 # Tokens
@@ -37,7 +56,7 @@ tokens = [
     'LESS',
     'STRING_LITERAL',
     'HASH',
-    'DOT' # Para 'stdio.h'
+    'DOT' # Para los nombres de cabecera, como 'stdio.h'
 ] + list(reserved.values())
 
 # Reglas de expresiones regulares para tokens simples
@@ -57,16 +76,66 @@ t_HASH = r'\#'
 t_DOT = r'\.'
 t_STRING_LITERAL = r'\".*?\"'
 
+# Tipos con los que empieza una declaración (para la heurística de declaraciones sueltas)
+TIPOS_DECLARACION = frozenset(('int', 'char', 'float', 'double', 'void'))
+
+# --- Heurísticas que se evalúan durante el lexeo ---
+# Se ejecutan desde las reglas t_ID y t_newline, así que el texto se recorre una
+# sola vez por análisis. El estado vive en el lexer (ver crear_lexer) y
+# errores_heuristicos() da el resultado al terminar.
+
+def revisar_main(t):
+    """`main` que no va seguido de '(': posible función mal escrita (ej: main {})."""
+    lexer = t.lexer
+    lexer.main_encontrado = True
+    datos = lexer.lexdata
+    i = lexer.lexpos
+    while i < len(datos) and datos[i] in ' \t':
+        i += 1
+    if (i == len(datos) or datos[i] != '(') and lexer.linea_main_reportada != t.lineno:
+        lexer.linea_main_reportada = t.lineno
+        lexer.errores_main.append(f"Línea {t.lineno}: posible función 'main' mal escrita (faltan paréntesis).")
+
+
+def revisar_fin_linea(lexer, fin):
+    """
+    Al terminar la línea actual (en la posición `fin`): si tiene un tipo y acaba
+    en ';', es candidata a declaración fuera de función.
+    """
+    if lexer.linea_con_tipo != lexer.lineno:
+        return
+    datos = lexer.lexdata
+    i = fin - 1
+    while i >= 0 and datos[i] in ' \t\r':
+        i -= 1
+    if i >= 0 and datos[i] == ';':
+        lexer.declaraciones_sueltas.append(lexer.lineno)
+
+
+def errores_heuristicos(lexer):
+    """Cierra la última línea y devuelve los errores de las heurísticas, en orden de línea."""
+    revisar_fin_linea(lexer, len(lexer.lexdata))
+    errores = list(lexer.errores_main)
+    # Sin main, toda declaración terminada en ';' queda fuera de una función
+    if not lexer.main_encontrado:
+        errores.extend(f"Línea {linea}: declaración posiblemente fuera de función."
+                       for linea in lexer.declaraciones_sueltas)
+    return errores
+
 # Un token para identificadores y palabras reservadas
 def t_ID(t):
     r'[a-zA-Z_][a-zA-Z_0-9]*'
     t.type = reserved.get(t.value, 'ID')  # Verifica si es palabra reservada
+    t.value = sys.intern(t.value)  # Los nodos del AST comparten una sola copia de cada nombre
+    if t.value == 'main':
+        revisar_main(t)
+    elif t.value in TIPOS_DECLARACION:
+        t.lexer.linea_con_tipo = t.lineno
     return t
 
-# Un token para números enteros
+# Un token para números enteros (el parser lo convierte a int; el texto da el tramo del nodo)
 def t_NUMBER(t):
     r'\d+'
-    t.value = int(t.value)
     return t
 
 # Ignorar espacios y tabulaciones
@@ -75,6 +144,7 @@ t_ignore = ' \t'
 # Manejo de saltos de línea
 def t_newline(t):
     r'\n+'
+    revisar_fin_linea(t.lexer, t.lexpos)
     t.lexer.lineno += len(t.value)
 
 # Manejo de errores léxicos
@@ -82,9 +152,6 @@ def t_error(t):
     print(f"Illegal character '{t.value[0]}' at line {t.lexer.lineno}")
     t.lexer.skip(1)
 
-# Construir el lexer
-lexer = lex.lex()
-
 # --- Análisis Sintáctico (Parser) ---
 
 # Precedencia de operadores (si fuera necesario para expresiones más complejas)
@@ -93,13 +160,81 @@ lexer = lex.lex()
 #     ('left', 'TIMES', 'DIVIDE'),
 # )
 
+def _inicio(p, i):
+    """Posición donde empieza el símbolo i de la producción."""
+    valor = p[i]
+    return valor.inicio if isinstance(valor, Nodo) else p.lexpos(i)
+
+
+def _fin(p, i):
+    """
+    Posición donde termina el símbolo i: el final de un nodo, el que guarda el
+    símbolo de una expresión (ver con_expresion) o el del texto de un token.
+    """
+    valor = p[i]
+    if isinstance(valor, Nodo):
+        return valor.inicio + valor.longitud
+    fin = getattr(p.slice[i], 'fin', None)
+    return p.lexpos(i) + len(valor) if fin is None else fin
+
+
+def con_tramo(p, nodo):
+    """
+    Asigna a `nodo` el tramo de código que cubre la producción: desde el primer
+    símbolo de la regla hasta el final del último.
+    """
+    nodo.inicio = _inicio(p, 1)
+    nodo.longitud = _fin(p, len(p) - 1) - nodo.inicio
+    return nodo
+
+
+def con_expresion(p, expresion, entre_parentesis=False):
+    """
+    Las expresiones no guardan su tramo (ver nodos_ast.Expresion): se agrega a
+    la tabla del parse, que termina en Programa.expresiones, y queda en el
+    símbolo de la producción, que lo lleva hasta la regla del nodo que la
+    contiene. `entre_parentesis` indica que `expresion` es la de dentro de los
+    paréntesis, la última en reducirse: su tramo se reemplaza por el que los
+    incluye.
+    """
+    inicio = _inicio(p, 1)
+    fin = _fin(p, len(p) - 1)
+    p.set_lexpos(0, inicio)
+    p.slice[0].fin = fin
+    inicios = p.lexer.inicios_expresiones
+    longitudes = p.lexer.longitudes_expresiones
+    if entre_parentesis:
+        inicios[-1] = inicio
+        longitudes[-1] = fin - inicio
+    else:
+        inicios.append(inicio)
+        longitudes.append(fin - inicio)
+    return expresion
+
+
+def con_hoja(p, clase, valor):
+    """Hoja de `clase` y `valor`, compartida por todas sus apariciones en el parse."""
+    hojas = p.lexer.hojas
+    hoja = hojas.get((clase, valor))
+    if hoja is None:
+        hoja = hojas[clase, valor] = clase(valor)
+    return con_expresion(p, hoja)
+
 # Reglas de la gramática
 def p_program(p):
     '''
     program : includes program_elements
             | program_elements
     '''
-    p[0] = ('program', p[1])
+    if len(p) == 3:
+        includes, funciones = p[1], p[2]
+    else:
+        includes, funciones = [], p[1]
+    lexer = p.lexer
+    nodo = Programa(includes, funciones, TramosExpresiones(lexer.inicios_expresiones, lexer.longitudes_expresiones))
+    nodo.inicio = (includes or funciones)[0].inicio
+    nodo.longitud = funciones[-1].fin - nodo.inicio
+    p[0] = nodo
 
 def p_includes(p):
     '''
@@ -109,11 +244,18 @@ def p_includes(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 def p_include_directive(p):
-    'include_directive : HASH INCLUDE LESS STDIO DOT ID GREATER'
-    p[0] = ('include', f"<{p[4]}{p[5]}{p[6]}{p[7]}") # Reconstruye para 'stdio.h'
+    '''
+    include_directive : HASH INCLUDE LESS ID DOT ID GREATER
+                      | HASH INCLUDE STRING_LITERAL
+    '''
+    if len(p) == 8:
+        p[0] = con_tramo(p, Include(f"<{p[4]}.{p[6]}>"))  # Cabecera de sistema, ej: <stdio.h>
+    else:
+        p[0] = con_tramo(p, Include(p[3]))  # Cabecera local, ej: "util.h"
 
 def p_program_elements(p):
     '''
@@ -123,13 +265,14 @@ def p_program_elements(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 def p_function_definition(p):
     '''
     function_definition : type ID LPAREN RPAREN LBRACE statements RBRACE
     '''
-    p[0] = ('function_definition', p[1], p[2], p[6])
+    p[0] = con_tramo(p, DefinicionFuncion(p[1], p[2], p[6]))
 
 def p_type(p):
     '''
@@ -140,6 +283,9 @@ def p_type(p):
          | VOID
     '''
     p[0] = p[1]
+    # El tipo es una cadena: su posición se guarda en el símbolo para con_tramo
+    p.set_lineno(0, p.lineno(1))
+    p.set_lexpos(0, p.lexpos(1))
 
 def p_statements(p):
     '''
@@ -149,7 +295,9 @@ def p_statements(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        # Se agrega en la misma lista: copiarla en cada reducción cuesta O(N²)
+        p[1].append(p[2])
+        p[0] = p[1]
 
 def p_statement(p):
     '''
@@ -169,16 +317,16 @@ def p_declaration_statement(p):
                           | type ID EQUALS expression SEMICOLON
     '''
     if len(p) == 4:
-        p[0] = ('declaration', p[1], p[2])
+        p[0] = con_tramo(p, Declaracion(p[1], p[2], None))
     else:
-        p[0] = ('declaration_init', p[1], p[2], p[4])
+        p[0] = con_tramo(p, Declaracion(p[1], p[2], p[4]))
 
 
 def p_assignment_statement(p):
     '''
     assignment_statement : ID EQUALS expression
     '''
-    p[0] = ('assignment', p[1], p[3])
+    p[0] = con_tramo(p, Asignacion(p[1], p[3]))
 
 def p_expression(p):
     '''
@@ -192,12 +340,19 @@ def p_expression(p):
                | LPAREN expression RPAREN
     '''
     if len(p) == 2:
-        p[0] = p[1]
+        tipo = p.slice[1].type
+        if tipo == 'NUMBER':
+            p[0] = con_hoja(p, Numero, int(p[1]))
+        elif tipo == 'ID':
+            p[0] = con_hoja(p, Identificador, p[1])
+        else:
+            p[0] = con_hoja(p, Cadena, p[1])
     elif len(p) == 4:
         if p[1] == '(':
-            p[0] = p[2]
+            # La expresión entre paréntesis es la misma; su tramo incluye los paréntesis
+            p[0] = con_expresion(p, p[2], entre_parentesis=True)
         else:
-            p[0] = (p[2], p[1], p[3])
+            p[0] = con_expresion(p, OperacionBinaria(p[2], p[1], p[3]))
 
 def p_if_statement(p):
     '''
@@ -205,15 +360,15 @@ def p_if_statement(p):
                  | IF LPAREN condition RPAREN LBRACE statements RBRACE ELSE LBRACE statements RBRACE
     '''
     if len(p) == 8:
-        p[0] = ('if_statement', p[3], p[6])
+        p[0] = con_tramo(p, SentenciaIf(p[3], p[6], None))
     else:
-        p[0] = ('if_else_statement', p[3], p[6], p[10])
+        p[0] = con_tramo(p, SentenciaIf(p[3], p[6], p[10]))
 
 def p_for_statement(p):
     '''
     for_statement : FOR LPAREN for_init SEMICOLON condition SEMICOLON for_update RPAREN LBRACE statements RBRACE
     '''
-    p[0] = ('for_statement', p[3], p[5], p[7], p[10])
+    p[0] = con_tramo(p, SentenciaFor(p[3], p[5], p[7], p[10]))
 
 def p_for_init(p):
     '''
@@ -235,7 +390,7 @@ def p_while_statement(p):
     '''
     while_statement : WHILE LPAREN condition RPAREN LBRACE statements RBRACE
     '''
-    p[0] = ('while_statement', p[3], p[6])
+    p[0] = con_tramo(p, SentenciaWhile(p[3], p[6]))
 
 def p_condition(p):
     '''
@@ -244,7 +399,7 @@ def p_condition(p):
               | expression
     '''
     if len(p) == 4:
-        p[0] = (p[2], p[1], p[3])
+        p[0] = con_expresion(p, OperacionBinaria(p[2], p[1], p[3]))
     else:
         p[0] = p[1]
 
@@ -252,13 +407,13 @@ def p_return_statement(p):
     '''
     return_statement : RETURN expression SEMICOLON
     '''
-    p[0] = ('return', p[2])
+    p[0] = con_tramo(p, Retorno(p[2]))
 
 def p_function_call(p):
     '''
     function_call : ID LPAREN STRING_LITERAL RPAREN
     '''
-    p[0] = ('function_call', p[1], p[3])
+    p[0] = con_tramo(p, LlamadaFuncion(p[1], p[3]))
 
 
 def p_empty(p):
@@ -274,11 +429,190 @@ def p_error(p):
         print("Syntax error: unexpected end of input.")
 
 
-# Construir el parser
-parser = yacc.yacc()
+# --- Construcción del lexer y del parser ---
+
+# PLY (y lo que solo hace falta para construir) se importa al construir, no al importar este módulo
+def _registro():
+    """Logger de los avisos de PLY al generar las tablas (conflictos de la gramática, etc.)."""
+    import logging
+    log = logging.getLogger('analisis')
+    if not log.handlers:
+        log.addHandler(logging.NullHandler())
+    return log
+
+
+def _directorio_tablas():
+    import ply
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__', f'ply-{ply.__version__}')
+
+_construccion = threading.Lock()
+_lexer_base = None
+_parser = None
+
+
+def _firma(prefijo, *extra):
+    """Firma de las reglas que empiezan por `prefijo`, para invalidar sus tablas si cambian."""
+    import hashlib
+    partes = [repr(tokens), *map(repr, extra)]
+    for nombre, valor in sorted(globals().items()):
+        if not nombre.startswith(prefijo):
+            continue
+        if callable(valor):
+            partes.append(f"{nombre}:{valor.__code__.co_firstlineno}:{valor.__doc__}")
+        else:
+            partes.append(f"{nombre}:{valor!r}")
+    return hashlib.sha1('\n'.join(partes).encode('utf-8')).hexdigest()[:12]
+
+
+def _cargar_tabla(nombre_tabla):
+    """Importa una tabla de la caché, o devuelve None si no existe."""
+    import importlib.util
+    ruta_tabla = os.path.join(_directorio_tablas(), nombre_tabla + '.py')
+    if not os.path.exists(ruta_tabla):
+        return None
+    spec = importlib.util.spec_from_file_location(nombre_tabla, ruta_tabla)
+    tabla = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(tabla)
+    return tabla
+
+
+def _construir_lexer():
+    import ply.lex as lex
+    log = _registro()
+    modulo = sys.modules[__name__]
+    nombre_tabla = f"lextab_analisis_{_firma('t_')}"
+    try:
+        lextab = _cargar_tabla(nombre_tabla)
+        if lextab is not None:
+            return lex.lex(module=modulo, optimize=True, lextab=lextab, errorlog=log)
+    except Exception as e:
+        log.warning("Lextab inválida, se regenera: %s", e)
+    directorio = _directorio_tablas()
+    os.makedirs(directorio, exist_ok=True)
+    return lex.lex(module=modulo, optimize=True, lextab=nombre_tabla, outputdir=directorio, errorlog=log)
+
+
+def _construir_parser():
+    """
+    Carga las tablas LALR de la caché (el nombre ya identifica la gramática, así
+    que PLY no vuelve a validarlas) o las genera sin escribir parser.out.
+    """
+    import ply.yacc as yacc
+    log = _registro()
+    modulo = sys.modules[__name__]
+    nombre_tabla = f"parsetab_analisis_{_firma('p_', globals().get('precedence'))}"
+    try:
+        parsetab = _cargar_tabla(nombre_tabla)
+        if parsetab is not None:
+            return yacc.yacc(module=modulo, optimize=True, tabmodule=parsetab, debug=False, errorlog=log)
+    except Exception as e:
+        log.warning("Tablas LALR inválidas, se regeneran: %s", e)
+    directorio = _directorio_tablas()
+    os.makedirs(directorio, exist_ok=True)
+    return yacc.yacc(module=modulo, tabmodule=nombre_tabla, outputdir=directorio,
+                     debug=False, write_tables=True, errorlog=log)
+
+
+def crear_lexer():
+    """
+    Devuelve un lexer nuevo (un clon del construido la primera vez) desde la
+    línea 1, con el estado de las heurísticas limpio.
+    """
+    global _lexer_base
+    if _lexer_base is None:
+        with _construccion:
+            if _lexer_base is None:
+                _lexer_base = _construir_lexer()
+    lexer = _lexer_base.clone()
+    lexer.lineno = 1
+    lexer.main_encontrado = False
+    lexer.linea_main_reportada = 0
+    lexer.errores_main = []
+    lexer.linea_con_tipo = 0
+    lexer.declaraciones_sueltas = []
+    lexer.hojas = {}  # hojas del AST compartidas durante el parse (ver con_hoja)
+    # Tramos de las expresiones del parse, en el orden en que se reducen (ver con_expresion)
+    lexer.inicios_expresiones = array('I')
+    lexer.longitudes_expresiones = array('I')
+    return lexer
+
+
+def _cargar_nodos():
+    """
+    Importa nodos_ast y deja sus clases como globales del módulo, donde las
+    buscan las reglas p_*, junto con RecolectorElementos.
+    """
+    global RecolectorElementos
+    import nodos_ast
+    globals().update({nombre: getattr(nodos_ast, nombre) for nombre in _NODOS})
+    RecolectorElementos = type('RecolectorElementos', (_RecolectorElementos, nodos_ast.Visitante),
+                               {'__doc__': _RecolectorElementos.__doc__})
+
+
+def obtener_parser():
+    """Devuelve el parser, construyéndolo (con los nodos del AST) la primera vez."""
+    global _parser
+    if _parser is None:
+        with _construccion:
+            if _parser is None:
+                _cargar_nodos()
+                _parser = _construir_parser()
+    return _parser
+
+
+def __getattr__(nombre):
+    # Compatibilidad con el antiguo `analisis.lexer` / `analisis.parser` de nivel de módulo
+    if nombre == 'lexer':
+        return crear_lexer()
+    if nombre == 'parser':
+        return obtener_parser()
+    # Las clases del AST están disponibles aunque todavía no se haya construido el parser
+    if nombre in _NODOS or nombre == 'RecolectorElementos':
+        with _construccion:
+            if nombre not in globals():
+                _cargar_nodos()
+        return globals()[nombre]
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 # --- Función de análisis ---
 
+class _RecolectorElementos:
+    """
+    Recorre el AST y anota en `detected_elements` lo que encuentra.
+    `expresiones` es la TramosExpresiones del programa. La clase que se usa,
+    RecolectorElementos, la crea _cargar_nodos sobre nodos_ast.Visitante.
+    """
+    def __init__(self, content, detected_elements, expresiones):
+        self.content = content
+        self.detected_elements = detected_elements
+        self.expresiones = expresiones
+
+    def visitar_DefinicionFuncion(self, nodo):
+        # Si no hay statements, podrías marcarla como sospechosa
+        if not nodo.cuerpo:
+            self.detected_elements["funciones_mal_escritas"].append(f"{nodo.nombre} sin cuerpo")
+        self.visitar_hijos(nodo)
+
+    def visitar_SentenciaIf(self, nodo):
+        self.detected_elements["estructuras_de_control"].append("if")
+        self.visitar_hijos(nodo)
+
+    def visitar_SentenciaFor(self, nodo):
+        self.detected_elements["estructuras_de_control"].append("for")
+        self.visitar_hijos(nodo)
+
+    def visitar_SentenciaWhile(self, nodo):
+        self.detected_elements["estructuras_de_control"].append("while")
+        self.visitar_hijos(nodo)
+
+    def visitar_Asignacion(self, nodo):
+        # La expresión se muestra tal como está escrita en el código
+        _, inicio, fin = next(self.expresiones.recorrer(nodo))
+        valor = self.content[inicio:fin]
+        self.detected_elements["asignacion_de_variables"].append(f"{nodo.nombre} = {valor}")
+        self.visitar_hijos(nodo)
+
+
 def analyze_content(content):
     errors = []
     detected_elements = {
@@ -287,85 +621,29 @@ def analyze_content(content):
         "asignacion_de_variables": []
     }
 
-    lexer.lineno = 1
-    lexer.input(content)
+    lexer = crear_lexer()
+    parser = obtener_parser()
 
     try:
         # Intenta parsear el contenido
         parsed_tree = parser.parse(content, lexer=lexer)
 
         if parsed_tree:
-            def traverse_tree(node):
-                if isinstance(node, tuple):
-                    node_type = node[0]
-
-                    if node_type == 'function_definition':
-                        func_name = node[2]
-                        statements = node[3]
-                        # Si no hay statements, podrías marcarla como sospechosa
-                        if not statements:
-                            detected_elements["funciones_mal_escritas"].append(f"{func_name} sin cuerpo")
-                    elif node_type in ('if_statement', 'if_else_statement'):
-                        detected_elements["estructuras_de_control"].append("if")
-                    elif node_type == 'for_statement':
-                        detected_elements["estructuras_de_control"].append("for")
-                    elif node_type == 'while_statement':
-                        detected_elements["estructuras_de_control"].append("while")
-                    elif node_type == 'assignment':
-                        detected_elements["asignacion_de_variables"].append(f"{node[1]} = {node[2]}")
-                    
-                    for item in node[1:]:
-                        traverse_tree(item)
-
-                elif isinstance(node, list):
-                    for item in node:
-                        traverse_tree(item)
-
-            traverse_tree(parsed_tree)
+            RecolectorElementos(content, detected_elements, parsed_tree.expresiones).visitar(parsed_tree)
 
     except Exception as e:
         errors.append(str(e))
 
-    # Análisis textual adicional para errores que el parser no reporta detalladamente
-    lines = content.splitlines()
-    for i, line in enumerate(lines, 1):
-        # Detecta función mal escrita sin paréntesis (ej: main {})
-        if "main" in line and "main(" not in line and "main " in line:
-            errors.append(f"Línea {i}: posible función 'main' mal escrita (faltan paréntesis).")
-
-        # Detecta declaraciones fuera de funciones (heurístico)
-        if any(kw in line for kw in ['int ', 'char ', 'float ', 'double ', 'void ']) and line.strip().endswith(';') and "main" not in content:
-            errors.append(f"Línea {i}: declaración posiblemente fuera de función.")
-
-    return errors, detected_elements
-
-
-    # Ahora, vamos a la parte de detectar errores de funciones mal escritas *específicamente*
-    # fuera del parser de PLY para los casos que PLY no captura como "error de sintaxis"
-    # pero que tú consideras "mal escritos".
-    # En PLY, si la sintaxis no coincide, simplemente arroja un error.
-    # Por ejemplo, si faltan (), la regla de p_function_definition no coincidirá y se generará un error.
-    # Si faltan {}, la misma situación.
-
-    # Para demostrar cómo podrías detectar esto si la gramática fuera más permisiva o si quisieras un mensaje más específico:
-    # Si quieres detectar una función `main` sin `()`:
-    if "main" in content and "main()" not in content:
-        # Esto es una detección más simple basada en texto, no en el AST,
-        # para ilustrar cómo podrías atrapar algo que el parser podría no marcar exactamente como "función mal escrita"
-        # pero sí como un error de sintaxis general.
-        errors.append("Error: función 'main' mal escrita (faltan paréntesis '()').")
-
-    # Si quieres detectar bloques de código sin '{' o '}'
-    # Esta es una detección más compleja ya que PLY ya manejaría esto como un error de sintaxis.
-    # Si `if` no tiene `{`, la regla `if_statement` no coincidirá.
-    # Si la definición de función no tiene `{`, la regla `function_definition` no coincidirá.
-
-    if not errors and not detected_elements["estructuras_de_control"] and not detected_elements["asignacion_de_variables"]:
-         # Aquí podrías añadir una comprobación más robusta si el árbol no se formó correctamente
-         # y no hubo un error explícito del parser.
-         # Por ejemplo, si el contenido es vacío o no tiene estructura C reconocible.
-        pass # Si no hay errores reportados por PLY y no se detectó nada, podría significar un input inválido.
+    finally:
+        # Si el parser se detuvo antes del final, se termina de lexear para que
+        # las heurísticas vean todo el texto
+        while lexer.token():
+            pass
+        # La pila de símbolos del parser (compartido) retendría el árbol hasta el próximo parse
+        del parser.symstack[:]
 
+    # Errores que el parser no reporta detalladamente, detectados al lexear
+    errors.extend(errores_heuristicos(lexer))
 
     return errors, detected_elements
 
@@ -0,0 +1,1456 @@
+"""
+Analizador léxico del editor (C -> español).
+
+El lexer se construye una sola vez al importar el módulo, en modo optimizado
+y con su tabla (lextab) en caché. Cada análisis trabaja sobre un clon, que
+lleva consigo su propio estado: los tokens encontrados y los errores léxicos.
+"""
+import contextlib
+import hashlib
+from array import array
+import importlib.util
+import logging
+import mmap
+import os
+import re
+import sys
+import threading
+
+import ply
+import ply.lex as lex
+
+from tabla_tokens import (
+    TablaTokens, LINEA_CONTINUACION, COMENTARIO, LIBRERIA, LIBRERIA_PERSONALIZADA, CADENA, CADENA_ERROR,
+    CARACTER, CARACTER_ERROR, DECIMAL, ENTERO, PALABRA_RESERVADA, TIPO_DATO, IDENTIFICADOR, SIMBOLO,
+    MAIN_FUNCTION, LLAMADA_FUNCION_BIBLIOTECA, DECLARACION_FUNCION, LLAMADA_FUNCION,
+    LLAMADA_FUNCION_NO_DECLARADA,
+)
+from tabla_simbolos import TablaSimbolos
+import preprocesador
+import diccionarios
+
+# Trazas del analizador: desactivadas salvo que la aplicación configure logging
+# (por ejemplo con ANALIZADOR_LOG=DEBUG en note_editor.py)
+log = logging.getLogger('analizador')
+log.addHandler(logging.NullHandler())
+
+# Archivo donde volcar los tokens de cada análisis; None desactiva el volcado
+RUTA_VOLCADO_TOKENS = os.environ.get('ANALIZADOR_VOLCADO')
+
+# Motor léxico de tokenizar: 'ply' (el lexer de PLY) o 'rapido' (tokenizar_rapido)
+MOTOR_LEXICO = os.environ.get('ANALIZADOR_MOTOR', 'ply')
+
+# Palabras clave que reconoce el lexer. Su traducción está en los diccionarios
+# de cada idioma (diccionarios.py), que no cambian la clasificación
+PALABRAS_RESERVADAS = diccionarios.PALABRAS_C
+
+# Lista de tipos de datos en C
+TIPOS_DATOS = ["int", "float", "char", "double", "void", "long", "short", "unsigned", "signed"]
+
+# Lista de funciones de biblioteca estándar conocidas
+FUNCIONES_BIBLIOTECA = ["printf", "main"]
+
+# Para consultas O(1) en post_procesar_tokens
+_TIPOS_DATOS = frozenset(TIPOS_DATOS)
+_FUNCIONES_BIBLIOTECA = frozenset(FUNCIONES_BIBLIOTECA)
+
+# Definir tokens (requerido por PLY)
+tokens = [
+    'PALABRA_RESERVADA',
+    'TIPO_DATO',
+    'IDENTIFICADOR',
+    'ENTERO',
+    'DECIMAL',
+    'CADENA',
+    'CADENA_ERROR',
+    'CARACTER',
+    'CARACTER_ERROR',
+    'LIBRERIA',
+    'LIBRERIA_PERSONALIZADA',
+    'COMENTARIO_LINEA',
+    'COMENTARIO_BLOQUE',
+    'SIMBOLO',
+    'NEWLINE'
+]
+
+# Estados del lexer
+states = (
+    ('comentario', 'exclusive'),
+)
+
+# Reglas de tokens (deben seguir el patrón t_NOMBRE)
+
+# Comentarios de línea
+def t_COMENTARIO_LINEA(t):
+    r'//.*'
+    t.lexer.todos_los_tokens.agregar(COMENTARIO, t.value, t.lineno, t.lexpos, t.lexer.lexpos)
+    return t
+
+# Comentarios de bloque - inicio
+def t_COMENTARIO_BLOQUE_INICIO(t):
+    r'/\*'
+    t.lexer.comentario_inicio = t.lineno
+    t.lexer.comentario_pos = t.lexpos
+    t.lexer.comentario_texto = t.value
+    t.lexer.begin('comentario')
+
+# Reglas para el estado de comentario
+def t_comentario_contenido(t):
+    r'[^*\n]+'
+    t.lexer.comentario_texto += t.value
+
+def t_comentario_asterisco(t):
+    r'\*(?!/)'
+    t.lexer.comentario_texto += t.value
+
+def t_comentario_newline(t):
+    r'\n+'
+    t.lexer.lineno += len(t.value)
+    t.lexer.comentario_texto += t.value
+
+def t_comentario_fin(t):
+    r'\*/'
+    t.lexer.comentario_texto += t.value
+    t.type = 'COMENTARIO_BLOQUE'
+    t.value = t.lexer.comentario_texto
+    t.lineno = t.lexer.comentario_inicio
+    t.lexer.begin('INITIAL')
+    t.lexer.todos_los_tokens.agregar(COMENTARIO, t.value, t.lineno, t.lexer.comentario_pos, t.lexer.lexpos)
+    return t
+
+def t_comentario_error(t):
+    t.lexer.errores_lexicos.append(f"Error en comentario línea {t.lineno}: carácter inesperado '{t.value[0]}'")
+    t.lexer.skip(1)
+
+# Bibliotecas (deben ir antes que las cadenas)
+def t_LIBRERIA(t):
+    r'<[a-zA-Z_][a-zA-Z0-9_]*\.h>'
+    t.lexer.todos_los_tokens.agregar(LIBRERIA, sys.intern(t.value), t.lineno, t.lexpos, t.lexer.lexpos)
+    return t
+
+def t_LIBRERIA_PERSONALIZADA(t):
+    r'"[a-zA-Z_][a-zA-Z0-9_]*\.h"'
+    t.lexer.todos_los_tokens.agregar(LIBRERIA_PERSONALIZADA, sys.intern(t.value), t.lineno, t.lexpos, t.lexer.lexpos)
+    return t
+
+# Cadenas (deben ir después de las librerías). Igual que en C, una cadena no
+# continúa en la línea siguiente: así el único estado que cruza líneas es el
+# de los comentarios de bloque.
+def t_CADENA(t):
+    r'"([^"\\\n]|\\.)*"'
+    t.lexer.todos_los_tokens.agregar(CADENA, t.value, t.lineno, t.lexpos, t.lexer.lexpos)
+    return t
+
+def t_CADENA_ERROR(t):
+    r'"([^"\\\n]|\\.)*\\?'
+    t.lexer.errores_lexicos.append(f"Error línea {t.lineno}: Cadena sin cerrar: {t.value}")
+    t.lexer.todos_los_tokens.agregar(CADENA_ERROR, t.value, t.lineno, t.lexpos, t.lexer.lexpos)
+    return t
+
+# Caracteres
+def t_CARACTER(t):
+    r"'([^'\\\n]|\\.)'"
+    t.lexer.todos_los_tokens.agregar(CARACTER, sys.intern(t.value), t.lineno, t.lexpos, t.lexer.lexpos)
+    return t
+
+def t_CARACTER_ERROR(t):
+    r"'([^'\\\n]|\\.)*'?"
+    if not t.value.endswith("'") or len(t.value.replace("\\", "")) > 3:
+        t.lexer.errores_lexicos.append(f"Error línea {t.lineno}: Carácter mal formado: {t.value}")
+        t.lexer.todos_los_tokens.agregar(CARACTER_ERROR, t.value, t.lineno, t.lexpos, t.lexer.lexpos)
+    return t
+
+# Números decimales (debe ir antes que enteros). La tabla guarda el texto;
+# TablaTokens.valor lo convierte a float al leerlo.
+def t_DECIMAL(t):
+    r'\d+\.\d+'
+    t.lexer.todos_los_tokens.agregar(DECIMAL, sys.intern(t.value), t.lineno, t.lexpos, t.lexer.lexpos)
+    return t
+
+# Números enteros
+def t_ENTERO(t):
+    r'\d+'
+    t.lexer.todos_los_tokens.agregar(ENTERO, sys.intern(t.value), t.lineno, t.lexpos, t.lexer.lexpos)
+    return t
+
+# Identificadores y palabras clave
+def t_IDENTIFICADOR(t):
+    r'[a-zA-Z_][a-zA-Z0-9_]*'
+    # Clasificar el token
+    if t.value in PALABRAS_RESERVADAS:
+        t.type = 'PALABRA_RESERVADA'
+        tipo = PALABRA_RESERVADA
+    elif t.value in TIPOS_DATOS:
+        t.type = 'TIPO_DATO'
+        tipo = TIPO_DATO
+    else:
+        tipo = IDENTIFICADOR
+    t.lexer.todos_los_tokens.agregar(tipo, sys.intern(t.value), t.lineno, t.lexpos, t.lexer.lexpos)
+    return t
+
+# Símbolos y operadores
+def t_SIMBOLO(t):
+    r'[#<>(){};,.+\-*/=\[\]!&|%^~?:]'
+    t.lexer.todos_los_tokens.agregar(SIMBOLO, sys.intern(t.value), t.lineno, t.lexpos, t.lexer.lexpos)
+    return t
+
+# Saltos de línea
+def t_NEWLINE(t):
+    r'\n+'
+    t.lexer.lineno += len(t.value)
+    # No agregamos saltos de línea a la lista de tokens
+    pass
+
+# Espacios y tabs (ignorar)
+t_ignore = ' \t'
+t_comentario_ignore = ''
+
+# Manejo de errores
+def t_error(t):
+    t.lexer.errores_lexicos.append(f"Error línea {t.lineno}: Carácter ilegal '{t.value[0]}'")
+    t.lexer.skip(1)
+
+
+# --- Construcción del lexer ---
+
+# Las tablas generadas se guardan fuera del árbol de fuentes, separadas por versión de PLY
+DIRECTORIO_TABLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__', f'ply-{ply.__version__}')
+
+
+def _firma_reglas():
+    """Calcula una firma de las reglas del lexer para invalidar la lextab si cambian."""
+    partes = [repr(tokens), repr(states)]
+    for nombre, valor in sorted(globals().items()):
+        if not nombre.startswith('t_'):
+            continue
+        if callable(valor):
+            partes.append(f"{nombre}:{valor.__code__.co_firstlineno}:{valor.__doc__}")
+        else:
+            partes.append(f"{nombre}:{valor!r}")
+    return hashlib.sha1('\n'.join(partes).encode('utf-8')).hexdigest()[:12]
+
+
+def _construir_lexer_base():
+    """
+    Construye el lexer en modo optimizado. Si ya existe una lextab con la misma
+    firma se carga desde la caché; si no, PLY la genera y la escribe ahí.
+    """
+    modulo = sys.modules[__name__]
+    nombre_tabla = f"lextab_analizador_{_firma_reglas()}"
+    ruta_tabla = os.path.join(DIRECTORIO_TABLAS, nombre_tabla + '.py')
+
+    if os.path.exists(ruta_tabla):
+        try:
+            spec = importlib.util.spec_from_file_location(nombre_tabla, ruta_tabla)
+            lextab = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(lextab)
+            return lex.lex(module=modulo, optimize=True, lextab=lextab, errorlog=log)
+        except Exception as e:
+            log.warning("Lextab inválida, se regenera: %s", e)
+
+    os.makedirs(DIRECTORIO_TABLAS, exist_ok=True)
+    return lex.lex(module=modulo, optimize=True, lextab=nombre_tabla, outputdir=DIRECTORIO_TABLAS, errorlog=log)
+
+
+_LEXER_BASE = _construir_lexer_base()
+
+
+def _firma_analizador():
+    """
+    Versión del analizador para las cachés de resultados: una firma del código
+    de este módulo, de tabla_tokens.py, de tabla_simbolos.py, de
+    preprocesador.py y de diccionarios.py, que cambia con cualquier cambio en las
+    reglas o en las etapas del análisis.
+    """
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    resumen = hashlib.sha1()
+    try:
+        for nombre in ('analizador.py', 'tabla_tokens.py', 'tabla_simbolos.py', 'preprocesador.py',
+                       'diccionarios.py'):
+            with open(os.path.join(directorio, nombre), 'rb') as f:
+                resumen.update(f.read())
+    except OSError:
+        return _firma_reglas()
+    return resumen.hexdigest()[:12]
+
+
+VERSION_ANALIZADOR = _firma_analizador()
+
+
+def crear_lexer():
+    """Devuelve un clon del lexer precompilado con su estado de análisis limpio."""
+    lexer = _LEXER_BASE.clone()
+    lexer.lineno = 1
+    lexer.todos_los_tokens = TablaTokens()
+    lexer.errores_lexicos = []
+    return lexer
+
+
+def tokenizar(contenido, motor=None):
+    """
+    Lexea el contenido completo y devuelve (todos_los_tokens, errores_lexicos).
+    `motor` elige el lexer ('ply' o 'rapido'); por defecto, MOTOR_LEXICO.
+    """
+    if (motor or MOTOR_LEXICO) == 'rapido':
+        return tokenizar_rapido(contenido)
+    lexer = crear_lexer()
+    lexer.input(contenido)
+    while lexer.token():
+        pass
+    return lexer.todos_los_tokens, lexer.errores_lexicos
+
+
+# --- Escáner rápido ---
+
+# Las reglas del estado INITIAL, con sus mismas expresiones regulares. PLY las
+# prueba en el orden de su definición; aquí las más frecuentes van primero,
+# pero solo se adelantan reglas cuyo primer carácter no coincide con el de
+# ninguna anterior, así que en cada posición gana la misma regla que en PLY:
+# los comentarios y t_LIBRERIA siguen antes de t_SIMBOLO ('/' y '<'), y las
+# cadenas, los caracteres y los números conservan su orden relativo.
+_REGLAS_ESCANER = (
+    t_IDENTIFICADOR, t_NEWLINE, t_COMENTARIO_LINEA, t_LIBRERIA, t_SIMBOLO, t_DECIMAL, t_ENTERO,
+    t_LIBRERIA_PERSONALIZADA, t_CADENA, t_CADENA_ERROR, t_CARACTER, t_CARACTER_ERROR,
+)
+
+
+def _patron_escaner():
+    """
+    Una sola expresión regular con un grupo con nombre por regla. El comentario
+    de bloque, que en PLY recorre el estado 'comentario', es aquí un único
+    grupo (cerrado o abierto hasta el final del texto) y ocupa el lugar de
+    t_COMENTARIO_BLOQUE_INICIO, justo después de los comentarios de línea.
+    """
+    grupos = []
+    for regla in _REGLAS_ESCANER:
+        grupos.append(f"(?P<{regla.__name__[2:]}>{regla.__doc__})")
+        if regla is t_COMENTARIO_LINEA:
+            grupos.append(r"(?P<COMENTARIO_BLOQUE>/\*[\s\S]*?\*/)")
+            grupos.append(r"(?P<COMENTARIO_ABIERTO>/\*[\s\S]*)")
+    # Los caracteres ignorados se consumen delante de cada token, en la misma
+    # coincidencia. PLY compila sus reglas con re.VERBOSE
+    return re.compile(f"[{re.escape(t_ignore)}]*(?:{'|'.join(grupos)})", re.VERBOSE)
+
+
+_PATRON_ESCANER = _patron_escaner()
+_GRUPO = _PATRON_ESCANER.groupindex
+
+# Clasificación de identificadores: lo mismo que t_IDENTIFICADOR, en un solo dict
+_CLASE_PALABRA = {**{tipo: TIPO_DATO for tipo in TIPOS_DATOS},
+                  **{palabra: PALABRA_RESERVADA for palabra in PALABRAS_RESERVADAS}}
+
+# Número de grupo -> código de tipo de los tokens que se guardan tal cual, internados
+_TIPOS_SIMPLES = {
+    _GRUPO['LIBRERIA']: LIBRERIA,
+    _GRUPO['LIBRERIA_PERSONALIZADA']: LIBRERIA_PERSONALIZADA,
+    _GRUPO['CARACTER']: CARACTER,
+    _GRUPO['DECIMAL']: DECIMAL,
+    _GRUPO['ENTERO']: ENTERO,
+    _GRUPO['SIMBOLO']: SIMBOLO,
+}
+
+
+def tokenizar_rapido(contenido):
+    """
+    Escáner alternativo al lexer de PLY: una sola pasada de re.finditer sobre
+    la expresión combinada, con el tipo de cada token decidido por el número de
+    grupo y un dict para las palabras reservadas, sin una llamada a función por
+    token. Devuelve exactamente lo mismo que tokenizar con el motor 'ply':
+    los mismos tokens (con sus posiciones y líneas) y los mismos errores.
+    """
+    tokens = TablaTokens()
+    errores_lexicos = []
+    agregar_tipo = tokens.tipos.append
+    agregar_linea = tokens.lineas.append
+    agregar_inicio = tokens.inicios.append
+    agregar_fin = tokens.fines.append
+    agregar_valor = tokens.valores.append
+    intern = sys.intern
+    clase_palabra = _CLASE_PALABRA.get
+    tipos_simples = _TIPOS_SIMPLES
+
+    ignorados = t_ignore
+    g_newline = _GRUPO['NEWLINE']
+    g_identificador = _GRUPO['IDENTIFICADOR']
+    g_comentario_linea = _GRUPO['COMENTARIO_LINEA']
+    g_comentario_bloque = _GRUPO['COMENTARIO_BLOQUE']
+    g_cadena = _GRUPO['CADENA']
+    g_cadena_error = _GRUPO['CADENA_ERROR']
+    g_caracter_error = _GRUPO['CARACTER_ERROR']
+
+    linea = 1
+    posicion = 0
+    for m in _PATRON_ESCANER.finditer(contenido):
+        grupo = m.lastindex
+        inicio, fin = m.span(grupo)
+        if m.start() != posicion:
+            # Lo que no reconoce ninguna regla son caracteres ilegales sueltos
+            # (nunca saltos de línea), uno por error como en t_error
+            for caracter in contenido[posicion:m.start()]:
+                if caracter not in ignorados:
+                    errores_lexicos.append(f"Error línea {linea}: Carácter ilegal '{caracter}'")
+        posicion = fin
+
+        if grupo == g_newline:
+            linea += fin - inicio
+            continue
+
+        valor = m.group(grupo)
+        if grupo == g_identificador:
+            valor = intern(valor)
+            tipo = clase_palabra(valor, IDENTIFICADOR)
+        elif grupo in tipos_simples:
+            valor = intern(valor)
+            tipo = tipos_simples[grupo]
+        elif grupo == g_comentario_linea or grupo == g_cadena:
+            tipo = COMENTARIO if grupo == g_comentario_linea else CADENA
+        elif grupo == g_comentario_bloque:
+            tipo = COMENTARIO
+            agregar_tipo(tipo)
+            agregar_linea(linea)
+            agregar_inicio(inicio)
+            agregar_fin(fin)
+            agregar_valor(valor)
+            linea += valor.count('\n')
+            continue
+        elif grupo == g_cadena_error:
+            errores_lexicos.append(f"Error línea {linea}: Cadena sin cerrar: {valor}")
+            tipo = CADENA_ERROR
+        elif grupo == g_caracter_error:
+            if valor.endswith("'") and len(valor.replace("\\", "")) <= 3:
+                continue
+            errores_lexicos.append(f"Error línea {linea}: Carácter mal formado: {valor}")
+            tipo = CARACTER_ERROR
+        else:
+            # Comentario de bloque sin cerrar: llega hasta el final y no produce token
+            break
+
+        agregar_tipo(tipo)
+        agregar_linea(linea)
+        agregar_inicio(inicio)
+        agregar_fin(fin)
+        agregar_valor(valor)
+    else:
+        for caracter in contenido[posicion:]:
+            if caracter not in ignorados:
+                errores_lexicos.append(f"Error línea {linea}: Carácter ilegal '{caracter}'")
+
+    return tokens, errores_lexicos
+
+
+# --- Lectura de archivos por trozos ---
+
+# Bytes aproximados de cada trozo al leer un archivo mapeado en memoria
+TAMANO_TROZO = 1 << 20
+
+
+@contextlib.contextmanager
+def mapear_archivo(ruta):
+    """Mapea `ruta` en memoria, de solo lectura. Un archivo vacío da b''."""
+    with open(ruta, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+            yield datos
+
+
+def trozos_texto(datos, tamano_trozo=TAMANO_TROZO):
+    """
+    Decodifica `datos` (bytes o un mmap en UTF-8) en trozos de unos
+    `tamano_trozo` bytes, cortados siempre después de un salto de línea para no
+    partir ningún carácter ni ningún token de una línea. Los saltos de línea se
+    normalizan a '\n' como al abrir el archivo en modo texto.
+    """
+    inicio, total = 0, len(datos)
+    while inicio < total:
+        fin = inicio + tamano_trozo
+        if fin >= total:
+            fin = total
+        else:
+            corte = datos.rfind(b'\n', inicio, fin)
+            if corte < 0:
+                # Línea más larga que el trozo: se corta al final de la línea
+                corte = datos.find(b'\n', fin)
+            fin = total if corte < 0 else corte + 1
+        texto = datos[inicio:fin].decode('utf-8', 'replace')
+        yield texto.replace('\r\n', '\n').replace('\r', '\n')
+        inicio = fin
+
+
+class TokenizadorIncremental:
+    """
+    Lexer reanudable. alimentar() recibe el texto en trozos de cualquier tamaño
+    y devuelve una TablaTokens con los tokens de las líneas que el trozo
+    completa, con las posiciones del texto completo. La última línea a medias
+    se guarda hasta el trozo siguiente (ninguna cadena, número ni identificador
+    cruza un salto de línea) y el lexer conserva entre trozos el número de
+    línea y el estado de los comentarios de bloque. terminar() lexea el resto.
+    """
+    def __init__(self, errores_lexicos=None):
+        self.lexer = crear_lexer()
+        if errores_lexicos is not None:
+            self.lexer.errores_lexicos = errores_lexicos
+        self.errores_lexicos = self.lexer.errores_lexicos
+        self.desplazamiento = 0
+        self.pendiente = ''
+        # Posición absoluta de un comentario de bloque abierto en un trozo anterior
+        self._inicio_comentario = None
+
+    def alimentar(self, texto):
+        corte = texto.rfind('\n')
+        if corte < 0:
+            self.pendiente += texto
+            return TablaTokens()
+        if self.pendiente or corte + 1 < len(texto):
+            completo = self.pendiente + texto[:corte + 1]
+            self.pendiente = texto[corte + 1:]
+        else:
+            completo = texto
+        return self._lexear(completo)
+
+    def terminar(self):
+        resto, self.pendiente = self.pendiente, ''
+        return self._lexear(resto) if resto else TablaTokens()
+
+    def _lexear(self, texto):
+        lexer = self.lexer
+        lexer.todos_los_tokens = tokens = TablaTokens()
+        lexer.input(texto)
+        while lexer.token():
+            pass
+
+        if self.desplazamiento:
+            ventana = TablaTokens()
+            ventana.extender(tokens, self.desplazamiento)
+        else:
+            ventana = tokens
+        if self._inicio_comentario is not None and len(ventana):
+            # Mientras el comentario sigue abierto no se emite nada, así que el
+            # primer token es el que lo cierra
+            ventana.inicios[0] = self._inicio_comentario
+            self._inicio_comentario = None
+        if lexer.current_state() == 'comentario' and self._inicio_comentario is None:
+            self._inicio_comentario = self.desplazamiento + lexer.comentario_pos
+            lexer.comentario_pos = 0
+        self.desplazamiento += len(texto)
+        return ventana
+
+
+def generar_tokens(trozos, errores_lexicos=None):
+    """
+    Generador de tokens por ventanas: lexea `trozos` con un TokenizadorIncremental
+    y produce una TablaTokens (no vacía) por cada trozo. Los errores léxicos se
+    agregan a `errores_lexicos` a medida que aparecen. Solo se mantiene en
+    memoria la ventana en curso.
+    """
+    tokenizador = TokenizadorIncremental(errores_lexicos)
+    for trozo in trozos:
+        ventana = tokenizador.alimentar(trozo)
+        if len(ventana):
+            yield ventana
+    ventana = tokenizador.terminar()
+    if len(ventana):
+        yield ventana
+
+
+def tokenizar_trozos(trozos):
+    """
+    Lexea un texto que llega en trozos sin unirlos en una sola cadena. El
+    resultado es el mismo (todos_los_tokens, errores_lexicos) que
+    tokenizar(''.join(trozos)).
+    """
+    todos_los_tokens = TablaTokens()
+    errores_lexicos = []
+    for ventana in generar_tokens(trozos, errores_lexicos):
+        todos_los_tokens.extender(ventana)
+    return todos_los_tokens, errores_lexicos
+
+
+def tokenizar_archivo(ruta, tamano_trozo=TAMANO_TROZO):
+    """Lexea un archivo directamente desde su mapeo en memoria, por trozos."""
+    with mapear_archivo(ruta) as datos:
+        return tokenizar_trozos(trozos_texto(datos, tamano_trozo))
+
+
+def lexear_linea(texto, linea, en_comentario=False, lexer=None):
+    """
+    Lexea una sola línea del documento partiendo del estado indicado.
+
+    Devuelve (tokens, errores, comentario_pendiente, columna_pendiente), con las
+    posiciones de los tokens relativas al inicio de la línea. Si la línea empieza
+    dentro de un comentario de bloque, el token que lo cierra lleva la línea
+    LINEA_CONTINUACION y solo contiene el fragmento de esta línea; si la línea
+    termina dentro de un comentario, comentario_pendiente es el texto que queda
+    abierto y columna_pendiente dónde empieza (si no, ambos son None).
+    unir_lineas se encarga de recomponer esos fragmentos.
+    """
+    if lexer is None:
+        lexer = crear_lexer()
+    lexer.todos_los_tokens = tokens_linea = TablaTokens()
+    lexer.errores_lexicos = errores_linea = []
+    lexer.lineno = linea
+    if en_comentario:
+        lexer.begin('comentario')
+        lexer.comentario_inicio = LINEA_CONTINUACION
+        lexer.comentario_pos = 0
+        lexer.comentario_texto = ''
+    else:
+        lexer.begin('INITIAL')
+
+    lexer.input(texto + '\n')
+    while lexer.token():
+        pass
+
+    if lexer.current_state() == 'comentario':
+        pendiente, columna = lexer.comentario_texto, lexer.comentario_pos
+    else:
+        pendiente = columna = None
+    lexer.begin('INITIAL')
+    return tokens_linea, errores_linea, pendiente, columna
+
+
+def unir_lineas(lineas):
+    """
+    Recompone el flujo de tokens de un documento lexeado línea a línea.
+
+    `lineas` es un iterable, en orden, de (numero_linea, posicion, tokens, errores,
+    comentario_pendiente, columna_pendiente, empieza_en_comentario), donde
+    `posicion` es el desplazamiento de la línea en el documento. El resultado es
+    el mismo (todos_los_tokens, errores_lexicos) que daría tokenizar sobre el
+    texto completo.
+    """
+    todos_los_tokens = TablaTokens()
+    errores_lexicos = []
+    comentario = None  # [linea_inicio, posicion_inicio, fragmentos] del comentario abierto
+
+    for numero, posicion, tokens_linea, errores_linea, pendiente, columna, empieza_en_comentario in lineas:
+        if empieza_en_comentario and len(tokens_linea) and tokens_linea.lineas[0] == LINEA_CONTINUACION:
+            # Cierre de un comentario abierto en líneas anteriores
+            comentario[2].append(tokens_linea.valores[0])
+            todos_los_tokens.agregar(COMENTARIO, ''.join(comentario[2]), comentario[0],
+                                     comentario[1], posicion + tokens_linea.fines[0])
+            comentario = None
+            resto = tokens_linea.seleccionar(range(1, len(tokens_linea)))
+            todos_los_tokens.extender(resto, posicion)
+        else:
+            todos_los_tokens.extender(tokens_linea, posicion)
+        errores_lexicos.extend(errores_linea)
+
+        if pendiente is not None:
+            if empieza_en_comentario and comentario is not None and not len(tokens_linea):
+                comentario[2].append(pendiente)
+            else:
+                comentario = [numero, posicion + columna, [pendiente]]
+
+    return todos_los_tokens, errores_lexicos
+
+
+# --- Análisis ---
+
+class AnalisisCancelado(Exception):
+    """Se lanza cuando un análisis en curso deja de ser necesario."""
+
+
+def post_procesar_tokens(tokens_list, errores_sintacticos, variables_declaradas, funciones_declaradas, cancelado=None,
+                         diagnosticos=None, funciones_externas=frozenset(), preprocesado=None):
+    """
+    Post-procesa la tabla de tokens para detectar errores sintácticos.
+    Devuelve una TablaTokens nueva con los tipos de las funciones resueltos.
+    Si se pasa la lista `diagnosticos`, cada error se agrega también como
+    (linea, inicio, fin, mensaje) con el tramo del token que lo causa.
+    `funciones_externas` son las funciones declaradas en otros archivos del
+    proyecto: sus llamadas no son errores, pero no se cuentan en
+    `funciones_declaradas`. Con `preprocesado` (un preprocesador.Preprocesado)
+    no se analizan las directivas ni las ramas descartadas, y las macros y lo
+    declarado en las cabeceras incluidas cuenta como declarado.
+
+    Es una sola pasada con una TablaSimbolos: cada '{' abre un ámbito y cada
+    '}' lo cierra, así que una variable solo cuenta como declarada donde es
+    visible. Los parámetros y las declaraciones de un for van al ámbito de la
+    llave siguiente. Las llamadas a funciones que aún no se declararon se
+    resuelven al final, cuando ya se conocen todas las funciones del archivo.
+    Los tipos de C (int, char...) llegan como palabras reservadas, para que la
+    traducción los traduzca; aquí cuentan como tipos de dato.
+    """
+    tipos = tokens_list.tipos
+    valores = tokens_list.valores
+    lineas = tokens_list.lineas
+    n = len(tipos)
+
+    # (posición en la pasada, token señalado, mensaje): las llamadas resueltas
+    # al final se reordenan para que los errores salgan en el orden del código
+    errores = []
+    
+    # Los tokens procesados comparten valores, líneas y posiciones; solo cambia el tipo
+    tipos_procesados = array('B', tipos)
+    hay_tipos_dato = False
+    
+    # Las trazas se deciden una vez: si están desactivadas, el bucle no formatea nada
+    depurar = log.isEnabledFor(logging.DEBUG)
+    
+    simbolos = TablaSimbolos()
+    funciones_declaradas.update(_FUNCIONES_BIBLIOTECA)
+    inactivos = None
+    if preprocesado is not None:
+        inactivos = preprocesado.inactivos
+        for nombre, tipo_dato in preprocesado.variables.items():
+            simbolos.declarar(nombre, tipo_dato)
+        if preprocesado.funciones or preprocesado.macros:
+            funciones_externas = funciones_externas | preprocesado.funciones | preprocesado.macros.keys()
+    llamadas_pendientes = []  # índices de llamadas a funciones todavía no declaradas
+    parentesis = 0            # profundidad de paréntesis en la posición actual
+    lista_declaracion = None  # (tipo, profundidad) de la declaración que puede seguir tras ','
+    
+    # Índices precalculados en una sola pasada: las consultas son O(1)
+    indices = construir_indices(tokens_list)
+
+    def es_tipo(k):
+        return tipos[k] == TIPO_DATO or (tipos[k] == PALABRA_RESERVADA and valores[k] in _TIPOS_DATOS)
+
+    def precedido_por_tipo(k):
+        """Si antes de k, saltando los '*' de los punteros, hay un tipo de dato."""
+        k -= 1
+        while k >= 0 and tipos[k] == SIMBOLO and valores[k] == '*':
+            k -= 1
+        return k >= 0 and es_tipo(k)
+
+    def declarar(k, tipo_dato):
+        nombre = valores[k]
+        if parentesis:
+            simbolos.declarar_pendiente(nombre, tipo_dato)
+        else:
+            simbolos.declarar(nombre, tipo_dato)
+        # El resumen conserva el primer tipo con el que se declaró cada nombre
+        if nombre not in variables_declaradas:
+            variables_declaradas[nombre] = tipo_dato
+        if depurar:
+            log.debug("Declaración encontrada: %s tipo %s (línea %d, ámbito %d)",
+                      nombre, tipo_dato, lineas[k], simbolos.profundidad)
+    
+    for i in range(n):
+        tipo = tipos[i]
+        
+        if cancelado and i % 1024 == 0 and cancelado():
+            raise AnalisisCancelado()
+        
+        if inactivos is not None and inactivos[i]:
+            continue
+        
+        # Ámbitos, paréntesis y fin de sentencia
+        if tipo == SIMBOLO:
+            valor = valores[i]
+            if valor == '(':
+                parentesis += 1
+            elif valor == ')':
+                if parentesis:
+                    parentesis -= 1
+                if lista_declaracion is not None and parentesis < lista_declaracion[1]:
+                    lista_declaracion = None
+            elif valor == '{':
+                simbolos.abrir()
+                lista_declaracion = None
+            elif valor == '}':
+                simbolos.cerrar()
+                lista_declaracion = None
+            elif valor == ';':
+                lista_declaracion = None
+                if not parentesis:
+                    simbolos.descartar_pendientes()
+        
+        # Detectar declaraciones
+        elif tipo == TIPO_DATO or (tipo == PALABRA_RESERVADA and valores[i] in _TIPOS_DATOS):
+            # Las declaraciones con Tipo_Dato no pasan a los tokens procesados
+            hay_tipos_dato = hay_tipos_dato or tipo == TIPO_DATO
+            j = i + 1
+            while j < n and tipos[j] == SIMBOLO and valores[j] == '*':
+                j += 1
+            if j < n and tipos[j] == IDENTIFICADOR:
+                if j + 1 < n and tipos[j + 1] == SIMBOLO and valores[j + 1] == '(':
+                    # Declaración o definición de función
+                    funciones_declaradas.add(valores[j])
+                    if depurar:
+                        log.debug("Función declarada: %s (línea %d)", valores[j], lineas[j])
+                else:
+                    declarar(j, valores[i])
+                    # Verificar punto y coma solo si no es parámetro de función
+                    if not es_parametro_funcion(tokens_list, j, indices):
+                        lista_declaracion = (valores[i], parentesis)
+                        # Primer ';', '{' o '}' después del nombre
+                        k = indices.siguiente_cierre[j + 1] if j + 1 < n else -1
+                        punto_coma_encontrado = k != -1 and valores[k] == ';'
+                        
+                        if not punto_coma_encontrado and not es_declaracion_en_for(tokens_list, j, indices):
+                            errores.append((i, j, f"Error sintáctico línea {lineas[i]}: "
+                                                  f"Falta ';' después de la declaración de '{valores[j]}'"))
+        
+        # Detectar funciones
+        elif tipo == IDENTIFICADOR:
+            valor = valores[i]
+            linea = lineas[i]
+            if i + 1 < n and tipos[i + 1] == SIMBOLO and valores[i + 1] == '(':
+                # Es una función
+                if valor == 'main':
+                    tipos_procesados[i] = MAIN_FUNCTION
+                    funciones_declaradas.add(valor)
+                elif valor in _FUNCIONES_BIBLIOTECA:
+                    tipos_procesados[i] = LLAMADA_FUNCION_BIBLIOTECA
+                    if depurar:
+                        log.debug("Función de biblioteca encontrada: %s (línea %d)", valor, linea)
+                    # Verificar paréntesis balanceados
+                    if not verificar_parentesis_balanceados(tokens_list, i + 1, indices):
+                        errores.append((i, i, f"Error sintáctico línea {linea}: "
+                                              f"Paréntesis desbalanceados en función '{valor}'"))
+                elif precedido_por_tipo(i):
+                    tipos_procesados[i] = DECLARACION_FUNCION
+                elif valor in funciones_declaradas or valor in funciones_externas:
+                    tipos_procesados[i] = LLAMADA_FUNCION
+                    if not verificar_parentesis_balanceados(tokens_list, i + 1, indices):
+                        errores.append((i, i, f"Error sintáctico línea {linea}: "
+                                              f"Paréntesis desbalanceados en función '{valor}'"))
+                else:
+                    # Puede declararse más adelante: se resuelve al final
+                    llamadas_pendientes.append(i)
+            elif (lista_declaracion is not None and parentesis == lista_declaracion[1]
+                  and valores[i - 1] == ',' and tipos[i - 1] == SIMBOLO):
+                # Nombre siguiente de una declaración múltiple: int a, b;
+                declarar(i, lista_declaracion[0])
+            elif (simbolos.buscar(valor) is None and valor not in funciones_declaradas
+                  and valor not in funciones_externas):
+                errores.append((i, i, f"Error sintáctico línea {linea}: Variable '{valor}' no declarada"))
+        
+        # Verificar punto y coma en sentencias de control
+        elif tipo == PALABRA_RESERVADA and valores[i] in ('return', 'break', 'continue'):
+            if not verificar_punto_coma_siguiente(tokens_list, i, indices):
+                errores.append((i, i, f"Error sintáctico línea {lineas[i]}: Falta ';' después de '{valores[i]}'"))
+    
+    # Llamadas a funciones que no estaban declaradas cuando aparecieron
+    for i in llamadas_pendientes:
+        valor = valores[i]
+        if valor in funciones_declaradas or valor in funciones_externas:
+            tipos_procesados[i] = LLAMADA_FUNCION
+        else:
+            tipos_procesados[i] = LLAMADA_FUNCION_NO_DECLARADA
+            errores.append((i, i, f"Error sintáctico línea {lineas[i]}: Función '{valor}' no declarada"))
+        if not verificar_parentesis_balanceados(tokens_list, i + 1, indices):
+            errores.append((i, i, f"Error sintáctico línea {lineas[i]}: Paréntesis desbalanceados en función '{valor}'"))
+    if llamadas_pendientes:
+        errores.sort(key=lambda error: error[0])
+    
+    if depurar:
+        log.debug("%d variables y %d funciones declaradas", len(variables_declaradas), len(funciones_declaradas))
+    
+    for _, k, mensaje in errores:
+        errores_sintacticos.append(mensaje)
+        if diagnosticos is not None:
+            diagnosticos.append((lineas[k], tokens_list.inicios[k], tokens_list.fines[k], mensaje))
+    
+    tokens_procesados = tokens_list.copia()
+    tokens_procesados.tipos = tipos_procesados
+    if hay_tipos_dato:
+        tokens_procesados = tokens_procesados.seleccionar([k for k in range(n) if tipos[k] != TIPO_DATO])
+    return tokens_procesados
+
+
+def funciones_declaradas_en(tokens_list):
+    """
+    Nombres de las funciones que declara o define una tabla de tokens (un tipo
+    de dato, quizá punteros, un identificador y '('), sin el resto del
+    análisis. Es lo que cada archivo aporta al índice de funciones de un
+    proyecto.
+    """
+    tipos = tokens_list.tipos
+    valores = tokens_list.valores
+    funciones = set()
+    for i in range(1, len(tipos) - 1):
+        if tipos[i] == IDENTIFICADOR and tipos[i + 1] == SIMBOLO and valores[i + 1] == '(':
+            k = i - 1
+            while k > 0 and tipos[k] == SIMBOLO and valores[k] == '*':
+                k -= 1
+            if tipos[k] == TIPO_DATO or (tipos[k] == PALABRA_RESERVADA and valores[k] in _TIPOS_DATOS):
+                funciones.add(valores[i])
+    return funciones
+
+
+class IndicesTokens:
+    """
+    Índices sobre una tabla de tokens calculados en una pasada lineal:
+    - pareja[i]: para un '(' el índice de su ')' (o -1 si no se cierra)
+    - dueno[i]: índice del '(' abierto más interno que contiene al token i (o -1)
+    - separado[i]: si entre dueno[i] y i hay un ';', '{' o '}' al mismo nivel
+    - siguiente_cierre[i]: primer ';', '{' o '}' en i o después (o -1)
+    """
+    def __init__(self, n):
+        self.pareja = array('l', [-1]) * n
+        self.dueno = array('l', [-1]) * n
+        self.separado = array('B', [0]) * n
+        self.siguiente_cierre = array('l', [-1]) * n
+
+
+def construir_indices(tokens_list):
+    """Construye los IndicesTokens de la tabla en tiempo lineal."""
+    tipos = tokens_list.tipos
+    valores = tokens_list.valores
+    n = len(tipos)
+    indices = IndicesTokens(n)
+    pareja = indices.pareja
+    dueno = indices.dueno
+    separado = indices.separado
+
+    abiertos = []     # pila de '(' sin cerrar
+    separados = []    # por cada '(' abierto: si ya se vio un separador a su nivel
+
+    for i in range(n):
+        if abiertos:
+            dueno[i] = abiertos[-1]
+            separado[i] = separados[-1]
+
+        if tipos[i] == SIMBOLO:
+            valor = valores[i]
+            if valor == '(':
+                abiertos.append(i)
+                separados.append(False)
+            elif valor == ')':
+                if abiertos:
+                    pareja[abiertos.pop()] = i
+                    separados.pop()
+            elif valor in ('\n', ';', '{', '}'):
+                if abiertos:
+                    separados[-1] = True
+
+    siguiente_cierre = indices.siguiente_cierre
+    cierre = -1
+    for i in range(n - 1, -1, -1):
+        if tipos[i] == SIMBOLO and valores[i] in (';', '{', '}'):
+            cierre = i
+        siguiente_cierre[i] = cierre
+
+    return indices
+
+
+def es_parametro_funcion(tokens_list, index, indices):
+    """Verifica si la declaración está dentro de parámetros de función"""
+    apertura = indices.dueno[index]
+    if apertura == -1 or indices.separado[index]:
+        return False
+    # Estamos dentro de paréntesis, verificar si es función
+    return apertura > 0 and tokens_list.tipos[apertura - 1] == IDENTIFICADOR
+
+
+def es_declaracion_en_for(tokens_list, index, indices):
+    """Verifica si la declaración está dentro de un bucle for"""
+    apertura = indices.dueno[index]
+    return (apertura > 0 and tokens_list.tipos[apertura - 1] == PALABRA_RESERVADA
+            and tokens_list.valores[apertura - 1] == 'for')
+
+
+def verificar_parentesis_balanceados(tokens_list, start_index, indices):
+    """Verifica que los paréntesis estén balanceados"""
+    if start_index >= len(tokens_list) or tokens_list.valores[start_index] != '(':
+        return False
+    return indices.pareja[start_index] != -1
+
+
+def verificar_punto_coma_siguiente(tokens_list, index, indices):
+    """Verifica que haya un punto y coma después de la sentencia"""
+    if index + 1 >= len(tokens_list):
+        return False
+    j = indices.siguiente_cierre[index + 1]
+    return j != -1 and tokens_list.valores[j] == ';'
+
+
+class VerificadorEstructural:
+    """
+    Detecta llaves, paréntesis y corchetes desbalanceados recorriendo los tokens
+    por ventanas, así que puede ir detrás de generar_tokens. procesar() revisa
+    una ventana y terminar() informa de lo que quedó sin cerrar. Con
+    `diagnosticos`, igual que post_procesar_tokens; un elemento sin cerrar se
+    señala en la última apertura que quedó pendiente. Con `inactivos` (la
+    máscara de preprocesador.Preprocesado), se saltan las directivas y las
+    ramas descartadas, como en post_procesar_tokens.
+    """
+    # Símbolo de cierre -> (apertura, mensaje del cierre sin apertura)
+    CIERRES = {
+        '}': ('{', "Llave de cierre sin apertura"),
+        ')': ('(', "Paréntesis de cierre sin apertura"),
+        ']': ('[', "Corchete de cierre sin apertura"),
+    }
+
+    def __init__(self, errores_sintacticos, diagnosticos=None):
+        self.errores_sintacticos = errores_sintacticos
+        self.diagnosticos = diagnosticos
+        self.niveles = {'{': 0, '(': 0, '[': 0}
+        # Tramos (linea, inicio, fin) de las aperturas pendientes; la pila
+        # crece con el anidamiento, no con el tamaño del archivo
+        self.aperturas = {'{': [], '(': [], '[': []}
+
+    def _reportar(self, tramo, mensaje):
+        self.errores_sintacticos.append(mensaje)
+        if self.diagnosticos is not None and tramo is not None:
+            self.diagnosticos.append((*tramo, mensaje))
+
+    def procesar(self, tokens, inactivos=None):
+        tipos = tokens.tipos
+        valores = tokens.valores
+        lineas = tokens.lineas
+        niveles = self.niveles
+        aperturas = self.aperturas
+        cierres = self.CIERRES
+
+        for i in range(len(tipos)):
+            if tipos[i] != SIMBOLO or (inactivos is not None and inactivos[i]):
+                continue
+            valor = valores[i]
+            if valor in aperturas:
+                niveles[valor] += 1
+                aperturas[valor].append((lineas[i], tokens.inicios[i], tokens.fines[i]))
+            elif valor in cierres:
+                apertura, mensaje = cierres[valor]
+                niveles[apertura] -= 1
+                if aperturas[apertura]:
+                    aperturas[apertura].pop()
+                if niveles[apertura] < 0:
+                    self._reportar((lineas[i], tokens.inicios[i], tokens.fines[i]),
+                                   f"Error sintáctico línea {lineas[i]}: {mensaje}")
+
+    def terminar(self):
+        for apertura, nombre in (('{', "llave(s)"), ('(', "paréntesis"), ('[', "corchete(s)")):
+            nivel = self.niveles[apertura]
+            if nivel > 0:
+                pendientes = self.aperturas[apertura]
+                self._reportar(pendientes[-1] if pendientes else None,
+                               f"Error sintáctico: {nivel} {nombre} sin cerrar")
+
+
+def detectar_errores_estructurales(todos_los_tokens, errores_sintacticos, diagnosticos=None, inactivos=None):
+    """
+    Detecta errores de llaves, paréntesis y corchetes desbalanceados en una
+    tabla completa. `inactivos` es la máscara del preprocesador, o None.
+    """
+    verificador = VerificadorEstructural(errores_sintacticos, diagnosticos)
+    verificador.procesar(todos_los_tokens, inactivos)
+    verificador.terminar()
+
+
+def volcar_tokens(tokens_list, ruta):
+    """
+    Escribe los tokens en `ruta`, uno por línea, a medida que se recorren
+    (sin construir el texto completo en memoria).
+    """
+    with open(ruta, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        for j, (tipo, valor, linea) in enumerate(tokens_list):
+            f.write(f"{j}\t{tipo}\t{valor!r}\t{linea}\t{tokens_list.inicios[j]}:{tokens_list.fines[j]}\n")
+    log.info("Tokens volcados en %s", ruta)
+
+
+def analizar_codigo(contenido, cancelado=None, progreso=None, volcado_tokens=None, cache=None,
+                    funciones_externas=frozenset(), directorio=None):
+    """
+    Ejecuta el análisis léxico y sintáctico sobre una copia del texto del editor.
+
+    No toca la interfaz, así que puede ejecutarse en un hilo de fondo. `cancelado`
+    es una función que devuelve True cuando el análisis ya no es necesario (se
+    lanza AnalisisCancelado entre etapas) y `progreso` recibe mensajes de avance.
+    Con `cache` (una cache_analisis.CacheAnalisis), un texto ya analizado devuelve
+    el resultado guardado sin repetir el análisis. `funciones_externas` son las
+    funciones declaradas en otros archivos del proyecto (ver post_procesar_tokens)
+    y `directorio` es donde se buscan las cabeceras locales (por defecto, el
+    directorio actual).
+    """
+    if cache is not None:
+        clave = cache.clave(contenido, funciones_externas, directorio)
+        resultado = cache.obtener(clave)
+        if resultado is not None:
+            return resultado
+    if progreso:
+        progreso("Análisis léxico...")
+    todos_los_tokens, errores_lexicos = tokenizar(contenido)
+    resultado = analizar_tokens(todos_los_tokens, errores_lexicos, cancelado, progreso, volcado_tokens,
+                                funciones_externas, directorio)
+    if cache is not None:
+        cache.guardar(clave, resultado)
+    return resultado
+
+
+def analizar_archivo(ruta, cancelado=None, progreso=None, volcado_tokens=None, cache=None,
+                     tamano_trozo=TAMANO_TROZO, funciones_externas=frozenset()):
+    """
+    Como analizar_codigo, pero lee `ruta` mapeada en memoria y la lexea por
+    trozos, sin decodificar el archivo completo en una sola cadena. La clave de
+    `cache` se calcula sobre los bytes del archivo. Las cabeceras locales se
+    buscan en el directorio de `ruta`.
+    """
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    with mapear_archivo(ruta) as datos:
+        if cache is not None:
+            clave = cache.clave(datos, funciones_externas, directorio)
+            resultado = cache.obtener(clave)
+            if resultado is not None:
+                return resultado
+        if progreso:
+            progreso("Análisis léxico...")
+        todos_los_tokens, errores_lexicos = tokenizar_trozos(trozos_texto(datos, tamano_trozo))
+    resultado = analizar_tokens(todos_los_tokens, errores_lexicos, cancelado, progreso, volcado_tokens,
+                                funciones_externas, directorio)
+    if cache is not None:
+        cache.guardar(clave, resultado)
+    return resultado
+
+
+def analizar_tokens(todos_los_tokens, errores_lexicos, cancelado=None, progreso=None, volcado_tokens=None,
+                    funciones_externas=frozenset(), directorio=None):
+    """
+    Continúa el análisis a partir de tokens ya lexeados (por ejemplo, los que
+    mantiene la caché por bloques del editor). Devuelve el mismo dict que
+    analizar_codigo. Si se indica `volcado_tokens` (o RUTA_VOLCADO_TOKENS), los
+    tokens se vuelcan en ese archivo para diagnóstico. La clave 'cabeceras'
+    lista las cabeceras locales leídas, con su fecha de modificación, y las
+    rutas donde se buscó una sin encontrarla (ver preprocesador.Preprocesado).
+    """
+    def avisar(mensaje):
+        if progreso:
+            progreso(mensaje)
+
+    def comprobar_cancelacion():
+        if cancelado and cancelado():
+            raise AnalisisCancelado()
+
+    errores_sintacticos = []
+    diagnosticos = []  # (linea, inicio, fin, mensaje) de cada error sintáctico
+    variables_declaradas = {}  # {nombre: tipo}
+    funciones_declaradas = set()
+    comprobar_cancelacion()
+
+    volcado_tokens = volcado_tokens or RUTA_VOLCADO_TOKENS
+    if volcado_tokens:
+        volcar_tokens(todos_los_tokens, volcado_tokens)
+
+    avisar("Preprocesando...")
+    preprocesado = preprocesador.preprocesar(todos_los_tokens, directorio)
+    for k, mensaje in preprocesado.errores:
+        errores_sintacticos.append(mensaje)
+        diagnosticos.append((todos_los_tokens.lineas[k], todos_los_tokens.inicios[k],
+                             todos_los_tokens.fines[k], mensaje))
+    comprobar_cancelacion()
+
+    avisar(f"Post-procesando {len(todos_los_tokens)} tokens...")
+    tokens_procesados = post_procesar_tokens(todos_los_tokens, errores_sintacticos,
+                                             variables_declaradas, funciones_declaradas, cancelado, diagnosticos,
+                                             funciones_externas, preprocesado)
+    comprobar_cancelacion()
+
+    avisar("Verificando estructura...")
+    detectar_errores_estructurales(todos_los_tokens, errores_sintacticos, diagnosticos, preprocesado.inactivos)
+    comprobar_cancelacion()
+
+    return {
+        'tokens': tokens_procesados,
+        'errores_lexicos': errores_lexicos,
+        'errores_sintacticos': errores_sintacticos,
+        'diagnosticos': diagnosticos,
+        'variables': variables_declaradas,
+        'funciones': funciones_declaradas,
+        'cabeceras': preprocesado.cabeceras,
+    }
+
+
+# --- Archivos de salida ---
+
+# Nombres por defecto de los archivos de salida, relativos al directorio de salida
+ARCHIVOS_SALIDA = {
+    'trad': 'trad.txt',
+    'traduccion': 'traduccion.txt',
+    'errores': 'errores.txt',
+}
+
+# Tokens que se unen en cada escritura y tamaño del búfer de los archivos
+TOKENS_POR_ESCRITURA = 1 << 14
+TAMANO_BUFER_SALIDA = 1 << 20
+
+
+def _texto_token(tokens, i):
+    """Texto de salida del token i: los números se escriben como int o float, igual que antes."""
+    if tokens.tipos[i] in (ENTERO, DECIMAL):
+        return str(tokens.valor(i))
+    return tokens.valores[i]
+
+
+def fragmentos_trad(tokens_procesados):
+    """Contenido de trad.txt (un token por línea), en fragmentos de TOKENS_POR_ESCRITURA tokens."""
+    n = len(tokens_procesados)
+    for inicio in range(0, n, TOKENS_POR_ESCRITURA):
+        textos = [_texto_token(tokens_procesados, i) for i in range(inicio, min(n, inicio + TOKENS_POR_ESCRITURA))]
+        textos.append('')
+        yield '\n'.join(textos)
+
+
+def fragmentos_traduccion(tokens_procesados, idioma=None):
+    """
+    Contenido de traduccion.txt (palabras reservadas traducidas, separadas por
+    espacios). `idioma` es el código de un diccionario (por defecto, el
+    predeterminado) o un diccionarios.Diccionario.
+    """
+    tabla = diccionarios.obtener(idioma).tabla
+    tipos = tokens_procesados.tipos
+    valores = tokens_procesados.valores
+    n = len(tipos)
+    for inicio in range(0, n, TOKENS_POR_ESCRITURA):
+        textos = []
+        for i in range(inicio, min(n, inicio + TOKENS_POR_ESCRITURA)):
+            if tipos[i] == PALABRA_RESERVADA and valores[i] in tabla:
+                textos.append(tabla[valores[i]])
+            else:
+                textos.append(_texto_token(tokens_procesados, i))
+        textos.append('')
+        yield ' '.join(textos)
+
+
+class TraductorFuente:
+    """
+    Traducción que conserva el formato del código: en lugar de escribir los
+    tokens separados por espacios, copia el texto fuente y solo reemplaza los
+    tramos de las palabras reservadas (con las posiciones que da el lexer) por
+    su traducción. El texto entre dos reemplazos se copia en un solo corte, y
+    las palabras reservadas se buscan en la columna de tipos con bytes.find,
+    así que el trabajo en Python crece con el número de reemplazos y no con el
+    de tokens.
+
+    alimentar() recibe el texto (entero o en trozos, en orden), procesar() los
+    tokens cuyo texto ya se recibió y devuelve los fragmentos listos para
+    escribir, y terminar() devuelve el texto que queda tras el último token.
+    `idioma` elige el diccionario, como en fragmentos_traduccion.
+    """
+    _MARCA = bytes([PALABRA_RESERVADA])
+
+    def __init__(self, idioma=None):
+        self.tabla = diccionarios.obtener(idioma).tabla
+        self.texto = ''       # texto recibido y todavía no escrito
+        self.inicio = 0       # posición de self.texto en el texto completo
+        self.trozos = []      # trozos recibidos que aún no se unieron a self.texto
+
+    def alimentar(self, texto):
+        self.trozos.append(texto)
+
+    def procesar(self, tokens):
+        if not len(tokens):
+            return []
+        if self.trozos:
+            self.texto += ''.join(self.trozos)
+            self.trozos = []
+        texto, base = self.texto, self.inicio
+        inicios = tokens.inicios
+        fines = tokens.fines
+        valores = tokens.valores
+        tipos = tokens.tipos.tobytes()
+        tabla = self.tabla
+
+        partes = []
+        anterior = base
+        i = tipos.find(self._MARCA)
+        while i >= 0:
+            traduccion = tabla.get(valores[i])
+            if traduccion is not None:
+                partes.append(texto[anterior - base:inicios[i] - base])
+                partes.append(traduccion)
+                anterior = fines[i]
+            i = tipos.find(self._MARCA, i + 1)
+
+        # El texto hasta el final del último token ya no cambia: se escribe y se suelta
+        hasta = max(anterior, fines[-1])
+        partes.append(texto[anterior - base:hasta - base])
+        self.texto = texto[hasta - base:]
+        self.inicio = hasta
+        return partes
+
+    def terminar(self):
+        resto = self.texto + ''.join(self.trozos)
+        self.inicio += len(resto)
+        self.texto = ''
+        self.trozos = []
+        return resto
+
+
+def fragmentos_traduccion_fuente(fuente, tokens_procesados, idioma=None):
+    """
+    Contenido de traduccion.txt conservando el formato de `fuente`, el texto
+    del que salieron los tokens (ver TraductorFuente).
+    """
+    traductor = TraductorFuente(idioma)
+    traductor.alimentar(fuente)
+    yield from traductor.procesar(tokens_procesados)
+    yield traductor.terminar()
+
+
+def fragmentos_errores(resultado):
+    """Contenido de errores.txt: errores léxicos y sintácticos y el resumen del análisis."""
+    errores_lexicos = resultado['errores_lexicos']
+    errores_sintacticos = resultado['errores_sintacticos']
+    variables_declaradas = resultado['variables']
+    funciones_declaradas = resultado['funciones']
+
+    yield "=== ANÁLISIS DE ERRORES ===\n\n"
+
+    yield "ERRORES LÉXICOS:\n"
+    if errores_lexicos:
+        yield ''.join(f"  • {error}\n" for error in errores_lexicos)
+    else:
+        yield "  ✓ No se encontraron errores léxicos\n"
+
+    yield "\nERRORES SINTÁCTICOS:\n"
+    if errores_sintacticos:
+        yield ''.join(f"  • {error}\n" for error in errores_sintacticos)
+    else:
+        yield "  ✓ No se encontraron errores sintácticos\n"
+
+    yield (f"\n=== RESUMEN ===\n"
+           f"Total errores léxicos: {len(errores_lexicos)}\n"
+           f"Total errores sintácticos: {len(errores_sintacticos)}\n"
+           f"Variables declaradas: {len(variables_declaradas)}\n"
+           f"Funciones encontradas: {len(funciones_declaradas)}\n")
+
+    if variables_declaradas:
+        yield "\nVARIABLES DECLARADAS:\n"
+        yield ''.join(f"  • {var}: {tipo}\n" for var, tipo in variables_declaradas.items())
+
+    if funciones_declaradas:
+        yield "\nFUNCIONES ENCONTRADAS:\n"
+        yield ''.join(f"  • {func}\n" for func in funciones_declaradas)
+
+
+@contextlib.contextmanager
+def archivo_atomico(ruta):
+    """
+    Abre para escribir un archivo temporal en el mismo directorio que `ruta`,
+    que reemplaza al destino solo si el bloque termina sin errores: quien lea
+    `ruta` nunca ve un archivo a medias.
+    """
+    # Nombre único por proceso e hilo; open() respeta los permisos habituales (umask)
+    directorio, nombre = os.path.split(os.path.abspath(ruta))
+    temporal = os.path.join(directorio, f".{nombre}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temporal, 'w', encoding='utf-8', buffering=TAMANO_BUFER_SALIDA) as f:
+            yield f
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
+        raise
+
+
+def escribir_atomico(ruta, fragmentos):
+    """Escribe los fragmentos de texto en `ruta` de forma atómica (ver archivo_atomico)."""
+    with archivo_atomico(ruta) as f:
+        f.writelines(fragmentos)
+
+
+def escribir_archivos(resultado, directorio='.', trad=ARCHIVOS_SALIDA['trad'],
+                      traduccion=ARCHIVOS_SALIDA['traduccion'], errores=ARCHIVOS_SALIDA['errores'], fuente=None,
+                      idioma=None):
+    """
+    Genera los archivos de salida a partir del resultado de analizar_codigo:
+    - trad: Solo tokens, sin sus tipos
+    - traduccion: Código C traducido al español
+    - errores: Errores sintácticos y léxicos detectados
+
+    Las rutas relativas se resuelven contra `directorio`; None omite ese
+    archivo. Cada archivo se escribe de forma atómica. Devuelve las rutas
+    escritas. Si se pasa `fuente` (el texto analizado), traduccion conserva su
+    formato (ver TraductorFuente) en lugar de separar los tokens con espacios.
+    `idioma` elige el diccionario de la traducción (ver fragmentos_traduccion).
+    """
+    tokens_procesados = resultado['tokens']
+    diccionario = diccionarios.obtener(idioma)
+    if fuente is None:
+        traducir = lambda: fragmentos_traduccion(tokens_procesados, diccionario)
+    else:
+        traducir = lambda: fragmentos_traduccion_fuente(fuente, tokens_procesados, diccionario)
+    salidas = (
+        (trad, lambda: fragmentos_trad(tokens_procesados)),
+        (traduccion, traducir),
+        (errores, lambda: fragmentos_errores(resultado)),
+    )
+
+    escritas = []
+    for ruta, fragmentos in salidas:
+        if ruta is None:
+            continue
+        ruta = os.path.join(directorio, ruta)
+        escribir_atomico(ruta, fragmentos())
+        escritas.append(ruta)
+    return escritas
+
+
+def traducir_en_flujo(trozos, directorio='.', trad=ARCHIVOS_SALIDA['trad'],
+                      traduccion=ARCHIVOS_SALIDA['traduccion'], cancelado=None, conservar_formato=False,
+                      idioma=None):
+    """
+    Traduce un texto que llega en trozos como una cadena de etapas: cada
+    ventana de generar_tokens pasa por VerificadorEstructural y se escribe en
+    trad y traduccion (rutas como en escribir_archivos; None omite el archivo)
+    antes de lexear la siguiente, así que la memoria queda acotada por el
+    tamaño de la ventana y no por el del archivo. Con `conservar_formato`,
+    traduccion se escribe con un TraductorFuente que recibe los mismos trozos.
+    `idioma` elige el diccionario de la traducción.
+
+    post_procesar_tokens no forma parte de la cadena: necesita el programa
+    completo (una variable puede usarse antes de su declaración), así que aquí
+    solo se detectan los errores léxicos y estructurales. Devuelve un dict con
+    el número de tokens, 'errores_lexicos', 'errores_sintacticos' y
+    'diagnosticos'.
+    """
+    errores_lexicos = []
+    errores_sintacticos = []
+    diagnosticos = []
+    verificador = VerificadorEstructural(errores_sintacticos, diagnosticos)
+    total = 0
+
+    diccionario = diccionarios.obtener(idioma)
+    traductor = None
+    if conservar_formato and traduccion is not None:
+        traductor = TraductorFuente(diccionario)
+        trozos = _registrar_trozos(trozos, traductor)
+
+    with contextlib.ExitStack() as archivos:
+        salidas = []
+        if trad is not None:
+            salidas.append((archivos.enter_context(archivo_atomico(os.path.join(directorio, trad))),
+                            fragmentos_trad))
+        if traduccion is not None:
+            f = archivos.enter_context(archivo_atomico(os.path.join(directorio, traduccion)))
+            if traductor is not None:
+                salida_fuente = f
+            else:
+                salidas.append((f, lambda ventana: fragmentos_traduccion(ventana, diccionario)))
+
+        for ventana in generar_tokens(trozos, errores_lexicos):
+            if cancelado and cancelado():
+                raise AnalisisCancelado()
+            total += len(ventana)
+            verificador.procesar(ventana)
+            if traductor is not None:
+                salida_fuente.writelines(traductor.procesar(ventana))
+            if salidas:
+                # Como en post_procesar_tokens, las declaraciones no pasan a la salida
+                if TIPO_DATO in ventana.tipos:
+                    ventana = ventana.seleccionar([k for k, tipo in enumerate(ventana.tipos) if tipo != TIPO_DATO])
+                for f, fragmentos in salidas:
+                    f.writelines(fragmentos(ventana))
+        verificador.terminar()
+        if traductor is not None:
+            salida_fuente.write(traductor.terminar())
+
+    return {
+        'tokens': total,
+        'errores_lexicos': errores_lexicos,
+        'errores_sintacticos': errores_sintacticos,
+        'diagnosticos': diagnosticos,
+    }
+
+
+def _registrar_trozos(trozos, traductor):
+    """Pasa los trozos tal cual, entregando antes cada uno a `traductor`."""
+    for trozo in trozos:
+        traductor.alimentar(trozo)
+        yield trozo
@@ -0,0 +1,95 @@
+"""
+Benchmark y comprobación diferencial del escáner rápido del analizador.
+
+Primero comprueba que analizador.tokenizar_rapido produce exactamente lo mismo
+que el lexer de PLY (tokens, tipos, líneas, posiciones y errores) sobre los
+ejemplos del repositorio, programas generados y textos aleatorios armados con
+fragmentos difíciles: comentarios sin cerrar, cadenas y caracteres mal
+formados, caracteres ilegales... Después mide los dos motores sobre programas
+de distinto tamaño.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_escaner
+    python -m benchmarks.bench_escaner --casos 5000 --max 100000
+"""
+import argparse
+import glob
+import os
+import random
+import time
+
+import analizador
+from benchmarks.bench_parser import generar_programa
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Piezas con las que se arman los textos aleatorios
+FRAGMENTOS = [
+    'int ', 'char ', 'return ', 'include', 'x', 'main', '_a1', ' ', '\t', '\n', '\n\n',
+    '/*', '*/', '*', '/', '//', '"', '"s"', '"a\\"b"', '\\', "'", "'a'", "'\\n'", "'ab'",
+    '<stdio.h>', '"mio.h"', '1', '12', '1.5', '.', '#', '{', '}', '(', ')', '[', ']', ';',
+    '@', '$', '`', 'é', '\r',
+]
+
+
+def casos_diferenciales(aleatorios, semilla=0):
+    """Textos sobre los que se comparan los dos motores."""
+    for ruta in sorted(glob.glob(os.path.join(RAIZ, 'ejemplos_c', '*.c'))) + [os.path.join(RAIZ, 'hello.c')]:
+        with open(ruta, encoding='utf-8') as f:
+            yield f.read()
+    yield generar_programa(600)
+    azar = random.Random(semilla)
+    for _ in range(aleatorios):
+        yield ''.join(azar.choice(FRAGMENTOS) for _ in range(azar.randint(0, 300)))
+
+
+def comparar(codigo):
+    """Devuelve una descripción de la primera diferencia entre los motores, o None."""
+    tokens_ply, errores_ply = analizador.tokenizar(codigo, motor='ply')
+    tokens_rapido, errores_rapido = analizador.tokenizar_rapido(codigo)
+    if errores_ply != errores_rapido:
+        return f"errores distintos: {errores_ply[:3]} != {errores_rapido[:3]}"
+    for columna in ('tipos', 'lineas', 'inicios', 'fines', 'valores'):
+        esperado, obtenido = getattr(tokens_ply, columna), getattr(tokens_rapido, columna)
+        if esperado != obtenido:
+            i = next((k for k, (a, b) in enumerate(zip(esperado, obtenido)) if a != b),
+                     min(len(esperado), len(obtenido)))
+            return f"columna {columna} distinta en el token {i} (de {len(esperado)} y {len(obtenido)})"
+    return None
+
+
+def medir(motor, codigo, repeticiones=3):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        analizador.tokenizar(codigo, motor=motor)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--casos', type=int, default=2000, help="textos aleatorios de la comprobación")
+    parser.add_argument('--max', type=int, default=200_000, help="número máximo de sentencias")
+    args = parser.parse_args()
+
+    total = 0
+    for codigo in casos_diferenciales(args.casos):
+        total += 1
+        diferencia = comparar(codigo)
+        if diferencia:
+            raise SystemExit(f"Los motores difieren en el caso {total} ({codigo[:60]!r}...): {diferencia}")
+    print(f"Comprobación diferencial: {total} casos idénticos\n")
+
+    tamanos = [n for n in (1_000, 10_000, 100_000, 200_000) if n <= args.max] or [args.max]
+    print(f"{'sentencias':>10} {'KB':>8} {'tokens':>9} {'ply (s)':>8} {'rápido (s)':>10} {'aceleración':>11}")
+    for n in tamanos:
+        codigo = generar_programa(n)
+        tokens = len(analizador.tokenizar_rapido(codigo)[0])
+        t_ply = medir('ply', codigo)
+        t_rapido = medir('rapido', codigo)
+        print(f"{n:>10} {len(codigo) // 1024:>8} {tokens:>9} {t_ply:>8.3f} {t_rapido:>10.3f} {t_ply / t_rapido:>10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark de escalado de analizador.post_procesar_tokens y de su pasada de índices.
+
+Lexea programas generados (funciones con parámetros, bucles for, llamadas y
+returns) de 1k a 1M tokens y mide el tiempo por token. Con los índices
+precalculados el tiempo por token debe mantenerse constante; la columna
+"escala" compara cada tamaño con el primero.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_indices
+    python -m benchmarks.bench_indices --max 100000
+"""
+import argparse
+import time
+
+import analizador
+
+# Fragmento de código que se repite, una vez por línea
+FRAGMENTO = "int suma(int a, int b) { for (int i = 0; i < b; i = i + 1) { a = f(a, i); } return a; }\n"
+
+
+def generar_tokens(cantidad):
+    """
+    Devuelve una TablaTokens de `cantidad` tokens, lexeando con
+    analizador.tokenizar un programa que repite FRAGMENTO, para que la
+    medida recorra la misma mezcla de tipos que produce el lexer real.
+    """
+    por_fragmento = len(analizador.tokenizar(FRAGMENTO)[0])
+    tokens, _ = analizador.tokenizar(FRAGMENTO * -(-cantidad // por_fragmento))
+    if len(tokens) > cantidad:
+        tokens = tokens.seleccionar(range(cantidad))
+    return tokens
+
+
+def medir(funcion, *args):
+    inicio = time.perf_counter()
+    funcion(*args)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--max', type=int, default=1_000_000, help="tamaño máximo en tokens")
+    args = parser.parse_args()
+
+    tamanos = []
+    n = 1000
+    while n <= args.max:
+        tamanos.append(n)
+        n *= 10
+
+    print(f"{'tokens':>10} {'índices (s)':>12} {'ns/token':>9} {'post-proceso (s)':>17} {'ns/token':>9} {'escala':>7}")
+    referencia = None
+    for n in tamanos:
+        tokens = generar_tokens(n)
+        t_indices = medir(analizador.construir_indices, tokens)
+        t_total = medir(analizador.post_procesar_tokens, tokens, [], {}, set())
+        por_token = t_total / n * 1e9
+        if referencia is None:
+            referencia = por_token
+        print(f"{n:>10} {t_indices:>12.4f} {t_indices / n * 1e9:>9.0f} {t_total:>17.4f} {por_token:>9.0f} {por_token / referencia:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark de escalado del parser de analisis.py.
+
+Genera funciones con 10k a 100k sentencias (declaraciones, asignaciones,
+llamadas, if, while y return) y mide el tiempo de parser.parse. Las listas de
+sentencias se construyen agregando en sitio, así que el tiempo por sentencia
+debe mantenerse constante; la columna "escala" compara cada tamaño con el
+primero. Con --memoria se mide también la memoria que retiene el AST (con
+tracemalloc, en un parse aparte).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_parser
+    python -m benchmarks.bench_parser --max 50000
+    python -m benchmarks.bench_parser --max 50000 --memoria
+"""
+import argparse
+import contextlib
+import gc
+import io
+import time
+import tracemalloc
+
+import analisis
+
+# Bloque de SENTENCIAS_POR_BLOQUE sentencias que se repite dentro de main
+BLOQUE = """    int x{n};
+    x{n} = {n} + 1;
+    printf("hola");
+    if (x{n} > 2) {{
+        x{n} = x{n} * 2;
+    }}
+    while (x{n} < 10) {{
+        x{n} = x{n} + 1;
+    }}
+    return x{n};
+"""
+SENTENCIAS_POR_BLOQUE = 6
+
+
+def generar_programa(sentencias):
+    """Devuelve un programa C con una función main de unas `sentencias` sentencias."""
+    partes = ["#include <stdio.h>\n", "int main() {\n"]
+    for n in range(max(1, sentencias // SENTENCIAS_POR_BLOQUE)):
+        partes.append(BLOQUE.format(n=n))
+    partes.append("}\n")
+    return ''.join(partes)
+
+
+def medir_parse(codigo):
+    lexer = analisis.crear_lexer()
+    # p_error imprime cada error de sintaxis; no deben aparecer, pero no ensucian la tabla
+    with contextlib.redirect_stdout(io.StringIO()) as salida:
+        inicio = time.perf_counter()
+        arbol = analisis.obtener_parser().parse(codigo, lexer=lexer)
+        segundos = time.perf_counter() - inicio
+    if arbol is None or salida.getvalue():
+        raise RuntimeError(f"el programa generado no se pudo analizar: {salida.getvalue()[:200]}")
+    return segundos
+
+
+def memoria_arbol(codigo):
+    """MB que retiene el AST de `codigo`: lo que se libera al descartarlo."""
+    parser = analisis.obtener_parser()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            arbol = parser.parse(codigo, lexer=analisis.crear_lexer())
+        del parser.symstack[:]
+        gc.collect()
+        con_arbol = tracemalloc.get_traced_memory()[0]
+        del arbol
+        gc.collect()
+        return (con_arbol - tracemalloc.get_traced_memory()[0]) / (1 << 20)
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--max', type=int, default=100_000, help="número máximo de sentencias")
+    parser.add_argument('--memoria', action='store_true', help="medir la memoria del AST (más lento)")
+    args = parser.parse_args()
+
+    tamanos = [n for n in (10_000, 20_000, 50_000, 100_000) if n <= args.max] or [args.max]
+
+    print(f"{'sentencias':>10} {'parse (s)':>10} {'µs/sentencia':>13} {'escala':>7}"
+          + (f" {'AST MB':>8}" if args.memoria else ''))
+    referencia = None
+    for n in tamanos:
+        codigo = generar_programa(n)
+        t = medir_parse(codigo)
+        por_sentencia = t / n * 1e6
+        if referencia is None:
+            referencia = por_sentencia
+        print(f"{n:>10} {t:>10.3f} {por_sentencia:>13.2f} {por_sentencia / referencia:>7.2f}"
+              + (f" {memoria_arbol(codigo):>8.2f}" if args.memoria else ''))
+
+
+if __name__ == '__main__':
+    main()
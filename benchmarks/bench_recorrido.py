@@ -0,0 +1,102 @@
+"""
+Benchmark del recorrido del AST sobre programas muy anidados.
+
+Genera funciones con cadenas de if/while anidados y con expresiones muy largas
+(cada suma cuelga de la anterior, así que la profundidad del árbol crece con el
+número de términos) y mide el parse y el recorrido con nodos_ast.Visitante,
+que usa una pila explícita. Como referencia se recorre el mismo árbol con una
+función recursiva, que falla con RecursionError en cuanto la profundidad pasa
+el límite de recursión de Python.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_recorrido
+    python -m benchmarks.bench_recorrido --max 20000
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import analisis
+from nodos_ast import Visitante
+
+
+def generar_anidado(profundidad):
+    """main con `profundidad` if/while anidados alternados."""
+    partes = ["int main() {\n", "int x = 0;\n"]
+    for n in range(profundidad):
+        partes.append("if (x < 10) {\n" if n % 2 == 0 else "while (x > 1) {\n")
+    partes.append("x = x + 1;\n")
+    partes.append("}\n" * profundidad)
+    partes.append("}\n")
+    return ''.join(partes)
+
+
+def generar_expresion(terminos):
+    """main con una asignación de `terminos` sumandos."""
+    return "int main() {\nint x = 0;\nx = " + " + ".join(["x"] * terminos) + ";\n}\n"
+
+
+class Contador(Visitante):
+    """Cuenta los nodos visitados."""
+    def __init__(self):
+        self.nodos = 0
+
+    def visitar_hijos(self, nodo):
+        self.nodos += 1
+        Visitante.visitar_hijos(self, nodo)
+
+
+def contar_recursivo(nodo):
+    """Recorrido recursivo de referencia, como el antiguo traverse_tree."""
+    if isinstance(nodo, list):
+        return sum(contar_recursivo(hijo) for hijo in nodo)
+    total = 1
+    for campo in nodo.hijos:
+        hijo = getattr(nodo, campo)
+        if hijo is not None:
+            total += contar_recursivo(hijo)
+    return total
+
+
+def medir(codigo):
+    lexer = analisis.crear_lexer()
+    with contextlib.redirect_stdout(io.StringIO()) as salida:
+        inicio = time.perf_counter()
+        arbol = analisis.obtener_parser().parse(codigo, lexer=lexer)
+        t_parse = time.perf_counter() - inicio
+    if arbol is None:
+        raise RuntimeError(f"el programa generado no se pudo analizar: {salida.getvalue()[:200]}")
+
+    contador = Contador()
+    inicio = time.perf_counter()
+    contador.visitar(arbol)
+    t_pila = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    try:
+        contar_recursivo(arbol)
+        recursivo = f"{time.perf_counter() - inicio:.4f}"
+    except RecursionError:
+        recursivo = "RecursionError"
+    return contador.nodos, t_parse, t_pila, recursivo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--max', type=int, default=50_000, help="profundidad máxima")
+    args = parser.parse_args()
+
+    tamanos = [n for n in (100, 1_000, 10_000, 50_000) if n <= args.max] or [args.max]
+
+    print(f"{'programa':>10} {'profundidad':>11} {'nodos':>8} {'parse (s)':>10} "
+          f"{'pila (s)':>9} {'µs/nodo':>8} {'recursivo (s)':>15}")
+    for nombre, generar in (('anidado', generar_anidado), ('expresión', generar_expresion)):
+        for n in tamanos:
+            nodos, t_parse, t_pila, recursivo = medir(generar(n))
+            print(f"{nombre:>10} {n:>11} {nodos:>8} {t_parse:>10.3f} "
+                  f"{t_pila:>9.4f} {t_pila / nodos * 1e6:>8.2f} {recursivo:>15}")
+
+
+if __name__ == '__main__':
+    main()
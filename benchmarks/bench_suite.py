@@ -0,0 +1,304 @@
+"""
+Suite de benchmarks por etapa del analizador y del parser.
+
+Mide por separado cada etapa (lexer de PLY, escáner rápido, post_procesar_tokens,
+comprobaciones estructurales, traducción, escritura de los archivos de salida
+y el parse de analisis.py) sobre el corpus ejemplos_c/*.c y sobre programas
+generados de 1 KB a 100 MB. Por cada etapa y entrada informa del tiempo, el
+rendimiento (tokens/s y MB/s), el RSS pico del proceso y el pico de bytes
+asignados según tracemalloc (el máximo vivo a la vez durante la etapa, no el
+número de asignaciones).
+
+Cada medida se hace en un proceso nuevo, así que el RSS pico de una etapa no
+arrastra el de las anteriores (sí incluye los datos que la etapa recibe, por
+ejemplo la tabla de tokens). Los resultados se pueden guardar como línea base
+y comparar con una ejecución posterior para detectar regresiones.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --max 100MB --max-parse 10MB
+    python -m benchmarks.bench_suite --etapas lexico traduccion --guardar antes
+    python -m benchmarks.bench_suite --comparar antes --umbral 0.15
+"""
+import argparse
+import contextlib
+import gc
+import glob
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import analisis
+import analizador
+from benchmarks.bench_parser import BLOQUE
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRECTORIO_LINEAS_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lineas_base')
+
+# Tamaños de los programas generados
+TAMANOS = (1 << 10, 10 << 10, 100 << 10, 1 << 20, 10 << 20, 100 << 20)
+UNIDADES = {'KB': 1 << 10, 'MB': 1 << 20, 'GB': 1 << 30}
+
+# Hasta este tamaño cada etapa se repite (al menos REPETICIONES veces y hasta
+# sumar TIEMPO_MINIMO segundos) y se toma el mejor tiempo
+TAMANO_REPETICION = 1 << 20
+REPETICIONES = 3
+TIEMPO_MINIMO = 0.5
+
+
+def leer_tamano(texto):
+    """'10MB' -> 10485760; también acepta un número de bytes."""
+    texto = texto.strip().upper()
+    for unidad, factor in UNIDADES.items():
+        if texto.endswith(unidad):
+            return int(float(texto[:-len(unidad)]) * factor)
+    return int(texto)
+
+
+def nombre_tamano(tamano):
+    for unidad, factor in reversed(UNIDADES.items()):
+        if tamano >= factor and tamano % factor == 0:
+            return f"{tamano // factor}{unidad}"
+    return f"{tamano}B"
+
+
+def generar_por_tamano(tamano):
+    """Programa C con una función main de aproximadamente `tamano` bytes."""
+    partes = ["#include <stdio.h>\n", "int main() {\n"]
+    total = sum(map(len, partes)) + 2
+    n = 0
+    while total < tamano:
+        bloque = BLOQUE.format(n=n)
+        partes.append(bloque)
+        total += len(bloque)
+        n += 1
+    partes.append("}\n")
+    return ''.join(partes)
+
+
+def textos_entrada(entrada):
+    """Textos de una entrada: los archivos del corpus o un programa generado."""
+    if entrada == 'ejemplos_c':
+        textos = []
+        for ruta in sorted(glob.glob(os.path.join(RAIZ, 'ejemplos_c', '*.c'))):
+            with open(ruta, encoding='utf-8') as f:
+                textos.append(f.read())
+        return textos
+    return [generar_por_tamano(leer_tamano(entrada))]
+
+
+# --- Etapas ---
+#
+# Cada etapa recibe un texto, prepara fuera de la medida lo que necesita (por
+# ejemplo, los tokens para post_procesar_tokens) y devuelve (tokens, medir),
+# donde medir() ejecuta solo la etapa. `recursos` es un contextlib.ExitStack
+# que se cierra al terminar la medida (por ejemplo, para borrar un directorio
+# temporal).
+
+def etapa_lexico(codigo, recursos):
+    return len(analizador.tokenizar(codigo, motor='ply')[0]), lambda: analizador.tokenizar(codigo, motor='ply')
+
+
+def etapa_lexico_rapido(codigo, recursos):
+    return len(analizador.tokenizar_rapido(codigo)[0]), lambda: analizador.tokenizar_rapido(codigo)
+
+
+def etapa_post_procesado(codigo, recursos):
+    tokens, _ = analizador.tokenizar(codigo)
+    return len(tokens), lambda: analizador.post_procesar_tokens(tokens, [], {}, set())
+
+
+def etapa_estructural(codigo, recursos):
+    tokens, _ = analizador.tokenizar(codigo)
+    return len(tokens), lambda: analizador.detectar_errores_estructurales(tokens, [])
+
+
+def etapa_traduccion(codigo, recursos):
+    procesados = analizador.analizar_codigo(codigo)['tokens']
+
+    def medir():
+        for _ in analizador.fragmentos_traduccion(procesados):
+            pass
+    return len(procesados), medir
+
+
+def etapa_escritura(codigo, recursos):
+    resultado = analizador.analizar_codigo(codigo)
+    directorio = recursos.enter_context(tempfile.TemporaryDirectory(prefix='bench_suite_'))
+    return len(resultado['tokens']), lambda: analizador.escribir_archivos(resultado, directorio)
+
+
+def etapa_parse(codigo, recursos):
+    tokens = len(analizador.tokenizar(codigo)[0])
+    analisis.obtener_parser()
+
+    def medir():
+        # p_error imprime los errores de sintaxis del corpus; no deben ensuciar la tabla
+        with contextlib.redirect_stdout(io.StringIO()):
+            analisis.obtener_parser().parse(codigo, lexer=analisis.crear_lexer())
+    return tokens, medir
+
+
+ETAPAS = {
+    'lexico': etapa_lexico,
+    'lexico_rapido': etapa_lexico_rapido,
+    'post_procesado': etapa_post_procesado,
+    'estructural': etapa_estructural,
+    'traduccion': etapa_traduccion,
+    'escritura': etapa_escritura,
+    'parse': etapa_parse,
+}
+
+
+def medir_etapa(etapa, entrada, asignaciones=True):
+    """Mide una etapa sobre una entrada. Se ejecuta en un proceso propio."""
+    with contextlib.ExitStack() as recursos:
+        return _medir_etapa(etapa, entrada, asignaciones, recursos)
+
+
+def _medir_etapa(etapa, entrada, asignaciones, recursos):
+    textos = textos_entrada(entrada)
+    preparadas = [ETAPAS[etapa](codigo, recursos) for codigo in textos]
+    tokens = sum(n for n, _ in preparadas)
+    tamano = sum(len(codigo.encode('utf-8')) for codigo in textos)
+    repeticiones = REPETICIONES if tamano <= TAMANO_REPETICION else 1
+
+    gc.collect()
+    segundos = float('inf')
+    total = 0.0
+    hechas = 0
+    while hechas < repeticiones or (tamano <= TAMANO_REPETICION and total < TIEMPO_MINIMO):
+        inicio = time.perf_counter()
+        for _, medir in preparadas:
+            medir()
+        transcurrido = time.perf_counter() - inicio
+        segundos = min(segundos, transcurrido)
+        total += transcurrido
+        hechas += 1
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+    asignado_pico = None
+    if asignaciones:
+        gc.collect()
+        tracemalloc.start()
+        for _, medir in preparadas:
+            medir()
+        asignado_pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'entrada': entrada,
+        'etapa': etapa,
+        'bytes': tamano,
+        'tokens': tokens,
+        'segundos': segundos,
+        'tokens_por_segundo': tokens / segundos if segundos else None,
+        'mb_por_segundo': tamano / (1 << 20) / segundos if segundos else None,
+        'rss_pico_mb': rss_pico / (1 << 20),
+        'asignado_pico_mb': None if asignado_pico is None else asignado_pico / (1 << 20),
+    }
+
+
+def medir_en_proceso(etapa, entrada, asignaciones):
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(medir_etapa, etapa, entrada, asignaciones).result()
+
+
+# --- Líneas base ---
+
+def ruta_linea_base(nombre):
+    return nombre if nombre.endswith('.json') else os.path.join(DIRECTORIO_LINEAS_BASE, nombre + '.json')
+
+
+def guardar_linea_base(nombre, resultados):
+    ruta = ruta_linea_base(nombre)
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    datos = {
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'version_analizador': analizador.VERSION_ANALIZADOR,
+        'resultados': resultados,
+    }
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    return ruta
+
+
+def comparar_linea_base(nombre, resultados, umbral):
+    """
+    Compara el rendimiento (tokens/s) con la línea base e imprime la variación
+    de cada medida. Devuelve las medidas que empeoraron más que `umbral`.
+    """
+    with open(ruta_linea_base(nombre), encoding='utf-8') as f:
+        base = json.load(f)
+    anteriores = {(r['entrada'], r['etapa']): r for r in base['resultados']}
+
+    print(f"\nComparación con '{nombre}' ({base['fecha']}, analizador {base['version_analizador']}):")
+    regresiones = []
+    for r in resultados:
+        anterior = anteriores.get((r['entrada'], r['etapa']))
+        if anterior is None or not anterior['tokens_por_segundo'] or not r['tokens_por_segundo']:
+            continue
+        cambio = r['tokens_por_segundo'] / anterior['tokens_por_segundo'] - 1
+        marca = ''
+        if cambio < -umbral:
+            marca = '  REGRESIÓN'
+            regresiones.append(r)
+        print(f"  {r['entrada']:>10} {r['etapa']:>14} {cambio:>+8.1%}{marca}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--max', default='10MB', help="tamaño máximo de los programas generados (hasta 100MB)")
+    parser.add_argument('--max-parse', default='1MB', help="tamaño máximo para la etapa de parse")
+    parser.add_argument('--etapas', nargs='+', choices=list(ETAPAS), default=list(ETAPAS))
+    parser.add_argument('--sin-corpus', action='store_true', help="no medir ejemplos_c")
+    parser.add_argument('--sin-asignaciones', action='store_true',
+                        help="no medir con tracemalloc (más rápido en entradas grandes)")
+    parser.add_argument('--guardar', metavar='NOMBRE', help="guardar los resultados como línea base")
+    parser.add_argument('--comparar', metavar='NOMBRE', help="comparar con una línea base guardada")
+    parser.add_argument('--umbral', type=float, default=0.10,
+                        help="pérdida de rendimiento que se considera regresión (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    maximo = leer_tamano(args.max)
+    maximo_parse = leer_tamano(args.max_parse)
+    entradas = ([] if args.sin_corpus else [('ejemplos_c', 0)]) + \
+        [(nombre_tamano(t), t) for t in TAMANOS if t <= maximo]
+
+    print(f"{'entrada':>10} {'etapa':>14} {'tokens':>10} {'s':>9} {'tokens/s':>11} {'MB/s':>7} "
+          f"{'RSS pico MB':>11} {'tracemalloc pico MB':>19}")
+    resultados = []
+    for entrada, tamano in entradas:
+        for etapa in args.etapas:
+            if etapa == 'parse' and tamano > maximo_parse:
+                continue
+            r = medir_en_proceso(etapa, entrada, not args.sin_asignaciones)
+            resultados.append(r)
+            asignado = '-' if r['asignado_pico_mb'] is None else f"{r['asignado_pico_mb']:.1f}"
+            print(f"{entrada:>10} {etapa:>14} {r['tokens']:>10} {r['segundos']:>9.4f} "
+                  f"{r['tokens_por_segundo']:>11.0f} {r['mb_por_segundo']:>7.2f} "
+                  f"{r['rss_pico_mb']:>11.1f} {asignado:>19}", flush=True)
+
+    if args.guardar:
+        print(f"\nLínea base guardada en {guardar_linea_base(args.guardar, resultados)}")
+    if args.comparar:
+        regresiones = comparar_linea_base(args.comparar, resultados, args.umbral)
+        if regresiones:
+            print(f"\n{len(regresiones)} medida(s) empeoraron más de un {args.umbral:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
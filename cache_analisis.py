@@ -0,0 +1,196 @@
+"""
+Caché de resultados del analizador por contenido.
+
+La clave es un hash rápido (BLAKE2b) del texto analizado junto con la versión
+del analizador, así que analizar dos veces el mismo texto con el mismo código
+devuelve el resultado guardado sin repetir ninguna etapa. En memoria se guarda
+un LRU limitado por un tamaño aproximado en bytes; opcionalmente, un directorio
+en disco conserva los resultados entre ejecuciones (por ejemplo, para que
+`python -m lote --cache DIR` se salte los archivos que no cambiaron).
+
+Los resultados devueltos se comparten entre quienes los piden: se tratan como
+de solo lectura. Un resultado que leyó cabeceras locales solo se devuelve si
+ninguna cambió desde entonces, ni apareció una cabecera que antes no estaba.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+import analizador
+import preprocesador
+
+log = logging.getLogger('analizador')
+
+# Tamaño máximo por defecto de la parte en memoria
+MEMORIA_MAXIMA = 256 << 20
+
+
+def clave_contenido(contenido, version=analizador.VERSION_ANALIZADOR, funciones_externas=(), directorio=None):
+    """
+    Clave de caché de `contenido` (el texto, o los bytes de un archivo, por
+    ejemplo un mmap) para la versión indicada del analizador. Las funciones
+    externas de un proyecto y los directorios donde se buscan las cabeceras
+    (`directorio`, o el actual si no se indica, y RUTAS_INCLUSION del
+    preprocesador) cambian el resultado, así que también entran en la clave.
+    """
+    if isinstance(contenido, str):
+        contenido = contenido.encode('utf-8', 'surrogatepass')
+    return _clave(hashlib.blake2b(contenido, digest_size=16), version, funciones_externas, directorio)
+
+
+def resumen_linea(texto):
+    """Resumen de una línea de texto para clave_bloques."""
+    return hashlib.blake2b(texto.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+def clave_bloques(resumenes, version=analizador.VERSION_ANALIZADOR, funciones_externas=(), directorio=None):
+    """
+    Clave de caché de un texto dado por los resúmenes de sus líneas (los de
+    resumen_linea), como los que guarda el editor para cada bloque: así no hace
+    falta reunir el texto completo. Se usa otro dominio de hash, de modo que
+    nunca coincide con una clave de clave_contenido.
+    """
+    resumen = hashlib.blake2b(digest_size=16, person=b'lineas')
+    for resumen_de_linea in resumenes:
+        resumen.update(resumen_de_linea)
+    return _clave(resumen, version, funciones_externas, directorio)
+
+
+def _clave(resumen, version, funciones_externas, directorio):
+    # Como en preprocesador.preprocesar: sin directorio se busca en el actual
+    contexto = '\0'.join([directorio or os.getcwd(), *sorted(funciones_externas)])
+    if preprocesador.RUTAS_INCLUSION:
+        contexto += '\1' + '\0'.join(map(os.path.abspath, preprocesador.RUTAS_INCLUSION))
+    contexto = contexto.encode('utf-8', 'surrogatepass')
+    return f"{version}-{resumen.hexdigest()}-{hashlib.blake2b(contexto, digest_size=8).hexdigest()}"
+
+
+def tamano_resultado(resultado):
+    """Tamaño aproximado en bytes de un resultado de analizador.analizar_tokens."""
+    tokens = resultado['tokens']
+    tamano = sys.getsizeof(tokens.valores)
+    for columna in (tokens.tipos, tokens.lineas, tokens.inicios, tokens.fines):
+        tamano += columna.itemsize * len(columna)
+    # Los valores repetidos (palabras reservadas, símbolos) están internados;
+    # cuentan una vez por token como una aproximación por exceso de los demás
+    tamano += sum(len(valor) for valor in tokens.valores)
+    for clave in ('errores_lexicos', 'errores_sintacticos'):
+        tamano += sum(sys.getsizeof(mensaje) for mensaje in resultado[clave])
+    tamano += 72 * len(resultado['diagnosticos'])
+    tamano += 100 * (len(resultado['variables']) + len(resultado['funciones']))
+    return tamano
+
+
+class CacheAnalisis:
+    """
+    LRU de resultados de análisis con un tope de memoria y, si se indica
+    `directorio`, una segunda capa persistente en disco (un pickle por clave).
+    Es segura entre hilos.
+    """
+    def __init__(self, memoria_maxima=MEMORIA_MAXIMA, directorio=None):
+        self.memoria_maxima = memoria_maxima
+        self.directorio = directorio
+        self.memoria_usada = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()  # {clave: (resultado, tamaño)}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def clave(self, contenido, funciones_externas=(), directorio=None):
+        return clave_contenido(contenido, funciones_externas=funciones_externas, directorio=directorio)
+
+    def clave_bloques(self, resumenes, funciones_externas=(), directorio=None):
+        return clave_bloques(resumenes, funciones_externas=funciones_externas, directorio=directorio)
+
+    def obtener(self, clave):
+        """
+        Devuelve el resultado guardado para `clave`, o None si no está, si
+        alguna de las cabeceras que leyó cambió o si apareció alguna que no
+        encontró.
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+        # Las cabeceras se comprueban fuera del lock: son llamadas al sistema
+        if entrada is not None and preprocesador.cabeceras_vigentes(entrada[0].get('cabeceras', ())):
+            with self._lock:
+                if clave in self._entradas:
+                    self._entradas.move_to_end(clave)
+                self.aciertos += 1
+            return entrada[0]
+
+        resultado = self._leer_disco(clave)
+        if resultado is not None and not preprocesador.cabeceras_vigentes(resultado.get('cabeceras', ())):
+            resultado = None
+        with self._lock:
+            if resultado is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+            self._guardar_memoria(clave, resultado)
+        return resultado
+
+    def guardar(self, clave, resultado):
+        """Guarda `resultado` en memoria y, si hay directorio, en disco."""
+        with self._lock:
+            self._guardar_memoria(clave, resultado)
+        self._escribir_disco(clave, resultado)
+
+    def vaciar(self):
+        """Vacía la parte en memoria (la de disco se conserva)."""
+        with self._lock:
+            self._entradas.clear()
+            self.memoria_usada = 0
+
+    def _guardar_memoria(self, clave, resultado):
+        tamano = tamano_resultado(resultado)
+        anterior = self._entradas.pop(clave, None)
+        if anterior is not None:
+            self.memoria_usada -= anterior[1]
+        if tamano > self.memoria_maxima:
+            # Un resultado mayor que todo el tope no se guarda en memoria
+            return
+        self._entradas[clave] = (resultado, tamano)
+        self.memoria_usada += tamano
+        while self.memoria_usada > self.memoria_maxima:
+            _, (_, expulsado) = self._entradas.popitem(last=False)
+            self.memoria_usada -= expulsado
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave[-2:], clave + '.pickle')
+
+    def _leer_disco(self, clave):
+        if not self.directorio:
+            return None
+        try:
+            with open(self._ruta(clave), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning("Entrada de caché ilegible %s: %s", clave, e)
+            return None
+
+    def _escribir_disco(self, clave, resultado):
+        if not self.directorio:
+            return
+        ruta = self._ruta(clave)
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(temporal, 'wb') as f:
+                pickle.dump(resultado, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, ruta)
+        except OSError as e:
+            # La caché en disco es opcional: un fallo no interrumpe el análisis
+            log.warning("No se pudo guardar en caché %s: %s", clave, e)
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
@@ -0,0 +1,106 @@
+"""
+Diccionarios de traducción de las palabras reservadas de C.
+
+Cada idioma es un archivo resources/diccionarios/<código>.json con su nombre
+y la traducción de cada palabra reservada, por ejemplo:
+
+    {"nombre": "Español", "palabras": {"int": "entero", "if": "si", ...}}
+
+Los diccionarios se cargan una vez, al importar el módulo, y cada uno se
+compila en una tabla de solo lectura con exactamente las palabras de
+PALABRAS_C (una palabra que falta se deja sin traducir). El lexer clasifica
+los identificadores con PALABRAS_C, que no depende del idioma, así que elegir
+otro diccionario solo cambia la tabla que usa la traducción: el lexer no se
+vuelve a construir.
+"""
+import glob
+import json
+import logging
+import os
+from types import MappingProxyType
+
+log = logging.getLogger('analizador')
+
+DIRECTORIO_DICCIONARIOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources', 'diccionarios')
+
+# Idioma de la traducción si no se elige otro
+IDIOMA_PREDETERMINADO = 'es'
+
+# Palabras reservadas de C que reconoce el lexer
+PALABRAS_C = frozenset((
+    "auto", "break", "case", "char", "const", "continue", "default", "do", "double",
+    "else", "enum", "extern", "float", "for", "goto", "if", "inline", "int",
+    "long", "register", "restrict", "return", "short", "signed", "sizeof", "static", "struct",
+    "switch", "typedef", "union", "unsigned", "void", "volatile", "while", "include",
+))
+
+
+class Diccionario:
+    """Un idioma de traducción: su código, su nombre y la tabla palabra -> traducción."""
+    __slots__ = ('codigo', 'nombre', 'tabla')
+
+    def __init__(self, codigo, nombre, tabla):
+        self.codigo = codigo
+        self.nombre = nombre
+        self.tabla = tabla
+
+    def __repr__(self):
+        return f"Diccionario({self.codigo!r}, {self.nombre!r})"
+
+
+def compilar_diccionario(codigo, datos):
+    """
+    Compila los datos de un archivo de diccionario en un Diccionario. Lanza
+    ValueError si el formato no es válido o si traduce algo que no es una
+    palabra reservada de C.
+    """
+    palabras = datos.get('palabras') if isinstance(datos, dict) else None
+    if not isinstance(palabras, dict):
+        raise ValueError(f"el diccionario '{codigo}' no tiene un objeto 'palabras'")
+    desconocidas = sorted(set(palabras) - PALABRAS_C)
+    if desconocidas:
+        raise ValueError(f"el diccionario '{codigo}' traduce palabras que no son de C: {', '.join(desconocidas)}")
+    for palabra, traduccion in palabras.items():
+        if not isinstance(traduccion, str) or not traduccion:
+            raise ValueError(f"el diccionario '{codigo}' tiene una traducción vacía o no textual para '{palabra}'")
+
+    faltantes = PALABRAS_C - palabras.keys()
+    if faltantes:
+        log.warning("El diccionario '%s' no traduce: %s", codigo, ', '.join(sorted(faltantes)))
+    tabla = {palabra: palabras.get(palabra, palabra) for palabra in sorted(PALABRAS_C)}
+    return Diccionario(codigo, datos.get('nombre', codigo), MappingProxyType(tabla))
+
+
+def cargar_diccionarios(directorio=DIRECTORIO_DICCIONARIOS):
+    """
+    Carga todos los diccionarios de `directorio`, ordenados por código. Un
+    archivo inválido se omite con un aviso en el log.
+    """
+    cargados = {}
+    for ruta in sorted(glob.glob(os.path.join(directorio, '*.json'))):
+        codigo = os.path.splitext(os.path.basename(ruta))[0]
+        try:
+            with open(ruta, encoding='utf-8') as f:
+                cargados[codigo] = compilar_diccionario(codigo, json.load(f))
+        except (OSError, ValueError) as e:
+            log.warning("No se pudo cargar el diccionario %s: %s", ruta, e)
+    return cargados
+
+
+DICCIONARIOS = cargar_diccionarios()
+
+
+def obtener(idioma=None):
+    """
+    Diccionario de `idioma` (un código como 'es', o un Diccionario, que se
+    devuelve tal cual). Sin idioma, el predeterminado. Lanza ValueError si el
+    idioma no está cargado.
+    """
+    if isinstance(idioma, Diccionario):
+        return idioma
+    codigo = idioma or IDIOMA_PREDETERMINADO
+    try:
+        return DICCIONARIOS[codigo]
+    except KeyError:
+        disponibles = ', '.join(DICCIONARIOS) or 'ninguno'
+        raise ValueError(f"Idioma desconocido: '{codigo}' (disponibles: {disponibles})") from None
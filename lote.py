@@ -0,0 +1,336 @@
+"""
+Análisis por lotes sin interfaz gráfica.
+
+Analiza todos los archivos C indicados (directorios, globs o rutas sueltas)
+repartiéndolos en un pool de procesos. Por cada archivo puede generar los
+mismos trad.txt, traduccion.txt y errores.txt que el editor, en un directorio
+propio bajo --salida, y/o un único reporte JSON con el resumen de todos.
+Con --cache, los resultados se guardan en disco por contenido y los archivos
+que no cambiaron desde la última ejecución no se vuelven a analizar. Con
+--flujo, cada archivo se traduce en flujo con memoria acotada (solo trad.txt y
+traduccion.txt, con los errores léxicos y estructurales).
+
+Con --conservar-formato, traduccion.txt conserva la disposición del código
+original y solo cambia las palabras reservadas. Con --idioma, las palabras
+reservadas se traducen con otro diccionario de resources/diccionarios/.
+
+Con --proyecto, todos los archivos forman un solo programa: una primera fase
+lexea cada .c/.h en paralelo y arma el índice de las funciones declaradas en
+cualquiera de ellos; la segunda analiza cada archivo, también en paralelo,
+contra ese índice, así que una llamada a una función de otro archivo no es
+"Función no declarada".
+
+Uso (desde la raíz del repositorio):
+    python -m lote ejemplos_c/
+    python -m lote "entregas/**/*.c" --workers 8 --json reporte.json
+    python -m lote ejemplos_c/ --salida resultados/
+    python -m lote ejemplos_c/ --cache .cache_analisis/
+    python -m lote generados/ --flujo --salida resultados/
+    python -m lote proyecto/ --proyecto --json reporte.json
+    python -m lote ejemplos_c/ --salida resultados/ --conservar-formato
+    python -m lote ejemplos_c/ --salida resultados/ --idioma pt
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import analizador
+import diccionarios
+from cache_analisis import CacheAnalisis
+
+EXTENSIONES_C = ('.c', '.h')
+
+# Caché de cada proceso del pool, por directorio (las entradas en disco se comparten)
+_caches = {}
+
+# Funciones del proyecto en cada proceso del pool: se envían una vez por proceso
+# al crearlo, no con cada archivo
+_funciones_proyecto = frozenset()
+
+
+def obtener_cache(directorio):
+    """Caché de resultados con capa en disco en `directorio`, una por proceso."""
+    cache = _caches.get(directorio)
+    if cache is None:
+        cache = _caches[directorio] = CacheAnalisis(directorio=directorio)
+    return cache
+
+
+def buscar_archivos(entradas):
+    """
+    Expande directorios (recursivamente), globs y rutas sueltas a una lista
+    ordenada y sin duplicados de archivos C.
+    """
+    archivos = []
+    vistos = set()
+
+    def agregar(ruta):
+        ruta = os.path.normpath(ruta)
+        if ruta not in vistos:
+            vistos.add(ruta)
+            archivos.append(ruta)
+
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            for raiz, directorios, nombres in os.walk(entrada):
+                directorios.sort()
+                for nombre in sorted(nombres):
+                    if nombre.endswith(EXTENSIONES_C):
+                        agregar(os.path.join(raiz, nombre))
+        elif os.path.isfile(entrada):
+            agregar(entrada)
+        else:
+            for ruta in sorted(glob.glob(entrada, recursive=True)):
+                if os.path.isfile(ruta) and ruta.endswith(EXTENSIONES_C):
+                    agregar(ruta)
+    return archivos
+
+
+def directorio_salida(ruta, salida):
+    """Directorio de salida de `ruta`: su ruta relativa (sin extensión) bajo `salida`."""
+    relativa = os.path.relpath(ruta)
+    if relativa.startswith(os.pardir):
+        relativa = os.path.abspath(ruta).lstrip(os.sep)
+    return os.path.join(salida, os.path.splitext(relativa)[0])
+
+
+def traducir_archivo(ruta, salida=None, omitir=(), conservar_formato=False, idioma=None):
+    """
+    Traduce un archivo con analizador.traducir_en_flujo, sin guardar su tabla
+    de tokens completa, y devuelve su resumen. El análisis de declaraciones y
+    llamadas necesita el programa completo, así que el resumen no incluye
+    variables ni funciones y no se escribe errores.txt.
+    """
+    inicio = time.perf_counter()
+    try:
+        rutas = {'trad': None, 'traduccion': None}
+        destino = '.'
+        if salida:
+            destino = directorio_salida(ruta, salida)
+            os.makedirs(destino, exist_ok=True)
+            rutas = {clave: None if clave in omitir else analizador.ARCHIVOS_SALIDA[clave] for clave in rutas}
+        with analizador.mapear_archivo(ruta) as datos:
+            resultado = analizador.traducir_en_flujo(analizador.trozos_texto(datos), destino, **rutas,
+                                                     conservar_formato=conservar_formato, idioma=idioma)
+    except Exception as e:
+        return {'archivo': ruta, 'fallo': f"{type(e).__name__}: {e}"}
+
+    return {
+        'archivo': ruta,
+        'tokens': resultado['tokens'],
+        'errores_lexicos': resultado['errores_lexicos'],
+        'errores_sintacticos': resultado['errores_sintacticos'],
+        'segundos': round(time.perf_counter() - inicio, 4),
+    }
+
+
+def indexar_archivo(ruta):
+    """Primera fase del modo proyecto: las funciones que declara `ruta`."""
+    try:
+        tokens, _ = analizador.tokenizar_archivo(ruta)
+    except Exception as e:
+        return {'archivo': ruta, 'fallo': f"{type(e).__name__}: {e}"}
+    return {'archivo': ruta, 'funciones': sorted(analizador.funciones_declaradas_en(tokens))}
+
+
+def analizar_archivo(ruta, salida=None, omitir=(), cache=None, flujo=False, conservar_formato=False,
+                     idioma=None, funciones_externas=frozenset()):
+    """
+    Analiza un archivo y devuelve su resumen (serializable para el pool y para
+    el reporte JSON). Si se indica `salida`, escribe también sus archivos,
+    salvo los nombrados en `omitir` ('trad', 'traduccion' o 'errores'). Con
+    `cache` (un directorio), un contenido ya analizado no se vuelve a analizar.
+    Con `flujo`, el archivo se traduce con traducir_archivo. Con
+    `conservar_formato`, traduccion.txt conserva el formato del archivo.
+    `idioma` es el código del diccionario de la traducción.
+    `funciones_externas` son las funciones declaradas en otros archivos del
+    proyecto.
+    """
+    if flujo:
+        return traducir_archivo(ruta, salida, omitir, conservar_formato, idioma)
+    inicio = time.perf_counter()
+    try:
+        cache_analisis = obtener_cache(cache) if cache else None
+        aciertos = cache_analisis.aciertos if cache_analisis else 0
+        # Se lexea desde el mapeo en memoria, sin cargar el archivo entero en una cadena
+        resultado = analizador.analizar_archivo(ruta, cache=cache_analisis, funciones_externas=funciones_externas)
+        en_cache = bool(cache_analisis) and cache_analisis.aciertos > aciertos
+        if salida:
+            destino = directorio_salida(ruta, salida)
+            os.makedirs(destino, exist_ok=True)
+            rutas = {clave: None if clave in omitir else nombre
+                     for clave, nombre in analizador.ARCHIVOS_SALIDA.items()}
+            fuente = None
+            if conservar_formato and rutas['traduccion'] is not None:
+                with analizador.mapear_archivo(ruta) as datos:
+                    fuente = ''.join(analizador.trozos_texto(datos))
+            analizador.escribir_archivos(resultado, destino, **rutas, fuente=fuente, idioma=idioma)
+    except Exception as e:
+        return {'archivo': ruta, 'fallo': f"{type(e).__name__}: {e}"}
+
+    return {
+        'archivo': ruta,
+        'tokens': len(resultado['tokens']),
+        'errores_lexicos': resultado['errores_lexicos'],
+        'errores_sintacticos': resultado['errores_sintacticos'],
+        'variables': resultado['variables'],
+        'funciones': sorted(resultado['funciones']),
+        'en_cache': en_cache,
+        'segundos': round(time.perf_counter() - inicio, 4),
+    }
+
+
+def _iniciar_proceso(funciones_externas):
+    global _funciones_proyecto
+    _funciones_proyecto = funciones_externas
+
+
+def _analizar_en_pool(argumentos):
+    return analizar_archivo(*argumentos, funciones_externas=_funciones_proyecto)
+
+
+def _repartir(funcion, trabajos, workers, funciones_externas=frozenset()):
+    """
+    Aplica `funcion` a cada trabajo en un pool de `workers` procesos (por
+    defecto, uno por CPU) y devuelve los resultados en el mismo orden.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Lotes de varios archivos por tarea para no pagar el envío entre procesos por archivo
+    tamano_lote = max(1, min(64, len(trabajos) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_proceso,
+                             initargs=(frozenset(funciones_externas),)) as pool:
+        return list(pool.map(funcion, trabajos, chunksize=tamano_lote))
+
+
+def analizar_lote(archivos, workers=None, salida=None, omitir=(), cache=None, flujo=False,
+                  funciones_externas=frozenset(), conservar_formato=False, idioma=None):
+    """
+    Analiza `archivos` en un pool de `workers` procesos (por defecto, uno por
+    CPU) y devuelve sus resúmenes en el mismo orden. Con un solo worker se
+    analiza en este proceso.
+    """
+    trabajos = [(ruta, salida, tuple(omitir), cache, flujo, conservar_formato, idioma) for ruta in archivos]
+    if workers == 1 or len(archivos) < 2:
+        return [analizar_archivo(*trabajo, funciones_externas=funciones_externas) for trabajo in trabajos]
+    return _repartir(_analizar_en_pool, trabajos, workers, funciones_externas)
+
+
+def indexar_proyecto(archivos, workers=None):
+    """
+    Primera fase del modo proyecto: lexea `archivos` en paralelo y devuelve el
+    índice {función: [archivos que la declaran]}. Los archivos que no se
+    pueden leer no aportan funciones (su fallo se informa en la segunda fase).
+    """
+    if workers == 1 or len(archivos) < 2:
+        entradas = [indexar_archivo(ruta) for ruta in archivos]
+    else:
+        entradas = _repartir(indexar_archivo, archivos, workers)
+
+    indice = {}
+    for entrada in entradas:
+        for funcion in entrada.get('funciones', ()):
+            indice.setdefault(funcion, []).append(entrada['archivo'])
+    return indice
+
+
+def analizar_proyecto(archivos, workers=None, salida=None, omitir=(), cache=None, conservar_formato=False,
+                      idioma=None):
+    """
+    Analiza `archivos` como un solo programa: arma el índice de funciones con
+    indexar_proyecto y analiza cada archivo contra él. Devuelve los resúmenes
+    (en el mismo orden) y el índice.
+    """
+    indice = indexar_proyecto(archivos, workers)
+    return analizar_lote(archivos, workers, salida, omitir, cache, funciones_externas=frozenset(indice),
+                         conservar_formato=conservar_formato, idioma=idioma), indice
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('entradas', nargs='+', help="directorios, globs o archivos .c/.h")
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help="procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument('--salida', '-o', help="directorio donde escribir los archivos de cada entrada")
+    parser.add_argument('--omitir', action='append', default=[], choices=sorted(analizador.ARCHIVOS_SALIDA),
+                        help="archivo de salida que no se escribe (se puede repetir)")
+    parser.add_argument('--json', help="archivo del reporte JSON agregado ('-' para la salida estándar)")
+    parser.add_argument('--cache', help="directorio de la caché de resultados en disco")
+    parser.add_argument('--flujo', action='store_true',
+                        help="traducir en flujo con memoria acotada (sin errores.txt ni análisis de declaraciones)")
+    parser.add_argument('--conservar-formato', action='store_true',
+                        help="escribir traduccion.txt con el formato del código original")
+    parser.add_argument('--idioma', choices=sorted(diccionarios.DICCIONARIOS),
+                        default=diccionarios.IDIOMA_PREDETERMINADO,
+                        help="diccionario de la traducción (por defecto, %(default)s)")
+    parser.add_argument('--proyecto', action='store_true',
+                        help="analizar los archivos como un solo programa, con un índice de funciones común")
+    parser.add_argument('--estricto', action='store_true',
+                        help="terminar con código 1 si algún archivo tiene errores")
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers debe ser al menos 1")
+    if args.flujo and args.cache:
+        parser.error("--flujo no usa la caché de resultados")
+    if args.flujo and args.proyecto:
+        parser.error("--flujo no analiza declaraciones, así que no admite --proyecto")
+
+    archivos = buscar_archivos(args.entradas)
+    if not archivos:
+        print("No se encontraron archivos C", file=sys.stderr)
+        return 2
+
+    inicio = time.perf_counter()
+    indice = None
+    if args.proyecto:
+        resumenes, indice = analizar_proyecto(archivos, args.workers, args.salida, args.omitir, args.cache,
+                                              args.conservar_formato, args.idioma)
+    else:
+        resumenes = analizar_lote(archivos, args.workers, args.salida, args.omitir, args.cache, args.flujo,
+                                  conservar_formato=args.conservar_formato, idioma=args.idioma)
+    total = time.perf_counter() - inicio
+
+    fallidos = [r for r in resumenes if 'fallo' in r]
+    con_errores = [r for r in resumenes
+                   if 'fallo' not in r and (r['errores_lexicos'] or r['errores_sintacticos'])]
+
+    if args.json:
+        reporte = {
+            'archivos': len(resumenes),
+            'con_errores': len(con_errores),
+            'fallidos': len(fallidos),
+            'segundos': round(total, 4),
+            'resultados': resumenes,
+        }
+        if indice is not None:
+            reporte['funciones_proyecto'] = dict(sorted(indice.items()))
+        if args.json == '-':
+            json.dump(reporte, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+        else:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(reporte, f, ensure_ascii=False, indent=2)
+
+    # Con el reporte en la salida estándar el resumen va a stderr para no mezclarlos
+    destino = sys.stderr if args.json == '-' else sys.stdout
+    for r in fallidos:
+        print(f"✗ {r['archivo']}: {r['fallo']}", file=destino)
+    desde_cache = sum(1 for r in resumenes if r.get('en_cache'))
+    print(f"{len(resumenes)} archivos analizados en {total:.2f} s: "
+          f"{len(con_errores)} con errores, {len(fallidos)} fallidos"
+          + (f", {desde_cache} desde la caché" if args.cache else "")
+          + (f", {len(indice)} funciones en el proyecto" if indice is not None else ""), file=destino)
+
+    if fallidos:
+        return 2
+    if args.estricto and con_errores:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
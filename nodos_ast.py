@@ -0,0 +1,296 @@
+"""
+Árbol sintáctico (AST) que construye el parser de analisis.py.
+
+Cada construcción de la gramática tiene su clase de nodo con __slots__, en
+lugar de tuplas etiquetadas con una cadena ('function_definition', ...). Los
+recorridos se escriben como subclases de Visitante, que elige el método por la
+clase del nodo.
+
+Los nodos de la estructura del programa (funciones, sentencias, includes)
+guardan su tramo en el código fuente como posición de inicio y longitud; la
+línea se calcula con IndiceLineas en lugar de guardarse en cada nodo. Las
+hojas de las expresiones (Numero, Identificador, Cadena) son inmutables y el
+parser crea una sola por valor, así que una expresión no puede guardar su
+tramo: los de todas las apariciones van en la tabla TramosExpresiones del
+Programa, dos columnas de enteros sin objetos por tramo. Las antiguas tuplas
+guardaban una cadena o un entero por cada aparición; lo que ahorran las hojas
+compartidas paga el entero que cuesta el tramo de cada sentencia y la tabla.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+
+class Nodo:
+    """
+    Base de los nodos con tramo en el código fuente. Se guarda la longitud y no
+    el final: casi siempre es un entero pequeño, que Python comparte, en lugar
+    de un entero nuevo por nodo.
+    """
+    __slots__ = ('inicio', 'longitud')
+
+    # Nombres de los campos que contienen nodos hijos (o listas de nodos), en orden
+    hijos = ()
+
+    @property
+    def fin(self):
+        return self.inicio + self.longitud
+
+    def texto(self, codigo):
+        """Fragmento de `codigo` que corresponde al nodo."""
+        return codigo[self.inicio:self.inicio + self.longitud]
+
+    def linea(self, lineas):
+        """Línea donde empieza el nodo, según el IndiceLineas del código."""
+        return lineas.linea(self.inicio)
+
+
+class Expresion:
+    """
+    Base de las expresiones, que no guardan tramo (ver TramosExpresiones). Las
+    hojas son inmutables y el parser comparte una sola instancia por valor.
+    """
+    __slots__ = ()
+    hijos = ()
+
+
+class IndiceLineas:
+    """Inicios de línea de un código, para obtener la línea de una posición."""
+    __slots__ = ('inicios',)
+
+    def __init__(self, codigo):
+        inicios = array('I', [0])
+        i = codigo.find('\n')
+        while i >= 0:
+            inicios.append(i + 1)
+            i = codigo.find('\n', i + 1)
+        self.inicios = inicios
+
+    def linea(self, posicion):
+        """Línea (desde 1) de la posición `posicion` del código."""
+        return bisect_right(self.inicios, posicion)
+
+
+class TramosExpresiones:
+    """
+    Tramos en el código de cada aparición de una expresión del programa,
+    ordenados por inicio y, a igual inicio, de mayor a menor longitud. Como los
+    campos hijos de cada nodo siguen el orden del código, ese es el orden en
+    que un recorrido en preorden encuentra las expresiones: recorrer() empareja
+    cada una con su tramo sin que los nodos guarden nada. Una expresión entre
+    paréntesis incluye los paréntesis en su tramo.
+    """
+    __slots__ = ('inicios', 'longitudes')
+
+    def __init__(self, inicios, longitudes):
+        """`inicios` y `longitudes` son array('I') paralelos, en cualquier orden."""
+        orden = sorted(range(len(inicios)), key=lambda k: (inicios[k], -longitudes[k]))
+        self.inicios = array('I', [inicios[k] for k in orden])
+        self.longitudes = array('I', [longitudes[k] for k in orden])
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def recorrer(self, raiz):
+        """
+        Genera (expresion, inicio, fin) de cada expresión de `raiz` (un Nodo o
+        una lista de nodos), en preorden. Las hojas compartidas aparecen una
+        vez por cada aparición, con el tramo de esa aparición.
+        """
+        nodos = raiz if isinstance(raiz, list) else [raiz]
+        primero = next((nodo for nodo in nodos if nodo is not None), None)
+        if primero is None:
+            return
+        inicios = self.inicios
+        longitudes = self.longitudes
+        k = bisect_left(inicios, primero.inicio)
+        pila = list(reversed(nodos))
+        while pila:
+            nodo = pila.pop()
+            if nodo is None:
+                continue
+            if type(nodo) is list:
+                pila.extend(reversed(nodo))
+                continue
+            if isinstance(nodo, Expresion):
+                yield nodo, inicios[k], inicios[k] + longitudes[k]
+                k += 1
+            for campo in reversed(nodo.hijos):
+                pila.append(getattr(nodo, campo))
+
+
+# --- Programa y funciones ---
+
+@dataclass(slots=True)
+class Programa(Nodo):
+    includes: list
+    funciones: list
+    expresiones: TramosExpresiones = None
+    hijos = ('includes', 'funciones')
+
+
+@dataclass(slots=True)
+class Include(Nodo):
+    archivo: str
+
+
+@dataclass(slots=True)
+class DefinicionFuncion(Nodo):
+    tipo: str
+    nombre: str
+    cuerpo: list
+    hijos = ('cuerpo',)
+
+
+# --- Sentencias ---
+
+@dataclass(slots=True)
+class Declaracion(Nodo):
+    tipo: str
+    nombre: str
+    valor: object  # expresión inicial, o None
+    hijos = ('valor',)
+
+
+@dataclass(slots=True)
+class Asignacion(Nodo):
+    nombre: str
+    valor: object
+    hijos = ('valor',)
+
+
+@dataclass(slots=True)
+class SentenciaIf(Nodo):
+    condicion: object
+    cuerpo: list
+    cuerpo_else: list  # None si no hay else
+    hijos = ('condicion', 'cuerpo', 'cuerpo_else')
+
+
+@dataclass(slots=True)
+class SentenciaFor(Nodo):
+    inicializacion: object  # Declaracion, Asignacion o None
+    condicion: object
+    actualizacion: object   # Asignacion, LlamadaFuncion o None
+    cuerpo: list
+    hijos = ('inicializacion', 'condicion', 'actualizacion', 'cuerpo')
+
+
+@dataclass(slots=True)
+class SentenciaWhile(Nodo):
+    condicion: object
+    cuerpo: list
+    hijos = ('condicion', 'cuerpo')
+
+
+@dataclass(slots=True)
+class Retorno(Nodo):
+    valor: object
+    hijos = ('valor',)
+
+
+@dataclass(slots=True)
+class LlamadaFuncion(Nodo):
+    nombre: str
+    argumento: str  # literal de cadena, con sus comillas
+
+
+# --- Expresiones ---
+
+@dataclass(slots=True)
+class OperacionBinaria(Expresion):
+    operador: str  # '+', '-', '*', '/', '>' o '<'
+    izquierda: object
+    derecha: object
+    hijos = ('izquierda', 'derecha')
+
+
+@dataclass(slots=True, frozen=True)
+class Numero(Expresion):
+    valor: int
+
+
+@dataclass(slots=True, frozen=True)
+class Identificador(Expresion):
+    nombre: str
+
+
+@dataclass(slots=True, frozen=True)
+class Cadena(Expresion):
+    valor: str  # con sus comillas
+
+
+class Visitante:
+    """
+    Recorre un AST eligiendo el método por la clase de cada nodo: para un
+    SentenciaIf se llama a visitar_SentenciaIf(nodo). Si la subclase no define
+    el método, se usa visitar_hijos, que programa la visita de los hijos en
+    orden. Un método propio que quiera seguir bajando debe llamar a
+    visitar_hijos; si además define salir_SentenciaIf(nodo), se llama cuando ya
+    se visitaron todos los hijos del nodo.
+
+    El recorrido usa una pila explícita en lugar de recursión, así que la
+    profundidad del árbol no está limitada por el límite de recursión de Python.
+    """
+    # (método de entrada, método de salida, campos hijos en orden inverso) para
+    # cada clase de nodo; cada subclase tiene el suyo. La entrada es None cuando
+    # la subclase no la redefine: el bucle apila los hijos sin llamar a nada
+    _despacho = {}
+    # Pila del recorrido en curso
+    _pila = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._despacho = {}
+
+    def visitar(self, raiz):
+        pila = [raiz]
+        anterior, self._pila = self._pila, pila
+        despacho = self._despacho
+        try:
+            while pila:
+                nodo = pila.pop()
+                clase = type(nodo)
+                if clase is list:
+                    pila.extend(reversed(nodo))
+                elif clase is tuple:
+                    # Salida pendiente: (método, nodo)
+                    nodo[0](self, nodo[1])
+                else:
+                    metodos = despacho.get(clase)
+                    if metodos is None:
+                        metodos = self._resolver(clase)
+                    entrada, salida, campos = metodos
+                    if salida is not None:
+                        # Debajo de los hijos que apile la entrada: se ejecuta después de ellos
+                        pila.append((salida, nodo))
+                    if entrada is None:
+                        for campo in campos:
+                            hijo = getattr(nodo, campo)
+                            if hijo is not None:
+                                pila.append(hijo)
+                    else:
+                        entrada(self, nodo)
+        finally:
+            self._pila = anterior
+
+    @classmethod
+    def _resolver(cls, clase):
+        nombre = clase.__name__
+        entrada = getattr(cls, 'visitar_' + nombre, cls.visitar_hijos)
+        if entrada is Visitante.visitar_hijos:
+            entrada = None
+        metodos = (entrada, getattr(cls, 'salir_' + nombre, None), tuple(reversed(clase.hijos)))
+        cls._despacho[clase] = metodos
+        return metodos
+
+    def visitar_hijos(self, nodo):
+        pila = self._pila
+        if pila is None:
+            # Llamada fuera de un recorrido: se empieza uno con los hijos
+            self.visitar([getattr(nodo, campo) for campo in nodo.hijos if getattr(nodo, campo) is not None])
+            return
+        for campo in reversed(nodo.hijos):
+            hijo = getattr(nodo, campo)
+            if hijo is not None:
+                pila.append(hijo)
@@ -2,11 +2,18 @@ from PySide6.QtWidgets import *
 from PySide6.QtGui import *
 from PySide6.QtCore import *
 from PySide6.QtPrintSupport import *
+from array import array
+import contextlib
+import logging
+import os
 import sys
 import re
 
 # modulo propio
 from resources.tools import banner
+import analizador
+import diccionarios
+from cache_analisis import CacheAnalisis, resumen_linea
 
 class LineNumberArea(QWidget):
     def __init__(self, editor):
@@ -43,7 +50,233 @@ class LineNumberArea(QWidget):
 
 
 
+class DatosBloque:
+    """
+    Resultado del lexer para un bloque (línea) del editor. No se modifica una
+    vez creado, así que una copia de la lista de bloques es una instantánea
+    que se puede leer desde otro hilo. `longitud` es la del bloque en el
+    documento, con su salto de línea; el texto solo se guarda si el bloque
+    tiene errores, para volver a lexearlo si se desplaza. `resumen` es el de
+    cache_analisis.resumen_linea: con los de todos los bloques se calcula la
+    clave de caché del documento sin reunir su texto.
+    """
+    def __init__(self, linea, revision, tokens, errores, pendiente, columna, empieza_en_comentario,
+                 longitud, resumen, texto=None):
+        self.linea = linea
+        self.revision = revision
+        self.tokens = tokens
+        self.errores = errores
+        self.pendiente = pendiente
+        self.columna = columna
+        self.empieza_en_comentario = empieza_en_comentario
+        self.longitud = longitud
+        self.resumen = resumen
+        self.texto = texto
+
+    def termina_en_comentario(self):
+        return self.pendiente is not None
+
+
+class CacheLexicoBloques:
+    """
+    Caché de tokens por bloque (línea) del documento, en paralelo a sus QTextBlocks.
+
+    Al cambiar el documento solo se vuelven a lexear los bloques editados, y se
+    sigue con los siguientes mientras el estado del lexer al inicio de un bloque
+    (dentro o fuera de un comentario de bloque) no coincida con el que tenía
+    guardado. Los datos se guardan en una lista indexada por número de bloque y
+    no con setUserData, porque QTextBlock.userData() de PySide6 corrompe el
+    contador de referencias de None cuando el bloque no tiene datos.
+    """
+    def __init__(self, documento):
+        self.documento = documento
+        self.lexer = analizador.crear_lexer()
+        self.datos = []
+        self.documento.contentsChange.connect(self.al_cambiar_contenido)
+        self.al_cambiar_contenido(0, 0, self.documento.characterCount())
+
+    def lexear_bloque(self, bloque, en_comentario):
+        linea = bloque.blockNumber() + 1
+        texto = bloque.text()
+        tokens, errores, pendiente, columna = analizador.lexear_linea(texto, linea, en_comentario, self.lexer)
+        return DatosBloque(linea, bloque.revision(), tokens, errores, pendiente, columna, en_comentario,
+                           bloque.length(), resumen_linea(texto), texto if errores else None)
+
+    def datos_vigentes(self, bloque, en_comentario):
+        """
+        Datos guardados del bloque si siguen valiendo para su texto actual y el
+        estado de comentario indicado; si no, None.
+        """
+        numero = bloque.blockNumber()
+        if numero >= len(self.datos):
+            return None
+        datos = self.datos[numero]
+        if datos.revision != bloque.revision() or datos.empieza_en_comentario != en_comentario:
+            return None
+        return datos
+
+    def al_cambiar_contenido(self, posicion, eliminados, agregados):
+        primero = self.documento.findBlock(posicion)
+        ultimo = self.documento.findBlock(posicion + agregados)
+        if not ultimo.isValid():
+            ultimo = self.documento.lastBlock()
+        inicio = primero.blockNumber()
+        fin = ultimo.blockNumber()
+
+        # Bloques antiguos que ocupaban el tramo editado: los mismos, corregidos
+        # por la diferencia en el número total de bloques
+        diferencia = self.documento.blockCount() - len(self.datos)
+        fin_antiguo = fin - diferencia
+
+        en_comentario = inicio > 0 and self.datos[inicio - 1].termina_en_comentario()
+        nuevos = []
+        bloque = primero
+        while bloque.isValid() and bloque.blockNumber() <= fin:
+            datos = self.lexear_bloque(bloque, en_comentario)
+            en_comentario = datos.termina_en_comentario()
+            nuevos.append(datos)
+            bloque = bloque.next()
+        self.datos[inicio:fin_antiguo + 1] = nuevos
+
+        # Propagar el cambio de estado hasta que vuelva a coincidir
+        numero = fin + 1
+        while bloque.isValid() and self.datos[numero].empieza_en_comentario != en_comentario:
+            datos = self.lexear_bloque(bloque, en_comentario)
+            en_comentario = datos.termina_en_comentario()
+            self.datos[numero] = datos
+            bloque = bloque.next()
+            numero += 1
+
+    def instantanea(self):
+        """
+        Copia de la lista de bloques para analizarla en otro hilo con
+        unir_bloques. Solo copia referencias: es lo único que se hace en el
+        hilo de la interfaz.
+        """
+        return list(self.datos)
+
+    def tokens(self):
+        """Devuelve (todos_los_tokens, errores_lexicos) del documento completo."""
+        return unir_bloques(self.instantanea())
+
+
+def lineas_bloques(bloques):
+    """
+    Recorre una instantánea de CacheLexicoBloques con el formato que espera
+    analizador.unir_lineas. No toca el documento ni modifica los bloques, así
+    que se puede usar fuera del hilo de la interfaz.
+    """
+    lexer = None
+    posicion = 0
+    for numero, datos in enumerate(bloques):
+        linea = numero + 1
+        tokens, errores = datos.tokens, datos.errores
+        if datos.linea != linea:
+            if errores:
+                # Los mensajes de error citan una línea antigua: se vuelve a lexear
+                if lexer is None:
+                    lexer = analizador.crear_lexer()
+                tokens, errores, _, _ = analizador.lexear_linea(datos.texto, linea, datos.empieza_en_comentario,
+                                                                lexer)
+            else:
+                # El bloque se desplazó: basta con corregir el número de línea
+                # (el cierre de un comentario conserva su línea de continuación)
+                delta = linea - datos.linea
+                tokens = tokens.copia()
+                tokens.lineas = array('I', [l if l == analizador.LINEA_CONTINUACION else l + delta
+                                            for l in tokens.lineas])
+        yield (linea, posicion, tokens, errores, datos.pendiente, datos.columna, datos.empieza_en_comentario)
+        posicion += datos.longitud
+
+
+def unir_bloques(bloques):
+    """(todos_los_tokens, errores_lexicos) de una instantánea de CacheLexicoBloques."""
+    return analizador.unir_lineas(lineas_bloques(bloques))
+
+
+def crear_formato(color, negrita=False, cursiva=False):
+    formato = QTextCharFormat()
+    formato.setForeground(QColor(color))
+    if negrita:
+        formato.setFontWeight(QFont.Bold)
+    if cursiva:
+        formato.setFontItalic(True)
+    return formato
+
+
+class ResaltadorSintaxis(QSyntaxHighlighter):
+    """
+    Colorea cada bloque con las mismas reglas que usa el análisis
+    (analizador.lexear_linea). El estado del bloque indica si termina dentro de
+    un comentario /* */: Qt solo vuelve a resaltar los bloques editados y sigue
+    con los siguientes mientras ese estado cambie.
+    """
+    FUERA_DE_COMENTARIO = 0
+    EN_COMENTARIO = 1
+
+    def __init__(self, documento, cache_lexico=None):
+        super().__init__(documento)
+        # Si hay caché por bloques se reutilizan sus tokens: se actualiza antes
+        # que el resaltador porque se conectó antes a contentsChange
+        self.cache_lexico = cache_lexico
+        self.lexer = analizador.crear_lexer()
+        comentario = crear_formato('#a9b1d6', cursiva=True)
+        error = crear_formato('#ff7b72')
+        error.setUnderlineStyle(QTextCharFormat.WaveUnderline)
+        error.setUnderlineColor(QColor('#ff7b72'))
+        self.formato_comentario = comentario
+        self.formato_tipo_dato = crear_formato('#7dcfff', negrita=True)
+        self.formato_preprocesador = crear_formato('#ff9e64')
+        self.formatos = {
+            analizador.COMENTARIO: comentario,
+            analizador.LIBRERIA: crear_formato('#ffd580'),
+            analizador.LIBRERIA_PERSONALIZADA: crear_formato('#ffd580'),
+            analizador.CADENA: crear_formato('#9ece6a'),
+            analizador.CADENA_ERROR: error,
+            analizador.CARACTER: crear_formato('#9ece6a'),
+            analizador.CARACTER_ERROR: error,
+            analizador.DECIMAL: crear_formato('#f7c873'),
+            analizador.ENTERO: crear_formato('#f7c873'),
+            analizador.PALABRA_RESERVADA: crear_formato('#ffa0e0', negrita=True),
+            analizador.TIPO_DATO: self.formato_tipo_dato,
+        }
+
+    def highlightBlock(self, texto):
+        en_comentario = self.previousBlockState() == self.EN_COMENTARIO
+        datos = self.cache_lexico and self.cache_lexico.datos_vigentes(self.currentBlock(), en_comentario)
+        if datos:
+            tokens, pendiente, columna = datos.tokens, datos.pendiente, datos.columna
+        else:
+            tokens, _, pendiente, columna = analizador.lexear_linea(texto, 1, en_comentario, self.lexer)
+        tipos, valores, inicios, fines = tokens.tipos, tokens.valores, tokens.inicios, tokens.fines
+        formatos = self.formatos
+
+        for i in range(len(tipos)):
+            tipo = tipos[i]
+            if tipo == analizador.PALABRA_RESERVADA and valores[i] in analizador.TIPOS_DATOS:
+                formato = self.formato_tipo_dato
+            elif valores[i] == '#' and tipo == analizador.SIMBOLO or (
+                    i > 0 and valores[i - 1] == '#' and tipos[i - 1] == analizador.SIMBOLO):
+                # Directiva: '#' y el nombre que lo sigue (include, define...)
+                formato = self.formato_preprocesador
+            else:
+                formato = formatos.get(tipo)
+            if formato is not None:
+                self.setFormat(inicios[i], fines[i] - inicios[i], formato)
+
+        if pendiente is not None:
+            self.setFormat(columna, len(texto) - columna, self.formato_comentario)
+            self.setCurrentBlockState(self.EN_COMENTARIO)
+        else:
+            self.setCurrentBlockState(self.FUERA_DE_COMENTARIO)
+
+
 class CodeEditor(QPlainTextEdit):
+    # Tiempo sin escribir tras el que se analizan los diagnósticos en vivo
+    RETARDO_DIAGNOSTICOS_MS = 500
+    # Memoria máxima de los resultados de análisis guardados por contenido
+    MEMORIA_CACHE_ANALISIS = 64 << 20
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.line_number_area = LineNumberArea(self)
@@ -52,6 +285,32 @@ class CodeEditor(QPlainTextEdit):
         self.updateRequest.connect(self.update_line_number_area)
         self.cursorPositionChanged.connect(self.highlight_current_line)
 
+        # Tokens por bloque, actualizados de forma incremental al editar
+        self.cache_lexico = CacheLexicoBloques(self.document())
+        self.resaltador = ResaltadorSintaxis(self.document(), self.cache_lexico)
+        # Resultados por contenido: volver a analizar un texto ya visto (por los
+        # diagnósticos o por Translate) no repite el análisis
+        self.cache_analisis = CacheAnalisis(self.MEMORIA_CACHE_ANALISIS)
+        # Directorio del archivo abierto, donde se buscan sus cabeceras locales
+        # (None: el directorio actual)
+        self.directorio_fuente = None
+
+        # Diagnósticos en vivo: cada cambio reinicia el temporizador y, cuando
+        # vence, se analiza en segundo plano. Un análisis nuevo cancela y
+        # reemplaza al anterior; sus resultados se descartan por la generación
+        self.selecciones_diagnosticos = []
+        self.diagnosticos = []
+        self.pool_diagnosticos = QThreadPool(self)
+        self.pool_diagnosticos.setMaxThreadCount(1)
+        self.trabajo_diagnosticos = None
+        self.generacion_diagnosticos = 0
+        self.revision_diagnosticos = None
+        self.temporizador_diagnosticos = QTimer(self)
+        self.temporizador_diagnosticos.setSingleShot(True)
+        self.temporizador_diagnosticos.setInterval(self.RETARDO_DIAGNOSTICOS_MS)
+        self.temporizador_diagnosticos.timeout.connect(self.lanzar_diagnosticos)
+        self.textChanged.connect(self.temporizador_diagnosticos.start)
+
         self.load_stylesheet('resources/style/style.qss')
 
         self.update_line_number_area_width()
@@ -101,8 +360,67 @@ class CodeEditor(QPlainTextEdit):
             selection.cursor = self.textCursor()
             selection.cursor.clearSelection()
             extra_selections.append(selection)
+        # Los subrayados de los diagnósticos van encima de la línea actual
+        extra_selections.extend(self.selecciones_diagnosticos)
         self.setExtraSelections(extra_selections)
 
+    def lanzar_diagnosticos(self):
+        """Analiza el documento en segundo plano para actualizar los subrayados."""
+        if self.trabajo_diagnosticos is not None:
+            self.trabajo_diagnosticos.cancelar()
+        self.pool_diagnosticos.clear()
+
+        self.generacion_diagnosticos += 1
+        self.revision_diagnosticos = self.document().revision()
+        # Solo se toma la instantánea: la clave, la caché y la unión van en el trabajo
+        trabajo = TrabajoAnalisis(self.cache_lexico.instantanea(), self.generacion_diagnosticos,
+                                  escribir_archivos=False, cache=self.cache_analisis,
+                                  directorio=self.directorio_fuente)
+        trabajo.senales.terminado.connect(self.diagnosticos_terminados)
+        self.trabajo_diagnosticos = trabajo
+        self.pool_diagnosticos.start(trabajo)
+
+    def diagnosticos_terminados(self, generacion, resultado):
+        """Muestra los diagnósticos del análisis vigente como subrayados ondulados."""
+        if generacion != self.generacion_diagnosticos:
+            return
+        self.trabajo_diagnosticos = None
+        if self.document().revision() != self.revision_diagnosticos:
+            # El texto cambió mientras se analizaba: el temporizador ya lanzará otro
+            return
+        self.mostrar_diagnosticos(resultado['diagnosticos'])
+
+    def mostrar_diagnosticos(self, diagnosticos):
+        formato = QTextCharFormat()
+        formato.setUnderlineStyle(QTextCharFormat.WaveUnderline)
+        formato.setUnderlineColor(QColor('#ff5555'))
+        selecciones = []
+        for linea, inicio, fin, mensaje in diagnosticos:
+            seleccion = QTextEdit.ExtraSelection()
+            seleccion.format = formato
+            seleccion.cursor = QTextCursor(self.document())
+            seleccion.cursor.setPosition(inicio)
+            seleccion.cursor.setPosition(fin, QTextCursor.KeepAnchor)
+            selecciones.append(seleccion)
+        self.diagnosticos = diagnosticos
+        self.selecciones_diagnosticos = selecciones
+        self.highlight_current_line()
+
+    def event(self, event):
+        # Tooltip con los mensajes de los diagnósticos bajo el ratón
+        if event.type() == QEvent.ToolTip:
+            posicion = self.cursorForPosition(self.viewport().mapFromGlobal(event.globalPos())).position()
+            mensajes = [mensaje
+                        for seleccion, (_, _, _, mensaje) in zip(self.selecciones_diagnosticos, self.diagnosticos)
+                        if seleccion.cursor.selectionStart() <= posicion <= seleccion.cursor.selectionEnd()]
+            if mensajes:
+                QToolTip.showText(event.globalPos(), '\n'.join(mensajes), self)
+            else:
+                QToolTip.hideText()
+                event.ignore()
+            return True
+        return super().event(event)
+
     def load_stylesheet(self, file_path):
         """Carga y aplica un archivo QSS."""
         try:
@@ -124,6 +442,140 @@ class CodeEditor(QPlainTextEdit):
         except Exception as e:
             print(f"Error cargando stylesheet: {e}")
 
+class SenalesAnalisis(QObject):
+    """Señales con las que un TrabajoAnalisis informa al hilo de la interfaz."""
+    progreso = Signal(int, str)
+    terminado = Signal(int, object)
+    fallo = Signal(int, str)
+
+
+class TrabajoAnalisis(QRunnable):
+    """
+    Ejecuta analizador.analizar_tokens y, salvo que se indique lo contrario,
+    escribe los archivos, todo fuera del hilo de la interfaz. Recibe una
+    instantánea del editor, `bloques` (de CacheLexicoBloques.instantanea): la
+    clave de caché (a partir de los resúmenes de los bloques), la consulta a
+    `cache` y la unión de los tokens se hacen aquí; si la caché ya tiene el
+    resultado no se analiza y solo se escriben los archivos. Las cabeceras
+    locales se buscan en `directorio`. Con `texto` (el del editor, solo cuando
+    se conserva el formato), traduccion.txt conserva su formato. `idioma` es el
+    código del diccionario de la traducción.
+    """
+    def __init__(self, bloques, generacion, escribir_archivos=True, cache=None, directorio=None,
+                 texto=None, idioma=None):
+        super().__init__()
+        self.bloques = bloques
+        self.generacion = generacion
+        self.escribir_archivos = escribir_archivos
+        self.cache = cache
+        self.directorio = directorio
+        self.texto = texto
+        self.idioma = idioma
+        self.senales = SenalesAnalisis()
+        self._cancelado = False
+
+    def cancelar(self):
+        self._cancelado = True
+
+    def cancelado(self):
+        return self._cancelado
+
+    def run(self):
+        def progreso(mensaje):
+            self.senales.progreso.emit(self.generacion, mensaje)
+
+        try:
+            clave = resultado = None
+            if self.cache is not None:
+                clave = self.cache.clave_bloques([datos.resumen for datos in self.bloques],
+                                                 directorio=self.directorio)
+                resultado = self.cache.obtener(clave)
+            if resultado is None:
+                todos_los_tokens, errores_lexicos = unir_bloques(self.bloques)
+                if self.cancelado():
+                    return
+                resultado = analizador.analizar_tokens(todos_los_tokens, errores_lexicos,
+                                                       self.cancelado, progreso, directorio=self.directorio)
+                if self.cache is not None:
+                    self.cache.guardar(clave, resultado)
+            else:
+                progreso("Contenido sin cambios: se reutiliza el análisis anterior")
+            if self.cancelado():
+                return
+            if self.escribir_archivos:
+                # Las posiciones del editor cuentan unidades UTF-16: solo coinciden con
+                # los índices del texto si no hay caracteres fuera del plano básico
+                fuente = self.texto
+                if fuente is not None and not (fuente.isascii() or max(fuente) <= '\uffff'):
+                    fuente = None
+                progreso("Escribiendo archivos...")
+                analizador.escribir_archivos(resultado, fuente=fuente, idioma=self.idioma)
+        except analizador.AnalisisCancelado:
+            return
+        except Exception as e:
+            self.senales.fallo.emit(self.generacion, str(e))
+            return
+        self.senales.terminado.emit(self.generacion, resultado)
+
+class CargaArchivo(QObject):
+    """
+    Carga un archivo en el editor por trozos. El archivo se mapea en memoria y
+    cada vuelta del bucle de eventos agrega un trozo cortado tras un salto de
+    línea, así que la interfaz sigue respondiendo aunque el archivo tenga
+    cientos de MB. Mientras dura la carga el editor es de solo lectura.
+    """
+    # Bytes de cada trozo: lo que se resalta y se lexea entre dos eventos
+    TAMANO_TROZO = 1 << 15
+
+    terminado = Signal(str)
+    fallo = Signal(str, str)
+
+    def __init__(self, editor, ruta, parent=None):
+        super().__init__(parent)
+        self.editor = editor
+        self.ruta = ruta
+        self._recursos = contextlib.ExitStack()
+        datos = self._recursos.enter_context(analizador.mapear_archivo(ruta))
+        self._trozos = analizador.trozos_texto(datos, self.TAMANO_TROZO)
+        self._temporizador = QTimer(self)
+        self._temporizador.timeout.connect(self._agregar_trozo)
+
+    def iniciar(self):
+        documento = self.editor.document()
+        # Sin deshacer durante la carga: como con setPlainText, no se puede deshacer la carga
+        documento.setUndoRedoEnabled(False)
+        self.editor.clear()
+        self.editor.setReadOnly(True)
+        self._temporizador.start(0)
+
+    def cancelar(self):
+        self._terminar()
+
+    def _agregar_trozo(self):
+        try:
+            trozo = next(self._trozos, None)
+            if trozo is not None:
+                cursor = QTextCursor(self.editor.document())
+                cursor.movePosition(QTextCursor.End)
+                cursor.insertText(trozo)
+                return
+        except Exception as e:
+            self._terminar()
+            self.fallo.emit(self.ruta, str(e))
+            return
+        self._terminar()
+        self.terminado.emit(self.ruta)
+
+    def _terminar(self):
+        if not self._temporizador.isActive():
+            return
+        self._temporizador.stop()
+        self._trozos = None
+        self._recursos.close()
+        self.editor.document().setUndoRedoEnabled(True)
+        self.editor.setReadOnly(False)
+
+
 class NoteEditor(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -136,6 +588,16 @@ class NoteEditor(QMainWindow):
         self.top = 100
         self.width = 800
         self.height = 600
+
+        # Análisis en segundo plano: un solo hilo para que los trabajos no se solapen
+        self.pool_analisis = QThreadPool(self)
+        self.pool_analisis.setMaxThreadCount(1)
+        self.trabajo_analisis = None
+        self.generacion_analisis = 0
+
+        # Carga por trozos del archivo abierto, si hay una en curso
+        self.carga_archivo = None
+
         self.initUI()
 
         # Alfabeto
@@ -168,6 +630,16 @@ class NoteEditor(QMainWindow):
         # Operadores de incremento y decremento
         operadores_incremento_decremento = "++--"
 
+    @property
+    def current_file(self):
+        return getattr(self, '_current_file', None)
+
+    @current_file.setter
+    def current_file(self, ruta):
+        self._current_file = ruta
+        # Las cabeceras locales del archivo se buscan junto a él
+        self.textEdit.directorio_fuente = os.path.dirname(os.path.abspath(ruta)) if ruta else None
+
     def initUI(self):
         # Establecer título y geometría de la ventana
         self.setWindowTitle(self.title)
@@ -191,6 +663,19 @@ class NoteEditor(QMainWindow):
         self.exitAction = self.create_action("Exit Application", "resources/img/inverted/cerrar-sesion.png", self.close)
         self.analizerAction = self.create_action("Translate", "resources/img/inverted/triangulo.png", self.analize_content)
         self.newTerminal = self.create_action("New Terminal", "resources/img/inverted/comando.png", self.new_terminal)
+        # Traducción que conserva la disposición del código (solo cambian las palabras reservadas)
+        self.conservarFormatoAction = QAction("Keep Formatting", self)
+        self.conservarFormatoAction.setCheckable(True)
+        # Idioma de la traducción: cambiarlo solo cambia el diccionario, no el lexer
+        self.idioma = diccionarios.IDIOMA_PREDETERMINADO
+        self.idiomaGroup = QActionGroup(self)
+        self.idiomaGroup.setExclusive(True)
+        for codigo, diccionario in diccionarios.DICCIONARIOS.items():
+            accion = QAction(diccionario.nombre, self.idiomaGroup)
+            accion.setCheckable(True)
+            accion.setChecked(codigo == self.idioma)
+            accion.setData(codigo)
+        self.idiomaGroup.triggered.connect(self.cambiar_idioma)
 
         # Agregar acciones al menú
         self.fileMenu.addAction(self.newAction)
@@ -200,6 +685,9 @@ class NoteEditor(QMainWindow):
         self.fileMenu.addAction(self.exitAction)
 
         self.proyectMenu.addAction(self.analizerAction)
+        self.proyectMenu.addAction(self.conservarFormatoAction)
+        self.idiomaMenu = self.proyectMenu.addMenu("Language")
+        self.idiomaMenu.addActions(self.idiomaGroup.actions())
         self.terminalMenu.addAction(self.newTerminal)
 
         # Agregar acciones a la barra de herramientas
@@ -277,594 +765,67 @@ class NoteEditor(QMainWindow):
 
     def analize_content(self):
         """
-        Analiza el contenido del editor línea por línea y genera tres archivos:
+        Lanza el análisis del contenido del editor en segundo plano. El trabajo
+        genera tres archivos:
         - trad.txt: Solo tokens, sin sus tipos
         - traduccion.txt: Código C traducido al español
         - errores.txt: Errores sintácticos y léxicos detectados
         
-        Utiliza PLY (Python Lex-Yacc) para el análisis léxico y sintáctico.
+        Si ya había un análisis en curso, se cancela y se reemplaza por el nuevo.
         """
-        import ply.lex as lex
-        import re
-        
-        # Definición de palabras clave y símbolos
-        PALABRAS_RESERVADAS = {
-            "auto": "automatico", "break": "romper", "case": "caso",
-            "char": "caracter", "const": "constante", "continue": "continuar",
-            "default": "defecto", "do": "hacer", "double": "doble",
-            "else": "sino", "enum": "enumeracion", "extern": "externo",
-            "float": "flotante", "for": "para", "goto": "ir_a",
-            "if": "si", "inline": "en_linea", "int": "entero",
-            "long": "largo", "register": "registro", "restrict": "restringido",
-            "return": "retornar", "short": "corto", "signed": "con_signo",
-            "sizeof": "tamaño_de", "static": "estatico", "struct": "estructura",
-            "switch": "selector", "typedef": "definir_tipo", "union": "union",
-            "unsigned": "sin_signo", "void": "vacio", "volatile": "volatil",
-            "while": "mientras", "include": "incluir"
-        }
-        
-        # Lista de tipos de datos en C
-        TIPOS_DATOS = ["int", "float", "char", "double", "void", "long", "short", "unsigned", "signed"]
-        
-        # Lista de funciones de biblioteca estándar conocidas
-        FUNCIONES_BIBLIOTECA = ["printf", "main"]
-        
-        # Variables globales para el seguimiento
-        errores_lexicos = []
-        errores_sintacticos = []
-        todos_los_tokens = []
-        tokens_y_formato = []
-        variables_declaradas = {}  # {nombre: tipo}
-        funciones_declaradas = set()
-        
-        # Definir tokens (requerido por PLY)
-        tokens = [
-            'PALABRA_RESERVADA',
-            'TIPO_DATO', 
-            'IDENTIFICADOR',
-            'ENTERO',
-            'DECIMAL',
-            'CADENA',
-            'CADENA_ERROR',
-            'CARACTER',
-            'CARACTER_ERROR',
-            'LIBRERIA',
-            'LIBRERIA_PERSONALIZADA',
-            'COMENTARIO_LINEA',
-            'COMENTARIO_BLOQUE',
-            'SIMBOLO',
-            'NEWLINE'
-        ]
-        
-        # Estados del lexer
-        states = (
-            ('comentario', 'exclusive'),
-        )
-        
-        # Reglas de tokens (deben seguir el patrón t_NOMBRE)
-        
-        # Comentarios de línea
-        def t_COMENTARIO_LINEA(t):
-            r'//.*'
-            todos_los_tokens.append(('Comentario', t.value, t.lineno))
-            return t
-        
-        # Comentarios de bloque - inicio
-        def t_COMENTARIO_BLOQUE_INICIO(t):
-            r'/\*'
-            t.lexer.comentario_inicio = t.lineno
-            t.lexer.comentario_texto = t.value
-            t.lexer.begin('comentario')
-
-        # Reglas para el estado de comentario
-        def t_comentario_contenido(t):
-            r'[^*\n]+'
-            t.lexer.comentario_texto += t.value
-
-        def t_comentario_asterisco(t):
-            r'\*(?!/)'
-            t.lexer.comentario_texto += t.value
-
-        def t_comentario_newline(t):
-            r'\n+'
-            t.lexer.lineno += len(t.value)
-            t.lexer.comentario_texto += t.value
-
-        def t_comentario_fin(t):
-            r'\*/'
-            t.lexer.comentario_texto += t.value
-            t.type = 'COMENTARIO_BLOQUE'
-            t.value = t.lexer.comentario_texto
-            t.lineno = t.lexer.comentario_inicio
-            t.lexer.begin('INITIAL')
-            todos_los_tokens.append(('Comentario', t.value, t.lineno))
-            return t
-
-        def t_comentario_error(t):
-            errores_lexicos.append(f"Error en comentario línea {t.lineno}: carácter inesperado '{t.value[0]}'")
-            t.lexer.skip(1)
-        
-        # Bibliotecas (deben ir antes que las cadenas)
-        def t_LIBRERIA(t):
-            r'<[a-zA-Z_][a-zA-Z0-9_]*\.h>'
-            todos_los_tokens.append(('Libreria', t.value, t.lineno))
-            return t
-        
-        def t_LIBRERIA_PERSONALIZADA(t):
-            r'"[a-zA-Z_][a-zA-Z0-9_]*\.h"'
-            todos_los_tokens.append(('Libreria_Personalizada', t.value, t.lineno))
-            return t
-        
-        # Cadenas (deben ir después de las librerías)
-        def t_CADENA(t):
-            r'"([^"\\]|\\.)*"'
-            todos_los_tokens.append(('Cadena', t.value, t.lineno))
-            return t
-        
-        def t_CADENA_ERROR(t):
-            r'"([^"\\]|\\.)*$'
-            errores_lexicos.append(f"Error línea {t.lineno}: Cadena sin cerrar: {t.value}")
-            todos_los_tokens.append(('Cadena_Error', t.value, t.lineno))
-            return t
-        
-        # Caracteres
-        def t_CARACTER(t):
-            r"'([^'\\]|\\.)'"
-            todos_los_tokens.append(('Caracter', t.value, t.lineno))
-            return t
-        
-        def t_CARACTER_ERROR(t):
-            r"'([^'\\]|\\.)*'?"
-            if not t.value.endswith("'") or len(t.value.replace("\\", "")) > 3:
-                errores_lexicos.append(f"Error línea {t.lineno}: Carácter mal formado: {t.value}")
-                todos_los_tokens.append(('Caracter_Error', t.value, t.lineno))
-            return t
-        
-        # Números decimales (debe ir antes que enteros)
-        def t_DECIMAL(t):
-            r'\d+\.\d+'
-            todos_los_tokens.append(('Decimal', float(t.value), t.lineno))
-            return t
-        
-        # Números enteros
-        def t_ENTERO(t):
-            r'\d+'
-            todos_los_tokens.append(('Entero', int(t.value), t.lineno))
-            return t
-        
-        # Identificadores y palabras clave
-        def t_IDENTIFICADOR(t):
-            r'[a-zA-Z_][a-zA-Z0-9_]*'
-            # Clasificar el token
-            if t.value in PALABRAS_RESERVADAS:
-                t.type = 'PALABRA_RESERVADA'
-                todos_los_tokens.append(('Palabra_Reservada', t.value, t.lineno))
-            elif t.value in TIPOS_DATOS:
-                t.type = 'TIPO_DATO'
-                todos_los_tokens.append(('Tipo_Dato', t.value, t.lineno))
-            else:
-                todos_los_tokens.append(('Identificador', t.value, t.lineno))
-            return t
-        
-        # Símbolos y operadores
-        def t_SIMBOLO(t):
-            r'[#<>(){};,.+\-*/=\[\]!&|%^~?:]'
-            todos_los_tokens.append(('Simbolo', t.value, t.lineno))
-            return t
-        
-        # Saltos de línea
-        def t_NEWLINE(t):
-            r'\n+'
-            t.lexer.lineno += len(t.value)
-            # No agregamos saltos de línea a la lista de tokens
-            pass
-        
-        # Espacios y tabs (ignorar)
-        t_ignore = ' \t'
-        
-        # Manejo de errores
-        def t_error(t):
-            errores_lexicos.append(f"Error línea {t.lineno}: Carácter ilegal '{t.value[0]}'")
-            t.lexer.skip(1)
-        
-        def post_procesar_tokens(tokens_list):
-            """
-            Post-procesa la lista de tokens para detectar errores sintácticos
-            """
-            nonlocal errores_sintacticos, variables_declaradas, funciones_declaradas
-            
-            tokens_procesados = []
-            i = 0
-            
-            # PASO 1: Análisis previo - recopilar todas las declaraciones sin validar
-            declaraciones_encontradas = {}
-            
-            # Debug: Imprimir todos los tokens para diagnóstico
-            print("DEBUG - Tokens encontrados:")
-            for j, (tipo, valor, linea) in enumerate(tokens_list):
-                print(f"  {j}: {tipo} -> '{valor}' (línea {linea})")
-            
-            for j in range(len(tokens_list)):
-                tipo, valor, linea = tokens_list[j]
-                
-                # Detectar declaraciones de variables sin validar sintaxis aún
-                if tipo == 'Tipo_Dato' and j + 1 < len(tokens_list):
-                    next_token = tokens_list[j + 1]
-                    if next_token[0] == 'Identificador':
-                        print(f"DEBUG - Declaración encontrada: {next_token[1]} tipo {valor}")
-                        declaraciones_encontradas[next_token[1]] = valor
-                        variables_declaradas[next_token[1]] = valor  # Agregar inmediatamente
-                
-                # Detectar declaraciones de funciones
-                if tipo == 'Identificador' and j + 1 < len(tokens_list):
-                    if tokens_list[j + 1][0] == 'Simbolo' and tokens_list[j + 1][1] == '(':
-                        # Verificar si hay un tipo de dato antes (declaración de función)
-                        if j > 0 and tokens_list[j-1][0] == 'Tipo_Dato':
-                            funciones_declaradas.add(valor)
-                            print(f"DEBUG - Función declarada: {valor}")
-                        elif valor == 'main':
-                            funciones_declaradas.add(valor)
-                            print(f"DEBUG - Función main encontrada: {valor}")
-            
-            # Agregar funciones de biblioteca como conocidas
-            for func in FUNCIONES_BIBLIOTECA:
-                funciones_declaradas.add(func)
-            
-            print(f"DEBUG - Variables declaradas encontradas: {variables_declaradas}")
-            print(f"DEBUG - Funciones declaradas encontradas: {funciones_declaradas}")
-            
-            # PASO 2: Procesar tokens con información completa
-            while i < len(tokens_list):
-                tipo, valor, linea = tokens_list[i]
-                
-                # Detectar declaraciones de variables
-                if tipo == 'Tipo_Dato':
-                    if i + 1 < len(tokens_list) and tokens_list[i + 1][0] == 'Identificador':
-                        var_name = tokens_list[i + 1][1]
-                        # No sobreescribir si ya está declarada
-                        if var_name not in variables_declaradas:
-                            variables_declaradas[var_name] = valor
-                        
-                        print(f"DEBUG - Procesando declaración: {var_name} = {valor}")
-                        
-                        # Verificar punto y coma solo si no es parámetro de función
-                        if not es_parametro_funcion(tokens_list, i):
-                            punto_coma_encontrado = False
-                            j = i + 2
-                            
-                            # Buscar hasta encontrar ; 
-                            while j < len(tokens_list):
-                                if tokens_list[j][0] == 'Simbolo':
-                                    if tokens_list[j][1] == ';':
-                                        punto_coma_encontrado = True
-                                        break
-                                    elif tokens_list[j][1] in ['{', '}', ')', ',']:
-                                        break
-                                j += 1
-                            
-                            if not punto_coma_encontrado and not es_declaracion_en_for(tokens_list, i):
-                                errores_sintacticos.append(f"Error sintáctico línea {linea}: Falta ';' después de la declaración de '{var_name}'")
-                
-                # Detectar funciones
-                elif tipo == 'Identificador':
-                    if i + 1 < len(tokens_list) and tokens_list[i + 1][0] == 'Simbolo' and tokens_list[i + 1][1] == '(':
-                        # Es una función
-                        if valor == 'main':
-                            tokens_procesados.append(('Main_Function', valor, linea))
-                        elif valor in FUNCIONES_BIBLIOTECA:
-                            tokens_procesados.append(('Llamada_Funcion_Biblioteca', valor, linea))
-                            print(f"DEBUG - Función de biblioteca encontrada: {valor}")
-                            # Verificar paréntesis balanceados
-                            if not verificar_parentesis_balanceados(tokens_list, i + 1):
-                                errores_sintacticos.append(f"Error sintáctico línea {linea}: Paréntesis desbalanceados en función '{valor}'")
-                        else:
-                            # Determinar si es declaración o llamada
-                            if es_declaracion_funcion(tokens_list, i):
-                                tokens_procesados.append(('Declaracion_Funcion', valor, linea))
-                            else:
-                                if valor in funciones_declaradas:
-                                    tokens_procesados.append(('Llamada_Funcion', valor, linea))
-                                else:
-                                    tokens_procesados.append(('Llamada_Funcion_No_Declarada', valor, linea))
-                                    errores_sintacticos.append(f"Error sintáctico línea {linea}: Función '{valor}' no declarada")
-                                
-                                if not verificar_parentesis_balanceados(tokens_list, i + 1):
-                                    errores_sintacticos.append(f"Error sintáctico línea {linea}: Paréntesis desbalanceados en función '{valor}'")
-                    else:
-                        # Verificar si la variable está declarada
-                        print(f"DEBUG - Verificando variable: {valor}")
-                        print(f"DEBUG - Variables conocidas: {list(variables_declaradas.keys())}")
-                        print(f"DEBUG - Declaraciones encontradas: {list(declaraciones_encontradas.keys())}")
-                        
-                        if (valor not in variables_declaradas and 
-                            valor not in declaraciones_encontradas and 
-                            valor not in funciones_declaradas and 
-                            valor not in FUNCIONES_BIBLIOTECA):
-                            errores_sintacticos.append(f"Error sintáctico línea {linea}: Variable '{valor}' no declarada")
-                        
-                        # Si está en declaraciones_encontradas, agregarla a variables_declaradas
-                        if valor in declaraciones_encontradas and valor not in variables_declaradas:
-                            variables_declaradas[valor] = declaraciones_encontradas[valor]
-                        
-                        tokens_procesados.append((tipo, valor, linea))
-                
-                # Verificar punto y coma en sentencias de control
-                elif tipo == 'Palabra_Reservada' and valor in ['return', 'break', 'continue']:
-                    tokens_procesados.append((tipo, valor, linea))
-                    if not verificar_punto_coma_siguiente(tokens_list, i):
-                        errores_sintacticos.append(f"Error sintáctico línea {linea}: Falta ';' después de '{valor}'")
-                
-                else:
-                    tokens_procesados.append((tipo, valor, linea))
-                
-                i += 1
-            
-            return tokens_procesados
-        
-        def es_parametro_funcion(tokens_list, index):
-            """Verifica si la declaración está dentro de parámetros de función"""
-            # Buscar hacia atrás hasta encontrar un paréntesis de apertura
-            i = index - 1
-            nivel_parentesis = 0
-            
-            while i >= 0:
-                if tokens_list[i][0] == 'Simbolo':
-                    if tokens_list[i][1] == ')':
-                        nivel_parentesis += 1
-                    elif tokens_list[i][1] == '(':
-                        nivel_parentesis -= 1
-                        if nivel_parentesis < 0:
-                            # Estamos dentro de paréntesis, verificar si es función
-                            if i > 0 and tokens_list[i-1][0] == 'Identificador':
-                                return True
-                            return False
-                    elif tokens_list[i][1] in [';', '{', '}'] and nivel_parentesis == 0:
-                        return False
-                i -= 1
-            return False
-        
-        def es_declaracion_en_for(tokens_list, index):
-            """Verifica si la declaración está dentro de un bucle for"""
-            # Buscar hacia atrás la palabra 'for'
-            i = index - 1
-            nivel_parentesis = 0
-            
-            while i >= 0:
-                if tokens_list[i][0] == 'Simbolo':
-                    if tokens_list[i][1] == ')':
-                        nivel_parentesis += 1
-                    elif tokens_list[i][1] == '(':
-                        nivel_parentesis -= 1
-                        if nivel_parentesis < 0 and i > 0:
-                            if tokens_list[i-1][0] == 'Palabra_Reservada' and tokens_list[i-1][1] == 'for':
-                                return True
-                            return False
-                i -= 1
-            return False
-        
-        def es_declaracion_funcion(tokens_list, index):
-            """Determina si es una declaración de función"""
-            # Buscar hacia atrás un tipo de dato
-            i = index - 1
-            while i >= 0:
-                if tokens_list[i][0] == 'Tipo_Dato':
-                    return True
-                elif tokens_list[i][0] == 'Simbolo' and tokens_list[i][1] in ['\n', ';', '}', '{']:
-                    break
-                i -= 1
-            return False
-        
-        def verificar_parentesis_balanceados(tokens_list, start_index):
-            """Verifica que los paréntesis estén balanceados"""
-            if start_index >= len(tokens_list) or tokens_list[start_index][1] != '(':
-                return False
-            
-            nivel = 1
-            i = start_index + 1
-            
-            while i < len(tokens_list) and nivel > 0:
-                if tokens_list[i][0] == 'Simbolo':
-                    if tokens_list[i][1] == '(':
-                        nivel += 1
-                    elif tokens_list[i][1] == ')':
-                        nivel -= 1
-                i += 1
-            
-            return nivel == 0
-        
-        def verificar_punto_coma_siguiente(tokens_list, index):
-            """Verifica que haya un punto y coma después de la sentencia"""
-            i = index + 1
-            while i < len(tokens_list):
-                if tokens_list[i][0] == 'Simbolo':
-                    if tokens_list[i][1] == ';':
-                        return True
-                    elif tokens_list[i][1] in ['{', '}']:
-                        return False
-                i += 1
-            return False
-        
-        def detectar_errores_estructurales():
-            """Detecta errores de llaves, paréntesis y corchetes desbalanceados"""
-            nivel_llaves = 0
-            nivel_parentesis = 0
-            nivel_corchetes = 0
-            
-            for tipo, valor, linea in todos_los_tokens:
-                if tipo == 'Simbolo':
-                    if valor == '{':
-                        nivel_llaves += 1
-                    elif valor == '}':
-                        nivel_llaves -= 1
-                        if nivel_llaves < 0:
-                            errores_sintacticos.append(f"Error sintáctico línea {linea}: Llave de cierre sin apertura")
-                    elif valor == '(':
-                        nivel_parentesis += 1
-                    elif valor == ')':
-                        nivel_parentesis -= 1
-                        if nivel_parentesis < 0:
-                            errores_sintacticos.append(f"Error sintáctico línea {linea}: Paréntesis de cierre sin apertura")
-                    elif valor == '[':
-                        nivel_corchetes += 1
-                    elif valor == ']':
-                        nivel_corchetes -= 1
-                        if nivel_corchetes < 0:
-                            errores_sintacticos.append(f"Error sintáctico línea {linea}: Corchete de cierre sin apertura")
-            
-            # Verificar elementos sin cerrar
-            if nivel_llaves > 0:
-                errores_sintacticos.append(f"Error sintáctico: {nivel_llaves} llave(s) sin cerrar")
-            if nivel_parentesis > 0:
-                errores_sintacticos.append(f"Error sintáctico: {nivel_parentesis} paréntesis sin cerrar")
-            if nivel_corchetes > 0:
-                errores_sintacticos.append(f"Error sintáctico: {nivel_corchetes} corchete(s) sin cerrar")
-        
-        # Crear el lexer
-        try:
-            lexer = lex.lex()
-            lexer.lineno = 1
-        except Exception as e:
-            print(f"Error creando lexer: {e}")
-            return None
-        
-        # Obtener contenido del editor
-        contenido = self.textEdit.toPlainText()
-        
-        # Analizar el contenido
-        lexer.input(contenido)
-        
-        # Procesar todos los tokens
-        while True:
-            tok = lexer.token()
-            if not tok:
-                break
-        
-        # Post-procesar tokens
-        tokens_procesados = post_procesar_tokens(todos_los_tokens)
-        
-        # Detectar errores estructurales
-        detectar_errores_estructurales()
-        
-        # Generar archivos de salida
-        try:
-            # 1. Archivo trad.txt - Solo tokens
-            with open('trad.txt', 'w', encoding='utf-8') as f:
-                for tipo, valor, linea in tokens_procesados:
-                    f.write(f"{valor}\n")
-            
-            # 2. Archivo traduccion.txt - Código traducido
-            with open('traduccion.txt', 'w', encoding='utf-8') as f:
-                for tipo, valor, linea in tokens_procesados:
-                    if tipo == 'Palabra_Reservada' and valor in PALABRAS_RESERVADAS:
-                        f.write(f"{PALABRAS_RESERVADAS[valor]} ")
-                    else:
-                        f.write(f"{valor} ")
-            
-            # 3. Archivo errores.txt - Todos los errores
-            with open('errores.txt', 'w', encoding='utf-8') as f:
-                f.write("=== ANÁLISIS DE ERRORES ===\n\n")
-                
-                f.write("ERRORES LÉXICOS:\n")
-                if errores_lexicos:
-                    for error in errores_lexicos:
-                        f.write(f"  • {error}\n")
-                else:
-                    f.write("  ✓ No se encontraron errores léxicos\n")
-                
-                f.write(f"\nERRORES SINTÁCTICOS:\n")
-                if errores_sintacticos:
-                    for error in errores_sintacticos:
-                        f.write(f"  • {error}\n")
-                else:
-                    f.write("  ✓ No se encontraron errores sintácticos\n")
-                
-                f.write(f"\n=== RESUMEN ===\n")
-                f.write(f"Total errores léxicos: {len(errores_lexicos)}\n")
-                f.write(f"Total errores sintácticos: {len(errores_sintacticos)}\n")
-                f.write(f"Variables declaradas: {len(variables_declaradas)}\n")
-                f.write(f"Funciones encontradas: {len(funciones_declaradas)}\n")
-                
-                if variables_declaradas:
-                    f.write(f"\nVARIABLES DECLARADAS:\n")
-                    for var, tipo in variables_declaradas.items():
-                        f.write(f"  • {var}: {tipo}\n")
-                
-                if funciones_declaradas:
-                    f.write(f"\nFUNCIONES ENCONTRADAS:\n")
-                    for func in funciones_declaradas:
-                        f.write(f"  • {func}\n")
-            
-            print("✓ Análisis completado exitosamente")
-            print(f"✓ Archivos generados: trad.txt, traduccion.txt, errores.txt")
-            print(f"✓ Errores encontrados: {len(errores_lexicos) + len(errores_sintacticos)}")
-            
-            return {
-                'tokens': tokens_procesados,
-                'errores_lexicos': errores_lexicos,
-                'errores_sintacticos': errores_sintacticos,
-                'variables': variables_declaradas,
-                'funciones': funciones_declaradas
-            }
-            
-        except Exception as e:
-            print(f"Error generando archivos: {e}")
-            return None
-        
-        # Traducir el código
-        def traducir_codigo(tokens):
-            """
-            Traduce el código utilizando los tokens procesados.
-            """
-            codigo_traducido = []
-            linea_actual = []
-            
-            for item in tokens_y_formato:
-                if isinstance(item, str):  # Es indentación o nueva línea
-                    if '\n' in item:
-                        if linea_actual:
-                            codigo_traducido.append(''.join(linea_actual))
-                            linea_actual = []
-                        codigo_traducido.append('')  # Línea vacía
-                    else:
-                        linea_actual.append(item)
-                else:  # Es un token
-                    tipo, token, _ = item
-                    if tipo == "Palabra_Reservada":
-                        token = PALABRAS_RESERVADAS.get(token, token)
-                    linea_actual.append(token)
-            
-            if linea_actual:  # Procesar última línea si existe
-                codigo_traducido.append(''.join(linea_actual))
-            
-            return '\n'.join(codigo_traducido)
-        
-        # Guardar solo los tokens en trad.txt (sin sus tipos)
-        tokens_para_archivo = []
-        for tipo, valor, _ in todos_los_tokens:
-            if tipo != "Comentario":  # Opcional: ignorar comentarios en trad.txt
-                tokens_para_archivo.append(valor)
-        
-        with open("trad.txt", "w", encoding="utf-8") as f:
-            f.write("\n".join(tokens_para_archivo))
-        
-        # Generar y guardar código traducido
-        codigo_traducido = traducir_codigo(tokens_y_formato)
-        with open("traduccion.txt", "w", encoding="utf-8") as f:
-            f.write(codigo_traducido)
-        
-        # Guardar errores
-        todos_los_errores = errores_lexicos + errores_sintacticos
-        
-        with open("errores.txt", "w", encoding="utf-8") as f:
-            if todos_los_errores:
-                f.write("\n".join(todos_los_errores))
-            else:
-                f.write("No se encontraron errores léxicos ni sintácticos.")
-        
-        print("Análisis léxico, sintáctico y traducción completados correctamente usando PLY.")
+        if self.trabajo_analisis is not None:
+            self.trabajo_analisis.cancelar()
+        self.pool_analisis.clear()
+
+        self.generacion_analisis += 1
+        # En el hilo de la interfaz solo se toma la instantánea; la clave, la
+        # consulta a la caché y la unión de los tokens las hace el trabajo
+        # El texto completo solo hace falta para conservar el formato
+        texto = self.textEdit.toPlainText() if self.conservarFormatoAction.isChecked() else None
+        trabajo = TrabajoAnalisis(self.textEdit.cache_lexico.instantanea(), self.generacion_analisis,
+                                  cache=self.textEdit.cache_analisis, directorio=self.textEdit.directorio_fuente,
+                                  texto=texto, idioma=self.idioma)
+        trabajo.senales.progreso.connect(self.mostrar_progreso_analisis)
+        trabajo.senales.terminado.connect(self.analisis_terminado)
+        trabajo.senales.fallo.connect(self.analisis_fallido)
+        self.trabajo_analisis = trabajo
+
+        self.terminal.append("Iniciando análisis...")
+        self.pool_analisis.start(trabajo)
+
+    def cambiar_idioma(self, accion):
+        """Elige el diccionario con el que se traducen las palabras reservadas."""
+        self.idioma = accion.data()
+        self.terminal.append(f"Idioma de la traducción: {accion.text()}")
+
+    def mostrar_progreso_analisis(self, generacion, mensaje):
+        """Muestra en la terminal el avance del análisis vigente."""
+        if generacion == self.generacion_analisis:
+            self.terminal.append(mensaje)
+
+    def analisis_terminado(self, generacion, resultado):
+        """Recibe el resultado de un análisis; los resultados obsoletos se descartan."""
+        if generacion != self.generacion_analisis:
+            return
+        self.trabajo_analisis = None
+        total_errores = len(resultado['errores_lexicos']) + len(resultado['errores_sintacticos'])
+        for mensaje in ("✓ Análisis completado exitosamente",
+                        "✓ Archivos generados: trad.txt, traduccion.txt, errores.txt",
+                        f"✓ Errores encontrados: {total_errores}"):
+            print(mensaje)
+            self.terminal.append(mensaje)
+
+    def analisis_fallido(self, generacion, error):
+        """Informa de un error ocurrido durante el análisis."""
+        if generacion != self.generacion_analisis:
+            return
+        self.trabajo_analisis = None
+        print(f"Error generando archivos: {error}")
+        self.terminal.append(f"Error generando archivos: {error}")
 
     def new_content(self):
         """Limpia el área de texto del editor de código y resetea la referencia al archivo actual."""
+        self.cancelar_carga()
         self.textEdit.clear()
         self.current_file = None  # Restablecer la referencia al archivo actual
         print("Nuevo documento creado.")
@@ -872,6 +833,9 @@ class NoteEditor(QMainWindow):
 
     def save_content(self):
         """Guarda el contenido del área de texto en un archivo (sobreescribe si ya existe)."""
+        if self.carga_archivo is not None:
+            print("Espera a que termine de cargarse el archivo antes de guardar.")
+            return
         if hasattr(self, 'current_file') and self.current_file:
             try:
                 with open(self.current_file, 'w', encoding='utf-8') as file:
@@ -904,16 +868,44 @@ class NoteEditor(QMainWindow):
         file_name, _ = QFileDialog.getOpenFileName(self, "Abrir archivo", "", "Archivos C (*.c);;Todos los archivos (*)", options=options)
         
         if file_name:
-            try:
-                with open(file_name, 'r', encoding='utf-8') as file:
-                    self.textEdit.setPlainText(file.read())
-                self.current_file = file_name  # Guarda la ruta del archivo cargado
-                print(f"Archivo cargado desde {file_name}")
-            except Exception as e:
-                print(f"Error al cargar el archivo: {e}")
+            self.cargar_archivo(file_name)
+
+    def cargar_archivo(self, file_name):
+        """Carga `file_name` en el editor por trozos, sin bloquear la interfaz."""
+        self.cancelar_carga()
+        try:
+            carga = CargaArchivo(self.textEdit, file_name, self)
+        except Exception as e:
+            print(f"Error al cargar el archivo: {e}")
+            return
+        carga.terminado.connect(self.carga_terminada)
+        carga.fallo.connect(self.carga_fallida)
+        self.carga_archivo = carga
+        self.current_file = file_name  # Guarda la ruta del archivo cargado
+        carga.iniciar()
+
+    def cancelar_carga(self):
+        if self.carga_archivo is not None:
+            self.carga_archivo.cancelar()
+            self.carga_archivo.deleteLater()
+            self.carga_archivo = None
+
+    def carga_terminada(self, file_name):
+        self.carga_archivo.deleteLater()
+        self.carga_archivo = None
+        print(f"Archivo cargado desde {file_name}")
+
+    def carga_fallida(self, file_name, error):
+        self.carga_archivo.deleteLater()
+        self.carga_archivo = None
+        self.current_file = None
+        print(f"Error al cargar el archivo: {error}")
 
 
 if __name__ == '__main__':
+    # Nivel de las trazas del analizador (desactivadas por defecto), p. ej. ANALIZADOR_LOG=DEBUG
+    logging.basicConfig(level=os.environ.get('ANALIZADOR_LOG', 'WARNING'),
+                        format='%(asctime)s %(name)s %(levelname)s: %(message)s')
     application = QApplication(sys.argv)
     editor = NoteEditor()
     sys.exit(application.exec())
@@ -0,0 +1,314 @@
+"""
+Preprocesador del analizador: #include, #define y la compilación condicional.
+
+Trabaja sobre la tabla de tokens ya lexeada, sin modificarla. Una directiva es
+un '#' al principio de una línea junto con el resto de los tokens de esa línea.
+La etapa decide qué tokens se analizan: las directivas y las ramas descartadas
+por #ifdef, #ifndef, #if, #elif y #else no se analizan. También reúne los
+nombres que aporta el preprocesador: las macros definidas con #define y las
+funciones y variables globales de las cabeceras locales ("util.h") incluidas.
+La traducción sigue recibiendo todos los tokens del archivo.
+
+Las cabeceras locales se buscan junto al archivo que las incluye y después en
+RUTAS_INCLUSION. Las de sistema (<stdio.h>) no se abren. Los tokens de cada
+cabecera se guardan en CACHE_CABECERAS por ruta y fecha de modificación, así
+que una cabecera incluida por cientos de archivos se lexea una sola vez por
+proceso.
+"""
+import os
+import threading
+from array import array
+
+import analizador
+from tabla_tokens import (
+    LIBRERIA, LIBRERIA_PERSONALIZADA, CADENA, PALABRA_RESERVADA, TIPO_DATO, IDENTIFICADOR, SIMBOLO,
+)
+
+# Directorios adicionales donde buscar las cabeceras locales (como -I en gcc)
+RUTAS_INCLUSION = tuple(ruta for ruta in os.environ.get('ANALIZADOR_INCLUIR', '').split(os.pathsep) if ruta)
+
+
+class CacheCabeceras:
+    """
+    Tokens de las cabeceras ya lexeadas, por ruta absoluta. Una entrada vale
+    mientras la fecha de modificación del archivo no cambie. Es segura entre
+    hilos.
+    """
+    def __init__(self):
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = {}  # {ruta: (mtime_ns, tokens)}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def obtener(self, ruta):
+        """
+        Devuelve (mtime_ns, tokens) de `ruta`, lexeándola si no estaba o si
+        cambió. Lanza OSError si el archivo no se puede leer.
+        """
+        mtime = os.stat(ruta).st_mtime_ns
+        with self._lock:
+            entrada = self._entradas.get(ruta)
+            if entrada is not None and entrada[0] == mtime:
+                self.aciertos += 1
+                return entrada
+        tokens, _ = analizador.tokenizar_archivo(ruta)
+        entrada = (mtime, tokens)
+        with self._lock:
+            self.fallos += 1
+            self._entradas[ruta] = entrada
+        return entrada
+
+    def vaciar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+# Caché de cabeceras del proceso, compartida por todos los análisis
+CACHE_CABECERAS = CacheCabeceras()
+
+_UNOS = array('B', [1])
+
+
+class Preprocesado:
+    """
+    Resultado del preprocesador para un archivo:
+    - inactivos: array('B') con un 1 por cada token que no se analiza, o None
+      si el archivo no tiene directivas
+    - macros: {nombre: valores del cuerpo} de las macros definidas al terminar
+    - funciones / variables: lo declarado en las cabeceras locales incluidas
+    - cabeceras: [(ruta, mtime_ns)] de las cabeceras leídas y [(ruta, None)]
+      de las rutas donde se buscó una cabecera sin encontrarla, para saber si
+      un resultado guardado sigue vigente
+    - errores: [(token, mensaje)], con el token del archivo analizado
+    """
+    __slots__ = ('inactivos', 'macros', 'funciones', 'variables', 'cabeceras', 'errores')
+
+    def __init__(self):
+        self.inactivos = None
+        self.macros = {}
+        self.funciones = set()
+        self.variables = {}
+        self.cabeceras = []
+        self.errores = []
+
+
+def _buscar_cabecera(nombre, directorio, rutas_inclusion, cabeceras):
+    """
+    Ruta de la cabecera local `nombre`, o None si no está. Las rutas probadas
+    sin éxito se agregan a `cabeceras` como (ruta, None): si el archivo aparece
+    después, el resultado del análisis deja de valer.
+    """
+    for base in (directorio, *rutas_inclusion):
+        ruta = os.path.abspath(os.path.join(base, nombre))
+        if os.path.isfile(ruta):
+            return ruta
+        if (ruta, None) not in cabeceras:
+            cabeceras.append((ruta, None))
+    return None
+
+
+def _evaluar_condicion(valores, macros):
+    """
+    Valor de la condición de un #if o #elif: un entero o `defined NOMBRE`,
+    opcionalmente negados con '!'. Lo demás no se evalúa y se toma como cierto.
+    """
+    negar = False
+    while valores and valores[0] == '!':
+        negar = not negar
+        valores = valores[1:]
+    if len(valores) == 1 and valores[0].isdigit():
+        return (int(valores[0]) != 0) != negar
+    nombres = [valor for valor in valores if valor not in ('(', ')')]
+    if len(nombres) == 2 and nombres[0] == 'defined':
+        return (nombres[1] in macros) != negar
+    return True
+
+
+def _variables_globales(tokens, inactivos):
+    """Variables declaradas fuera de toda función (tipo, quizá punteros, nombre)."""
+    tipos = tokens.tipos
+    valores = tokens.valores
+    n = len(tipos)
+    variables = {}
+    llaves = 0
+    for i in range(n):
+        if inactivos is not None and inactivos[i]:
+            continue
+        tipo = tipos[i]
+        if tipo == SIMBOLO:
+            if valores[i] == '{':
+                llaves += 1
+            elif valores[i] == '}' and llaves:
+                llaves -= 1
+        elif llaves == 0 and (tipo == TIPO_DATO or (tipo == PALABRA_RESERVADA
+                                                    and valores[i] in analizador._TIPOS_DATOS)):
+            j = i + 1
+            while j < n and tipos[j] == SIMBOLO and valores[j] == '*':
+                j += 1
+            if (j < n and tipos[j] == IDENTIFICADOR
+                    and not (j + 1 < n and tipos[j + 1] == SIMBOLO and valores[j + 1] == '(')):
+                variables.setdefault(valores[j], valores[i])
+    return variables
+
+
+def preprocesar(tokens, directorio=None, rutas_inclusion=RUTAS_INCLUSION, cache=CACHE_CABECERAS):
+    """
+    Preprocesa una tabla de tokens. `directorio` es el del archivo analizado,
+    donde se buscan primero sus cabeceras locales (por defecto, el directorio
+    actual). Devuelve un Preprocesado.
+    """
+    resultado = Preprocesado()
+    resultado.inactivos = _procesar(tokens, directorio or os.getcwd(), rutas_inclusion, cache,
+                                    resultado, set(), None, None)
+    return resultado
+
+
+def _procesar(tokens, directorio, rutas_inclusion, cache, resultado, en_curso, origen, cabecera):
+    """
+    Procesa las directivas de `tokens` y devuelve su máscara de inactivos (o
+    None si no hay directivas). En una cabecera (de nombre `cabecera`), los
+    errores se atribuyen al token `origen` del archivo analizado: el #include
+    por el que se llegó a ella.
+    """
+    valores = tokens.valores
+    # Un archivo sin directivas se descarta con una sola búsqueda en C
+    if '#' not in valores:
+        return None
+
+    tipos = tokens.tipos
+    lineas = tokens.lineas
+    n = len(tipos)
+    macros = resultado.macros
+    inactivos = array('B', bytes(n))
+    condiciones = []  # por cada #if abierto: (activo antes del #if, alguna rama tomada, token del '#')
+    activo = True
+
+    def reportar(k, mensaje):
+        if origen is None:
+            resultado.errores.append((k, f"Error de preprocesador línea {lineas[k]}: {mensaje}"))
+        else:
+            resultado.errores.append((origen, f"Error de preprocesador en \"{cabecera}\": {mensaje}"))
+
+    def siguiente_numeral(desde):
+        try:
+            return valores.index('#', desde)
+        except ValueError:
+            return n
+
+    # Se salta de '#' en '#': los tokens entre directivas se marcan por tramos
+    anterior = 0
+    i = siguiente_numeral(0)
+    while i < n:
+        if not (tipos[i] == SIMBOLO and (i == 0 or lineas[i - 1] != lineas[i])):
+            i = siguiente_numeral(i + 1)
+            continue
+        if not activo:
+            inactivos[anterior:i] = _UNOS * (i - anterior)
+
+        # Directiva: el '#' y el resto de su línea
+        fin = i + 1
+        while fin < n and lineas[fin] == lineas[i]:
+            fin += 1
+        inactivos[i:fin] = _UNOS * (fin - i)
+        directiva = valores[i + 1] if i + 1 < fin else ''
+        argumentos = valores[i + 2:fin]
+
+        if directiva in ('ifdef', 'ifndef'):
+            cumple = bool(argumentos) and (argumentos[0] in macros) == (directiva == 'ifdef')
+            condiciones.append((activo, cumple, i))
+            activo = activo and cumple
+        elif directiva == 'if':
+            cumple = _evaluar_condicion(argumentos, macros)
+            condiciones.append((activo, cumple, i))
+            activo = activo and cumple
+        elif directiva in ('elif', 'else'):
+            if not condiciones:
+                reportar(i, f"#{directiva} sin #if")
+            else:
+                padre, tomada, apertura = condiciones[-1]
+                cumple = not tomada and (directiva == 'else' or _evaluar_condicion(argumentos, macros))
+                condiciones[-1] = (padre, tomada or cumple, apertura)
+                activo = padre and cumple
+        elif directiva == 'endif':
+            if not condiciones:
+                reportar(i, "#endif sin #if")
+            else:
+                activo = condiciones.pop()[0]
+        elif not activo:
+            pass
+        elif directiva == 'define':
+            if i + 2 < fin and tipos[i + 2] == IDENTIFICADOR:
+                macros[valores[i + 2]] = tuple(valores[i + 3:fin])
+            else:
+                reportar(i, "#define sin nombre")
+        elif directiva == 'undef':
+            if argumentos:
+                macros.pop(argumentos[0], None)
+        elif directiva == 'include':
+            k = i + 2
+            if k < fin and tipos[k] == LIBRERIA:
+                pass  # Cabecera de sistema: no se abre
+            elif k < fin and tipos[k] in (LIBRERIA_PERSONALIZADA, CADENA):
+                nombre = valores[k][1:-1]
+                ruta = _buscar_cabecera(nombre, directorio, rutas_inclusion, resultado.cabeceras)
+                if ruta is None:
+                    reportar(k, f"No se encontró la cabecera \"{nombre}\"")
+                elif ruta not in en_curso:
+                    _incluir(ruta, nombre, rutas_inclusion, cache, resultado, en_curso,
+                             k if origen is None else origen, lambda mensaje: reportar(k, mensaje))
+            else:
+                reportar(i, "#include sin nombre de archivo")
+        anterior = fin
+        i = siguiente_numeral(fin)
+    if not activo:
+        inactivos[anterior:n] = _UNOS * (n - anterior)
+
+    for _, _, apertura in condiciones:
+        reportar(apertura, f"Falta #endif para el #{valores[apertura + 1]} de la línea {lineas[apertura]}")
+    return inactivos
+
+
+def _incluir(ruta, nombre, rutas_inclusion, cache, resultado, en_curso, origen, reportar):
+    """
+    Preprocesa una cabecera local y agrega al resultado lo que declara.
+    `reportar(mensaje)` informa un error del propio #include.
+    """
+    try:
+        mtime, tokens = cache.obtener(ruta)
+    except OSError as e:
+        reportar(f"No se pudo leer la cabecera \"{nombre}\": {e.strerror}")
+        return
+    if (ruta, mtime) not in resultado.cabeceras:
+        resultado.cabeceras.append((ruta, mtime))
+
+    # Las directivas de la cabecera ven y modifican las mismas macros (guardas de inclusión)
+    en_curso.add(ruta)
+    inactivos = _procesar(tokens, os.path.dirname(ruta), rutas_inclusion, cache, resultado, en_curso, origen, nombre)
+    en_curso.discard(ruta)
+
+    activos = tokens if inactivos is None else tokens.seleccionar(
+        [k for k in range(len(inactivos)) if not inactivos[k]])
+    resultado.funciones.update(analizador.funciones_declaradas_en(activos))
+    for variable, tipo in _variables_globales(tokens, inactivos).items():
+        resultado.variables.setdefault(variable, tipo)
+
+
+def cabeceras_vigentes(cabeceras):
+    """
+    Si ninguna de las cabeceras [(ruta, mtime_ns)] cambió desde que se leyó y
+    ninguna de las rutas [(ruta, None)] donde no había cabecera tiene una ahora.
+    """
+    for ruta, mtime in cabeceras:
+        if mtime is None:
+            if os.path.isfile(ruta):
+                return False
+            continue
+        try:
+            if os.stat(ruta).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
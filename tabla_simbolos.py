@@ -0,0 +1,80 @@
+"""
+Tabla de símbolos con ámbitos para el analizador.
+
+Cada '{' abre un ámbito y cada '}' lo cierra. En lugar de una pila de dicts
+que habría que recorrer en cada consulta, todos los nombres visibles están en
+un solo dict (nombre -> pila de tipos, el último es el visible) y cada ámbito
+guarda la lista de los nombres que declaró, para deshacerlos al cerrarse. Así
+una consulta es una sola búsqueda en el dict, sea cual sea la profundidad. Los
+nombres llegan internados desde el lexer, así que comparar claves es comparar
+punteros.
+"""
+
+
+class TablaSimbolos:
+    """
+    Pila de ámbitos para las variables. Las declaraciones hechas entre
+    paréntesis (los parámetros de una función, la inicialización de un for)
+    quedan pendientes: son visibles enseguida y pasan al ámbito que abra la
+    llave siguiente, o se descartan si antes termina la sentencia (por ejemplo,
+    en un prototipo).
+    """
+    __slots__ = ('simbolos', 'ambitos', 'pendientes')
+
+    def __init__(self):
+        self.simbolos = {}      # {nombre: [tipo, ...]}
+        self.ambitos = [[]]     # nombres declarados en cada ámbito; el primero es el global
+        self.pendientes = []    # nombres declarados para el próximo ámbito
+
+    @property
+    def profundidad(self):
+        """Número de ámbitos abiertos además del global."""
+        return len(self.ambitos) - 1
+
+    def _agregar(self, nombre, tipo, destino):
+        pila = self.simbolos.get(nombre)
+        if pila is None:
+            self.simbolos[nombre] = [tipo]
+        else:
+            pila.append(tipo)
+        destino.append(nombre)
+
+    def _quitar(self, nombres):
+        simbolos = self.simbolos
+        for nombre in reversed(nombres):
+            pila = simbolos[nombre]
+            pila.pop()
+            if not pila:
+                del simbolos[nombre]
+
+    def declarar(self, nombre, tipo):
+        """Declara `nombre` en el ámbito actual."""
+        self._agregar(nombre, tipo, self.ambitos[-1])
+
+    def declarar_pendiente(self, nombre, tipo):
+        """Declara `nombre` para el ámbito que se abra a continuación."""
+        self._agregar(nombre, tipo, self.pendientes)
+
+    def descartar_pendientes(self):
+        if self.pendientes:
+            self._quitar(self.pendientes)
+            self.pendientes = []
+
+    def abrir(self):
+        """Abre un ámbito, que recibe las declaraciones pendientes."""
+        self.ambitos.append(self.pendientes)
+        self.pendientes = []
+
+    def cerrar(self):
+        """Cierra el ámbito actual. Una llave de más no cierra el global."""
+        self.descartar_pendientes()
+        if len(self.ambitos) > 1:
+            self._quitar(self.ambitos.pop())
+
+    def buscar(self, nombre):
+        """Tipo con el que `nombre` es visible, o None si no está declarado."""
+        pila = self.simbolos.get(nombre)
+        return pila[-1] if pila else None
+
+    def __contains__(self, nombre):
+        return nombre in self.simbolos
@@ -0,0 +1,134 @@
+"""
+Tabla de tokens en columnas para el analizador.
+
+En lugar de una lista de tuplas (tipo, valor, linea), cada columna se guarda en
+un array compacto: el tipo como entero pequeño (array('B')), la línea y el
+tramo [inicio, fin) del token en el texto fuente como array('I'), y el valor
+como cadena internada. Las pasadas del analizador comparan enteros en lugar de
+cadenas como 'Simbolo' o 'Tipo_Dato'.
+
+Los valores no se guardan como tramos del texto fuente (que ya están en
+inicios/fines) porque la tabla vive más que el texto: el análisis de archivos
+grandes lexea por trozos desde un mapeo en memoria que se cierra al terminar,
+la caché de resultados guarda la tabla sin el texto y el editor arma la tabla
+de un documento con las de sus bloques. Como el lexer interna los valores,
+todas las apariciones de un mismo lexema comparten una cadena y la columna
+cuesta un puntero por token (unos 9 bytes por token, más unos 4 de cadenas
+distintas en un programa generado de 10 MB).
+"""
+from array import array
+
+# Tipos de token. El orden define el código entero guardado en la tabla.
+NOMBRES_TIPOS = (
+    # Tipos que produce el lexer
+    'Comentario',
+    'Libreria',
+    'Libreria_Personalizada',
+    'Cadena',
+    'Cadena_Error',
+    'Caracter',
+    'Caracter_Error',
+    'Decimal',
+    'Entero',
+    'Palabra_Reservada',
+    'Tipo_Dato',
+    'Identificador',
+    'Simbolo',
+    # Tipos que asigna post_procesar_tokens
+    'Main_Function',
+    'Llamada_Funcion_Biblioteca',
+    'Declaracion_Funcion',
+    'Llamada_Funcion',
+    'Llamada_Funcion_No_Declarada',
+)
+
+(COMENTARIO, LIBRERIA, LIBRERIA_PERSONALIZADA, CADENA, CADENA_ERROR, CARACTER,
+ CARACTER_ERROR, DECIMAL, ENTERO, PALABRA_RESERVADA, TIPO_DATO, IDENTIFICADOR,
+ SIMBOLO, MAIN_FUNCTION, LLAMADA_FUNCION_BIBLIOTECA, DECLARACION_FUNCION,
+ LLAMADA_FUNCION, LLAMADA_FUNCION_NO_DECLARADA) = range(len(NOMBRES_TIPOS))
+
+CODIGOS_TIPOS = {nombre: codigo for codigo, nombre in enumerate(NOMBRES_TIPOS)}
+
+# Línea reservada para el fragmento que cierra un comentario abierto en otra línea
+LINEA_CONTINUACION = 0
+
+
+class TablaTokens:
+    """
+    Flujo de tokens almacenado por columnas.
+
+    Iterar la tabla (o indexarla) devuelve tuplas (tipo, valor, linea) con el
+    nombre del tipo y los números ya convertidos, igual que la antigua lista de
+    tuplas; las pasadas que necesitan velocidad leen las columnas directamente.
+    """
+    __slots__ = ('tipos', 'lineas', 'inicios', 'fines', 'valores')
+
+    def __init__(self):
+        self.tipos = array('B')
+        self.lineas = array('I')
+        self.inicios = array('I')
+        self.fines = array('I')
+        self.valores = []
+
+    def agregar(self, tipo, valor, linea, inicio, fin):
+        self.tipos.append(tipo)
+        self.lineas.append(linea)
+        self.inicios.append(inicio)
+        self.fines.append(fin)
+        self.valores.append(valor)
+
+    def extender(self, otra, desplazamiento=0):
+        """Añade los tokens de `otra`, sumando `desplazamiento` a sus posiciones."""
+        self.tipos.extend(otra.tipos)
+        self.lineas.extend(otra.lineas)
+        if desplazamiento:
+            self.inicios.extend([inicio + desplazamiento for inicio in otra.inicios])
+            self.fines.extend([fin + desplazamiento for fin in otra.fines])
+        else:
+            self.inicios.extend(otra.inicios)
+            self.fines.extend(otra.fines)
+        self.valores.extend(otra.valores)
+
+    def seleccionar(self, indices):
+        """Devuelve una tabla nueva con los tokens de `indices`, en ese orden."""
+        nueva = TablaTokens()
+        nueva.tipos = array('B', [self.tipos[i] for i in indices])
+        nueva.lineas = array('I', [self.lineas[i] for i in indices])
+        nueva.inicios = array('I', [self.inicios[i] for i in indices])
+        nueva.fines = array('I', [self.fines[i] for i in indices])
+        nueva.valores = [self.valores[i] for i in indices]
+        return nueva
+
+    def copia(self):
+        nueva = TablaTokens()
+        nueva.tipos = array('B', self.tipos)
+        nueva.lineas = array('I', self.lineas)
+        nueva.inicios = array('I', self.inicios)
+        nueva.fines = array('I', self.fines)
+        nueva.valores = list(self.valores)
+        return nueva
+
+    def valor(self, i):
+        """Valor del token i; los números se devuelven convertidos a int o float."""
+        tipo = self.tipos[i]
+        if tipo == ENTERO:
+            return int(self.valores[i])
+        if tipo == DECIMAL:
+            return float(self.valores[i])
+        return self.valores[i]
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def __getitem__(self, i):
+        return (NOMBRES_TIPOS[self.tipos[i]], self.valor(i), self.lineas[i])
+
+    def __iter__(self):
+        for i in range(len(self.tipos)):
+            yield self[i]
+
+    def __eq__(self, otra):
+        if not isinstance(otra, TablaTokens):
+            return NotImplemented
+        return (self.tipos == otra.tipos and self.lineas == otra.lineas and self.inicios == otra.inicios
+                and self.fines == otra.fines and self.valores == otra.valores)